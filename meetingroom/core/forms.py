@@ -1,6 +1,6 @@
 from django import forms
 from datetime import datetime, timedelta
-from .utils.room_capacity_utils import LARGE_ROOM_MAX_CAPACITY
+from .utils.room_registry_utils import get_room_registry
 
 
 class EventForm(forms.Form):
@@ -8,9 +8,10 @@ class EventForm(forms.Form):
     email = forms.EmailField()
 
     number_of_people = forms.IntegerField(
-        label="Number of People Attending - including yourself (Max: 10)",
+        label="Number of People Attending - including yourself "
+        f"(Max: {get_room_registry().max_capacity})",
         min_value=1,
-        max_value=LARGE_ROOM_MAX_CAPACITY,
+        max_value=get_room_registry().max_capacity,
         initial=1,
     )
 
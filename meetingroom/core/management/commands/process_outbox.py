@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.utils.reservation_outbox_utils import drain_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued reservations to Google Calendar, retrying failures with backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of reservations sent in parallel.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the reservations that are due now and exit.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent: int = drain_outbox(options["workers"])
+            if sent:
+                self.stdout.write(f"Processed {sent} queued reservations.")
+            if options["once"]:
+                return
+            if not sent:
+                time.sleep(options["interval"])
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.calendar_watch_utils import (
+    WATCH_CHANNEL_RENEW_BEFORE_SECONDS,
+    WATCH_CHANNEL_TTL_SECONDS,
+    renew_watch_channel,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or renew the Google Calendar push notification channel. "
+        "Run it periodically (e.g. hourly from cron) so the channel never expires."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--address",
+            default=settings.GOOGLE_CALENDAR_WEBHOOK_URL,
+            help="Public HTTPS URL of the calendar-notifications endpoint.",
+        )
+        parser.add_argument(
+            "--ttl",
+            type=int,
+            default=WATCH_CHANNEL_TTL_SECONDS,
+            help="Requested channel lifetime in seconds.",
+        )
+        parser.add_argument(
+            "--renew-before",
+            type=int,
+            default=WATCH_CHANNEL_RENEW_BEFORE_SECONDS,
+            help="Renew when the current channel expires within this many seconds.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Replace the current channel even if it is not about to expire.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["address"]:
+            raise CommandError(
+                "Pass --address or set GOOGLE_CALENDAR_WEBHOOK_URL to the webhook URL."
+            )
+
+        channel = renew_watch_channel(
+            options["address"],
+            options["ttl"],
+            options["renew_before"],
+            options["force"],
+        )
+        if channel is None:
+            self.stdout.write("Calendar watch channel is still valid.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Watching calendar on channel {channel['id']}.")
+        )
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.utils.google_calendar_utils import calendar_service, mirror_calendar_changes
+from core.utils.reservation_mirror_utils import record_mirror_sync
+
+
+class Command(BaseCommand):
+    help = (
+        "Mirror the Google Calendar into the Room and Reservation tables. "
+        "Runs a full sync first, then applies incremental changes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30.0,
+            help="Seconds to wait between incremental syncs.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run a single sync and exit.",
+        )
+
+    def handle(self, *args, **options):
+        calendar_service.add_listener(mirror_calendar_changes)
+        mirrored_version: int = calendar_service.store_version
+
+        while True:
+            if calendar_service.refresh_events_now():
+                record_mirror_sync(calendar_service.last_verified_at)
+            if calendar_service.store_version != mirrored_version:
+                mirrored_version = calendar_service.store_version
+                self.stdout.write(
+                    f"Mirrored {len(calendar_service.stored_events())} calendar events."
+                )
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,37 @@
+import core.models
+from django.db import migrations, models
+
+
+def keep_sent_event_ids(apps, schema_editor):
+    # Rows queued before this migration may already be in Google Calendar under
+    # the old pk-based id, so a retry has to reuse it to stay idempotent.
+    ReservationRequest = apps.get_model("core", "ReservationRequest")
+    for reservation in ReservationRequest.objects.all():
+        reservation.event_id = f"reservation{reservation.pk}"
+        reservation.save(update_fields=["event_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_reservationrequest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservationrequest",
+            name="event_id",
+            field=models.CharField(editable=False, max_length=1024, null=True),
+        ),
+        migrations.RunPython(keep_sent_event_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="reservationrequest",
+            name="event_id",
+            field=models.CharField(
+                default=core.models.new_event_id,
+                editable=False,
+                max_length=1024,
+                unique=True,
+            ),
+        ),
+    ]
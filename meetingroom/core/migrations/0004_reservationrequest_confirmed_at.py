@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_reservationrequest_event_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservationrequest",
+            name="confirmed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_reservationrequest_confirmed_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MirrorSync",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("synced_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -1,3 +1,83 @@
 from django.db import models
+from django.utils import timezone
+import uuid
 
-# Create your models here.
+
+class Room(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Reservation(models.Model):
+    event_id = models.CharField(max_length=1024, unique=True)
+    room = models.ForeignKey(
+        Room, on_delete=models.CASCADE, related_name="reservations"
+    )
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    additional_guests = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["room", "start", "end"], name="reservation_room_range_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.room} {self.start:%Y-%m-%d %H:%M}-{self.end:%H:%M}"
+
+
+class MirrorSync(models.Model):
+    # One row, written by the sync_reservations worker after each successful
+    # sync, so web processes know how old the mirrored reservations are.
+    synced_at = models.DateTimeField()
+
+
+def new_event_id() -> str:
+    # Google event ids only allow the base32hex alphabet (a-v, 0-9), which hex
+    # digits fall within. A random id stays unique across databases, and a
+    # fixed one makes retried inserts idempotent.
+    return uuid.uuid4().hex
+
+
+class ReservationRequest(models.Model):
+    PENDING = "pending"
+    SENDING = "sending"
+    CONFIRMED = "confirmed"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (CONFIRMED, "Confirmed"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    room = models.ForeignKey(
+        Room, on_delete=models.CASCADE, related_name="reservation_requests"
+    )
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    number_of_people = models.PositiveIntegerField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    event_id = models.CharField(
+        max_length=1024, unique=True, default=new_event_id, editable=False
+    )
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+            models.Index(fields=["room", "start", "end"], name="outbox_room_range_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.room} {self.start:%Y-%m-%d %H:%M} ({self.status})"
@@ -5,4 +5,16 @@ from .views import *
 urlpatterns = [
     path("", index, name="index"),
     path("book-reservation", book_reservation, name="book_reservation"),
+    path(
+        "reservations/<int:reservation_id>/status",
+        reservation_status,
+        name="reservation_status",
+    ),
+    path("free-slots", free_slots, name="free_slots"),
+    path(
+        "calendar-notifications",
+        calendar_notifications,
+        name="calendar_notifications",
+    ),
+    path("calendar-metrics", calendar_metrics, name="calendar_metrics"),
 ]
@@ -1,6 +1,21 @@
 from .google_calendar_utils import *
 
 from .google_calendar_service import *
+from .appointment_utils import *
+from .async_google_calendar_service import *
+from .booking_utils import *
+from .calendar_watch_utils import *
+from .circuit_breaker_utils import *
+from .credential_utils import *
+from .http_pool_utils import *
+from .reservation_mirror_utils import *
+from .reservation_outbox_utils import *
 from .reservation_utils import *
-from .room_capacity_utils import *
+from .request_executor_utils import *
+from .room_index_utils import *
+from .room_occupancy_utils import *
+from .room_registry_utils import *
+from .single_flight_utils import *
+from .slot_finder_utils import *
+from .status_timeline_utils import *
 from .utils import *
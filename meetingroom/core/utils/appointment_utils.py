@@ -0,0 +1,128 @@
+from datetime import datetime
+from django.utils import timezone
+from functools import total_ordering
+from typing import List, Sequence, Tuple
+import threading
+
+room_ids: dict[str, int] = {}
+room_names: List[str] = []
+room_ids_lock: threading.Lock = threading.Lock()
+
+
+def intern_room(name: str) -> int:
+    room_id = room_ids.get(name)
+    if room_id is None:
+        with room_ids_lock:
+            room_id = room_ids.get(name)
+            if room_id is None:
+                room_id = room_ids[name] = len(room_names)
+                room_names.append(name)
+    return room_id
+
+
+def to_epoch(value: datetime) -> int:
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.get_current_timezone())
+    return int(value.timestamp())
+
+
+def from_epoch(seconds: int) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.get_current_timezone())
+
+
+def parse_epoch(datetime_str: str) -> int:
+    return to_epoch(datetime.fromisoformat(datetime_str))
+
+
+def parse_epochs(datetime_strs: Sequence[str]):
+    import numpy
+
+    values = numpy.asarray(datetime_strs, dtype=str)
+    width: int = max(25, values.dtype.itemsize // 4)
+    values = values.astype(f"U{width}")
+    lengths = numpy.char.str_len(values)
+    codes = values.view(numpy.uint32).reshape(len(values), width).astype(numpy.int64)
+
+    # Calendar timestamps are "YYYY-MM-DDTHH:MM:SS" plus "Z" or "+HH:MM"; anything
+    # else (fractional seconds, no offset) goes through datetime.fromisoformat.
+    utc = (lengths == 20) & (codes[:, 19] == ord("Z"))
+    signed = (lengths == 25) & (codes[:, 22] == ord(":"))
+    positive = signed & (codes[:, 19] == ord("+"))
+    negative = signed & (codes[:, 19] == ord("-"))
+    vectorised = utc | positive | negative
+
+    digits = codes - ord("0")
+    offsets = (digits[:, 20] * 10 + digits[:, 21]) * 3600 + (
+        digits[:, 23] * 10 + digits[:, 24]
+    ) * 60
+    offsets = numpy.where(positive, offsets, numpy.where(negative, -offsets, 0))
+
+    epochs = numpy.zeros(len(values), dtype=numpy.int64)
+    epochs[vectorised] = (
+        values[vectorised].astype("U19").astype("datetime64[s]").astype(numpy.int64)
+        - offsets[vectorised]
+    )
+    for position in numpy.flatnonzero(~vectorised).tolist():
+        epochs[position] = parse_epoch(str(values[position]))
+    return epochs
+
+
+@total_ordering
+class Appointment:
+    __slots__ = ("start", "end", "additional_guests", "room_id")
+
+    def __init__(self, start: int, end: int, additional_guests: int, room_id: int):
+        self.start: int = start
+        self.end: int = end
+        self.additional_guests: int = additional_guests
+        self.room_id: int = room_id
+
+    @classmethod
+    def from_datetimes(
+        cls,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        additional_guests: int,
+        room: str,
+    ) -> "Appointment":
+        return cls(
+            to_epoch(start_datetime),
+            to_epoch(end_datetime),
+            additional_guests,
+            intern_room(room),
+        )
+
+    @property
+    def room(self) -> str:
+        return room_names[self.room_id]
+
+    @property
+    def start_datetime(self) -> datetime:
+        return from_epoch(self.start)
+
+    @property
+    def end_datetime(self) -> datetime:
+        return from_epoch(self.end)
+
+    def key(self) -> Tuple[int, int, int, int]:
+        return (self.start, self.end, self.additional_guests, self.room_id)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        return self.start < end and start < self.end
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Appointment):
+            return NotImplemented
+        return self.key() == other.key()
+
+    def __lt__(self, other: "Appointment") -> bool:
+        return self.key() < other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        return (
+            f"Appointment({self.start_datetime.isoformat()}, "
+            f"{self.end_datetime.isoformat()}, {self.additional_guests}, {self.room!r})"
+        )
@@ -0,0 +1,282 @@
+from asgiref.sync import sync_to_async
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import quote
+from .google_calendar_service import GoogleCalendarService, http_error_status
+import asyncio
+import contextvars
+
+CALENDAR_API_URL: str = "https://www.googleapis.com/calendar/v3"
+
+
+class AsyncGoogleCalendarService:
+    def __init__(self, calendar_service: GoogleCalendarService, transport=None):
+        self.calendar_service = calendar_service
+        self.transport = transport
+        self._client: contextvars.ContextVar = contextvars.ContextVar(
+            "calendar_client", default=None
+        )
+
+    def _make_client(self):
+        import httpx
+
+        return httpx.AsyncClient(
+            base_url=CALENDAR_API_URL,
+            timeout=self.calendar_service.HTTP_TIMEOUT_SECONDS,
+            transport=self.transport,
+            # Google only compresses responses for user agents that ask for it.
+            headers={"Accept-Encoding": "gzip", "User-Agent": "meetingroom (gzip)"},
+        )
+
+    # Views open one session per request: its calls share the client's
+    # keep-alive connections, and the client is closed before the request's
+    # event loop goes away. Calls made outside a session get a client of their own.
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[object]:
+        client = self._client.get()
+        if client is not None:
+            yield client
+            return
+
+        client = self._make_client()
+        token = self._client.set(client)
+        try:
+            yield client
+        finally:
+            self._client.reset(token)
+            await client.aclose()
+
+    async def _credentials(self):
+        if self.calendar_service.credentials is None:
+            await asyncio.to_thread(self.calendar_service.warm_up)
+        return self.calendar_service.credentials
+
+    async def _authorise(self, headers: dict, force_refresh: bool = False) -> bool:
+        from google.auth.transport.requests import Request
+
+        credentials = await self._credentials()
+        if credentials is None:
+            return False
+        if force_refresh or not credentials.valid:
+            await asyncio.to_thread(credentials.refresh, Request())
+        credentials.apply(headers)
+        return True
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        body: Optional[dict] = None,
+        idempotent: bool = True,
+    ) -> dict:
+        return await self.calendar_service.request_executor.arun(
+            lambda: self._attempt(method, path, params, body), idempotent
+        )
+
+    async def _attempt(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict],
+        body: Optional[dict],
+    ) -> dict:
+        breaker = self.calendar_service.breaker
+        breaker.before_call()
+        try:
+            response_body: dict = await self._request(method, path, params, body)
+        except Exception as error:
+            breaker.record_failure(error)
+            raise
+        breaker.record_success()
+        return response_body
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict],
+        body: Optional[dict],
+    ) -> dict:
+        headers: dict = {}
+        if not await self._authorise(headers):
+            raise PermissionError("Google Calendar API authentication failed.")
+
+        async with self.session() as client:
+            response = await client.request(
+                method, path, params=params, json=body, headers=headers
+            )
+            if response.status_code == 401:
+                await self._authorise(headers, force_refresh=True)
+                response = await client.request(
+                    method, path, params=params, json=body, headers=headers
+                )
+        response.raise_for_status()
+        return response.json()
+
+    async def _iter_pages(
+        self, calendar_id: str = "primary", **params
+    ) -> AsyncIterator[dict]:
+        page_token: Optional[str] = None
+        params = {key: value for key, value in params.items() if value is not None}
+
+        while True:
+            response: dict = await self.request(
+                "GET",
+                f"/calendars/{quote(calendar_id, safe='@')}/events",
+                params={**params, "pageToken": page_token} if page_token else params,
+            )
+            yield response
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    async def _fetch_changes(
+        self, sync_token: Optional[str] = None
+    ) -> Tuple[list[dict], Optional[str]]:
+        items: list[dict] = []
+        response: dict = {}
+
+        async for response in self._iter_pages(
+            singleEvents=True,
+            syncToken=sync_token,
+            fields=self.calendar_service.EVENT_LIST_FIELDS,
+        ):
+            items.extend(response.get("items", []))
+        return items, response.get("nextSyncToken")
+
+    async def sync_events(self):
+        notification: Optional[str] = self.calendar_service.load_last_notification()
+        base_sync_token: Optional[str] = self.calendar_service.sync_token
+
+        try:
+            events, sync_token = await self._fetch_changes(base_sync_token)
+        except Exception as error:
+            if base_sync_token is None or http_error_status(error) != 410:
+                raise
+            print("Calendar sync token expired, running a full sync.")
+            base_sync_token = None
+            events, sync_token = await self._fetch_changes()
+
+        # Listeners may write to the database, which Django only allows from sync code.
+        await sync_to_async(self.calendar_service.apply_sync)(
+            events, sync_token, base_sync_token, notification
+        )
+
+    # Kiosks tend to refresh together; concurrent callers share one sync, and
+    # are counted in the same refresh_flights metrics as the sync service.
+    async def refresh_events(self) -> bool:
+        if self.calendar_service.serve_while_revalidating():
+            return True
+        return await self.calendar_service.refresh_flights.ado(
+            "refresh_events", self._refresh_events
+        )
+
+    async def _refresh_events(self) -> bool:
+        try:
+            if not self.calendar_service.has_current_events():
+                await self.sync_events()
+            return True
+
+        except Exception as e:
+            print(f"An error occurred: {str(e)}")
+            print("get event")
+            return False
+
+    async def get_events(self) -> list[dict]:
+        refreshed: bool = await self.refresh_events()
+        if not refreshed and self.calendar_service.last_verified_at is None:
+            return []
+        return self.calendar_service.upcoming_events()
+
+    async def list_events(
+        self, start_time: str, end_time: str, calendar_id: str = "primary"
+    ) -> AsyncIterator[dict]:
+        async for response in self._iter_pages(
+            calendar_id,
+            timeMin=start_time,
+            timeMax=end_time,
+            singleEvents=True,
+            orderBy="startTime",
+            fields=self.calendar_service.EVENT_LIST_FIELDS,
+        ):
+            for event in response.get("items", []):
+                yield event
+
+    async def list_room_events(
+        self,
+        start_time: str,
+        end_time: str,
+        room_calendars: dict[str, str],
+        timeout: Optional[float] = None,
+    ) -> dict[str, list[dict]]:
+        async def fetch(calendar_id: str) -> list[dict]:
+            return [
+                event
+                async for event in self.list_events(start_time, end_time, calendar_id)
+            ]
+
+        room_events: list[list[dict]] = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    fetch(calendar_id),
+                    timeout or self.calendar_service.ROOM_FETCH_TIMEOUT_SECONDS,
+                )
+                for calendar_id in room_calendars.values()
+            )
+        )
+        return dict(zip(room_calendars, room_events))
+
+    async def query_free_busy(
+        self, start_time: str, end_time: str, calendar_ids: list[str]
+    ) -> dict[str, list[Tuple[datetime, datetime]]]:
+        response: dict = await self.request(
+            "POST",
+            "/freeBusy",
+            body={
+                "timeMin": start_time,
+                "timeMax": end_time,
+                "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+            },
+        )
+        return self.calendar_service.parse_free_busy(response)
+
+    async def insert_event(self, event: dict) -> dict:
+        return await self.request(
+            "POST",
+            "/calendars/primary/events",
+            params={"sendUpdates": "all"},
+            body=event,
+            idempotent="id" in event,
+        )
+
+    async def create_event(
+        self,
+        name: str,
+        email: str,
+        start_time: str,
+        end_time: str,
+        additional_guests: int,
+        location_summary: str,
+    ) -> Optional[dict]:
+        if not all([name, email, start_time, end_time]):
+            print("Google Calendar API authentication failed or missing parameters.")
+            return None
+
+        try:
+            return await self.insert_event(
+                self.calendar_service.build_event(
+                    name,
+                    email,
+                    start_time,
+                    end_time,
+                    additional_guests,
+                    location_summary,
+                )
+            )
+
+        except Exception as e:
+            print(f"An error occurred: {str(e)}")
+            print("create event")
+            return None
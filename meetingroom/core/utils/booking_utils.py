@@ -0,0 +1,157 @@
+from asgiref.sync import sync_to_async
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Hashable, Iterable, Iterator, List, Optional, Tuple
+from .appointment_utils import Appointment, to_epoch
+from .google_calendar_utils import (
+    AppointmentSnapshot,
+    acreate_event,
+    candidate_rooms,
+    find_available_room,
+    parse_appointment,
+    room_index,
+)
+import threading
+import uuid
+
+room_day_locks: dict[Tuple[str, date], threading.Lock] = {}
+room_day_locks_guard: threading.Lock = threading.Lock()
+
+
+def get_room_day_lock(room: str, day: date) -> threading.Lock:
+    with room_day_locks_guard:
+        lock: Optional[threading.Lock] = room_day_locks.get((room, day))
+        if lock is None:
+            today: date = date.today()
+            for key in [key for key in room_day_locks if key[1] < today]:
+                if not room_day_locks[key].locked():
+                    del room_day_locks[key]
+            lock = room_day_locks[(room, day)] = threading.Lock()
+        return lock
+
+
+@contextmanager
+def lock_rooms(rooms: Iterable[str], day: date) -> Iterator[None]:
+    # Always acquire in name order so two bookings that share rooms cannot deadlock.
+    locks: List[threading.Lock] = [
+        get_room_day_lock(room, day) for room in sorted(set(rooms))
+    ]
+    for lock in locks:
+        lock.acquire()
+    try:
+        yield
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+
+class BookingIndex:
+    def __init__(self, *indexes):
+        self.indexes: list = []
+        for index in indexes:
+            if all(index is not existing for existing in self.indexes):
+                self.indexes.append(index)
+
+    def __bool__(self) -> bool:
+        return any(self.indexes)
+
+    def overlaps(self, room: str, start: int, end: int) -> bool:
+        return any(index.overlaps(room, start, end) for index in self.indexes)
+
+    def conflicts(self, room: str, start: int, end: int) -> List[Tuple[int, int]]:
+        return [
+            interval
+            for index in self.indexes
+            for interval in index.conflicts(room, start, end)
+        ]
+
+    def add(self, appointment: Appointment, key: Hashable):
+        for index in self.indexes:
+            index.add(appointment, key=key)
+
+    def discard(self, key: Hashable):
+        for index in self.indexes:
+            index.discard(key)
+
+
+@contextmanager
+def claim_room(
+    start_datetime: datetime,
+    end_datetime: datetime,
+    number_of_people: int,
+    snapshot: AppointmentSnapshot,
+    *extra_indexes,
+) -> Iterator[Tuple[bool, str, BookingIndex]]:
+    # Holds go into the process-wide index as well as the snapshot's, so requests
+    # that read a different snapshot (free/busy, the database mirror) still see them.
+    index = BookingIndex(snapshot.room_index, room_index, *extra_indexes)
+
+    with lock_rooms(candidate_rooms(number_of_people), start_datetime.date()):
+        has_time_conflict, location = find_available_room(
+            index, to_epoch(start_datetime), to_epoch(end_datetime), number_of_people
+        )
+        yield (has_time_conflict, location, index)
+        snapshot.decisions.clear()
+
+
+def hold_room(
+    start_datetime: datetime,
+    end_datetime: datetime,
+    number_of_people: int,
+    snapshot: AppointmentSnapshot,
+) -> Tuple[bool, str, BookingIndex, Optional[str]]:
+    with claim_room(start_datetime, end_datetime, number_of_people, snapshot) as (
+        has_time_conflict,
+        location,
+        index,
+    ):
+        if has_time_conflict:
+            return (True, location, index, None)
+
+        hold_key: str = f"hold-{uuid.uuid4().hex}"
+        index.add(
+            Appointment.from_datetimes(
+                start_datetime, end_datetime, number_of_people - 1, location
+            ),
+            hold_key,
+        )
+        return (False, location, index, hold_key)
+
+
+# The room locks are thread locks, so they are only taken inside sync_to_async.
+# The hold stays in the shared index while the insert is awaited, which keeps
+# concurrent bookings off the room without holding a lock across the await.
+async def abook_room(
+    name: str,
+    email: str,
+    start_datetime: datetime,
+    end_datetime: datetime,
+    number_of_people: int,
+    snapshot: AppointmentSnapshot,
+) -> Tuple[bool, str]:
+    has_time_conflict, location, index, hold_key = await sync_to_async(hold_room)(
+        start_datetime, end_datetime, number_of_people, snapshot
+    )
+    if has_time_conflict:
+        return (True, location)
+
+    try:
+        event: Optional[dict] = await acreate_event(
+            name,
+            email,
+            start_datetime.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            end_datetime.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            number_of_people,
+            location,
+        )
+    finally:
+        await sync_to_async(index.discard)(hold_key)
+
+    if not event:
+        raise RuntimeError("Google Calendar did not accept the reservation.")
+
+    appointment = parse_appointment(event)
+    if appointment is not None:
+        await sync_to_async(index.add)(appointment, event["id"])
+
+    return (False, location)
@@ -0,0 +1,74 @@
+from django.http import HttpResponse, HttpRequest
+from typing import Optional
+from .google_calendar_utils import calendar_service
+import hmac
+import secrets
+import time
+import uuid
+
+WATCH_CHANNEL_TTL_SECONDS: int = 7 * 24 * 60 * 60
+WATCH_CHANNEL_RENEW_BEFORE_SECONDS: int = 24 * 60 * 60
+
+
+def is_valid_notification(req: HttpRequest, channel: Optional[dict]) -> bool:
+    if not channel:
+        return False
+    return hmac.compare_digest(
+        req.headers.get("X-Goog-Channel-ID", ""), channel.get("id", "")
+    ) and hmac.compare_digest(
+        req.headers.get("X-Goog-Channel-Token", ""), channel.get("token", "")
+    )
+
+
+def process_calendar_notification(req: HttpRequest) -> HttpResponse:
+    if not is_valid_notification(req, calendar_service.load_watch_channel()):
+        return HttpResponse(status=403)
+
+    # Google sends a "sync" message when the channel is created; it carries no change.
+    if req.headers.get("X-Goog-Resource-State") != "sync":
+        calendar_service.record_notification(
+            req.headers.get("X-Goog-Message-Number") or str(time.time_ns())
+        )
+        calendar_service.refresh_events_now()
+
+    return HttpResponse(status=200)
+
+
+def renew_watch_channel(
+    address: str,
+    ttl_seconds: int = WATCH_CHANNEL_TTL_SECONDS,
+    renew_before_seconds: int = WATCH_CHANNEL_RENEW_BEFORE_SECONDS,
+    force: bool = False,
+) -> Optional[dict]:
+    current_channel: Optional[dict] = calendar_service.load_watch_channel()
+    renew_after_ms: float = (time.time() + renew_before_seconds) * 1000
+
+    if (
+        not force
+        and current_channel
+        and int(current_channel.get("expiration", 0)) > renew_after_ms
+    ):
+        return None
+
+    token: str = secrets.token_urlsafe(32)
+    channel: dict = calendar_service.watch_events(
+        str(uuid.uuid4()), address, token, ttl_seconds
+    )
+    calendar_service.save_watch_channel(
+        {
+            "id": channel["id"],
+            "resourceId": channel["resourceId"],
+            "expiration": channel.get("expiration", (time.time() + ttl_seconds) * 1000),
+            "token": token,
+        }
+    )
+
+    if current_channel:
+        try:
+            calendar_service.stop_channel(
+                current_channel["id"], current_channel["resourceId"]
+            )
+        except Exception as e:
+            print(f"Could not stop calendar watch channel: {str(e)}")
+
+    return channel
@@ -0,0 +1,83 @@
+from typing import Any, Callable, Optional
+import threading
+import time
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30,
+        is_failure: Callable[[Exception], bool] = lambda error: True,
+    ):
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout_seconds: float = reset_timeout_seconds
+        self.is_failure = is_failure
+        self.state: str = self.CLOSED
+        self.consecutive_failures: int = 0
+        self.opened_at: Optional[float] = None
+        self.trips: int = 0
+        self.rejected_calls: int = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if (
+                self.state == self.OPEN
+                and time.monotonic() - self.opened_at >= self.reset_timeout_seconds
+            ):
+                # Let one trial call through; its outcome closes or reopens the circuit.
+                self.state = self.HALF_OPEN
+                return
+            self.rejected_calls += 1
+        raise CircuitOpenError("Google Calendar API circuit is open.")
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self, error: Exception):
+        if not self.is_failure(error):
+            self.record_success()
+            return
+        with self._lock:
+            self.consecutive_failures += 1
+            if (
+                self.state == self.HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def call(self, function: Callable[[], Any]) -> Any:
+        self.before_call()
+        try:
+            result = function()
+        except Exception as error:
+            self.record_failure(error)
+            raise
+        self.record_success()
+        return result
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "trips": self.trips,
+                "rejected_calls": self.rejected_calls,
+            }
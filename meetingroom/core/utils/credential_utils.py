@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from .http_pool_utils import SharedCredentials
+import threading
+
+
+class CredentialRefresher:
+    def __init__(
+        self,
+        credentials: SharedCredentials,
+        request_factory: Callable[[], object],
+        on_refresh: Callable[[object], None],
+        refresh_before_seconds: int = 10 * 60,
+        check_interval_seconds: int = 60,
+    ):
+        self.credentials = credentials
+        self.request_factory = request_factory
+        self.on_refresh = on_refresh
+        self.refresh_before_seconds: int = refresh_before_seconds
+        self.check_interval_seconds: int = check_interval_seconds
+        self.failures: int = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def seconds_until_expiry(self) -> Optional[float]:
+        expiry: Optional[datetime] = self.credentials.credentials.expiry
+        if expiry is None:
+            return None
+        # google-auth stores expiry as a naive UTC datetime.
+        now: datetime = datetime.now(timezone.utc).replace(tzinfo=None)
+        return (expiry - now) / timedelta(seconds=1)
+
+    def is_refresh_due(self) -> bool:
+        if not self.credentials.credentials.refresh_token:
+            return False
+        remaining: Optional[float] = self.seconds_until_expiry()
+        if remaining is None:
+            return not self.credentials.valid
+        return remaining <= self.refresh_before_seconds
+
+    def refresh_if_due(self) -> bool:
+        if not self.is_refresh_due():
+            return False
+        try:
+            self.credentials.refresh(self.request_factory())
+            self.on_refresh(self.credentials.credentials)
+        except Exception as e:
+            self.failures += 1
+            print(f"Background token refresh failed: {str(e)}")
+            return False
+        return True
+
+    def run(self):
+        self.refresh_if_due()
+        while not self._stopped.wait(self.check_interval_seconds):
+            self.refresh_if_due()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="calendar-token-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
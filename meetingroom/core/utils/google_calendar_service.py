@@ -1,56 +1,242 @@
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from google.auth import exceptions
-
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
 from django.utils import timezone
 from datetime import datetime, time
+from typing import Callable, Iterator, Optional, Tuple
+from .circuit_breaker_utils import CircuitBreaker, CircuitOpenError
+from .credential_utils import CredentialRefresher
+from .http_pool_utils import HttpPool, SharedCredentials
+from .request_executor_utils import RequestExecutor, RetryBudget, TokenBucket
+from .room_registry_utils import MeetingRoom, get_room_registry
+from .single_flight_utils import SingleFlight
+import json
+import os
 import os.path
+import threading
+import time as time_module
+
+
+# The Google client libraries take a few hundred milliseconds to import, so they
+# are only imported once the calendar is actually used.
+def http_error_status(error: Exception) -> Optional[int]:
+    from googleapiclient.errors import HttpError
+
+    if isinstance(error, HttpError):
+        return error.resp.status
+    # httpx.HTTPStatusError, raised by the async client.
+    status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status_code, int):
+        return status_code
+    return None
+
+
+def http_error_reason(error: Exception) -> Optional[str]:
+    from googleapiclient.errors import HttpError
+
+    try:
+        if isinstance(error, HttpError):
+            content: dict = json.loads(error.content)
+        else:
+            content = error.response.json()
+        return content["error"]["errors"][0]["reason"]
+    except Exception:
+        return None
+
+
+def is_retryable_error(error: Exception, idempotent: bool = True) -> bool:
+    status: Optional[int] = http_error_status(error)
+    if status == 429 or (
+        status == 403
+        and http_error_reason(error) in ("rateLimitExceeded", "userRateLimitExceeded")
+    ):
+        return True
+    # A 5xx may arrive after Google stored the write, so only retry requests
+    # that are safe to repeat.
+    return idempotent and status is not None and status >= 500
+
+
+def is_outage(error: Exception) -> bool:
+    # Timeouts and connection errors carry no status; 4xx answers mean the API is up.
+    status: Optional[int] = http_error_status(error)
+    return status is None or status == 429 or status >= 500
 
 
 class GoogleCalendarService:
     _instance = None
 
     SCOPES = ["https://www.googleapis.com/auth/calendar"]
+    WATCH_CHANNEL_FILE = "calendar_channel.json"
+    WATCH_NOTIFICATION_FILE = "calendar_channel.notified"
+    HTTP_TIMEOUT_SECONDS = 10
+    ROOM_FETCH_TIMEOUT_SECONDS = 10
+    STALE_AFTER_SECONDS = 30
+    # Push notifications can be lost, so a watched calendar still runs an
+    # incremental sync when it has been quiet for this long.
+    WATCH_MAX_QUIET_SECONDS = 2 * 60
+    # Partial responses: only what the store, sync and parse_appointment read.
+    EVENT_FIELDS = (
+        "id,status,summary,start(dateTime,date),end(dateTime,date),"
+        "attendees(email,additionalGuests)"
+    )
+    EVENT_LIST_FIELDS = f"nextPageToken,nextSyncToken,items({EVENT_FIELDS})"
+    TOKEN_REFRESH_BEFORE_SECONDS = 10 * 60
+    TOKEN_CHECK_INTERVAL_SECONDS = 60
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance.service = cls._instance.authenticate()
+            cls._instance._service = None
+            cls._instance._service_ready = False
+            cls._instance.http_pool = None
+            cls._instance.credentials = None
+            cls._instance.credential_refresher = None
+            cls._instance._service_lock = threading.Lock()
+            cls._instance._store_lock = threading.Lock()
+            cls._instance._listeners = []
+            cls._instance.store_version = 0
+            cls._instance.refresh_flights = SingleFlight()
+            cls._instance.breaker = CircuitBreaker(is_failure=is_outage)
+            cls._instance.request_executor = RequestExecutor(
+                TokenBucket(settings.GOOGLE_CALENDAR_QUOTA_PER_SECOND),
+                RetryBudget(),
+                is_retryable_error,
+            )
+            cls._instance._revalidating = False
+            cls._instance._revalidate_lock = threading.Lock()
+            cls._instance.reset_event_store()
         return cls._instance
 
+    def reset_event_store(self):
+        self._event_store: dict[str, dict] = {}
+        self._sync_token: Optional[str] = None
+        self._synced_notification: Optional[str] = None
+        self.last_verified_at: Optional[float] = None
+        self._notify_listeners([], [], True)
+
+    @property
+    def service(self):
+        if not self._service_ready:
+            self.warm_up()
+        return self._service
+
+    @service.setter
+    def service(self, service):
+        self._service = service
+        self._service_ready = True
+        self.http_pool = None
+
+    @service.deleter
+    def service(self):
+        self._service = None
+        self._service_ready = False
+        self.http_pool = None
+
+    def warm_up(self):
+        with self._service_lock:
+            if not self._service_ready:
+                try:
+                    self._service = self.authenticate()
+                except Exception as e:
+                    print(f"Google Calendar API authentication failed: {str(e)}")
+                    self._service = None
+                self._service_ready = True
+        return self._service
+
     def authenticate(self):
+        from googleapiclient.discovery import build
+
         creds = self.load_credentials(self.SCOPES)
 
         if not creds or not creds.valid:
             creds = self.refresh_credentials(creds)
 
-        return build("calendar", "v3", credentials=creds) if creds else None
+        if not creds:
+            return None
+
+        self.credentials = SharedCredentials(creds)
+        self.start_credential_refresher()
+        self.http_pool = HttpPool(
+            lambda: self.build_http(self.credentials),
+            settings.GOOGLE_CALENDAR_HTTP_POOL_SIZE,
+            self.HTTP_TIMEOUT_SECONDS,
+        )
+        return build("calendar", "v3", credentials=creds)
+
+    # httplib2.Http is not thread-safe, so every API call checks out its own
+    # authorised transport from the pool; all of them share one credential.
+    def build_http(self, credentials: SharedCredentials):
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+
+        return AuthorizedHttp(
+            credentials, http=httplib2.Http(timeout=self.HTTP_TIMEOUT_SECONDS)
+        )
+
+    def execute(self, request, idempotent: bool = True):
+        return self.request_executor.run(
+            lambda: self.breaker.call(lambda: self._execute(request)), idempotent
+        )
+
+    def _execute(self, request):
+        if self.http_pool is None:
+            return request.execute()
+        with self.http_pool.checkout() as http:
+            return request.execute(http=http)
+
+    def http_pool_metrics(self) -> dict:
+        if self.http_pool is None:
+            return {}
+        metrics: dict = self.http_pool.metrics()
+        metrics["credential_refreshes"] = self.credentials.refresh_count
+        if self.credential_refresher is not None:
+            metrics["background_refresh_failures"] = self.credential_refresher.failures
+        return metrics
 
     def load_credentials(self, scopes: list):
+        from google.oauth2.credentials import Credentials
+
         creds = None
         if os.path.exists("token.json"):
             creds = Credentials.from_authorized_user_file("token.json", scopes)
         return creds
 
+    # Tokens are refreshed ahead of expiry on a background thread so that no
+    # user request has to wait for the OAuth round trip.
+    def start_credential_refresher(self):
+        from google.auth.transport.requests import Request
+
+        if self.credential_refresher is not None:
+            self.credential_refresher.stop()
+        self.credential_refresher = CredentialRefresher(
+            self.credentials,
+            Request,
+            self.save_credentials,
+            self.TOKEN_REFRESH_BEFORE_SECONDS,
+            self.TOKEN_CHECK_INTERVAL_SECONDS,
+        )
+        self.credential_refresher.start()
+
     def refresh_credentials(self, creds):
+        from google.auth.transport.requests import Request
+
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
+            self.save_credentials(creds)
         else:
             creds = self.run_local_server()
             self.save_credentials(creds)
         return creds
 
     def run_local_server(self):
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
         flow = InstalledAppFlow.from_client_secrets_file(
             "credentials.json", self.SCOPES
         )
         return flow.run_local_server(port=0)
 
     def save_credentials(self, creds):
-        with open("token.json", "w") as token:
-            token.write(creds.to_json())
+        self._write_atomically("token.json", creds.to_json())
 
     def create_event(
         self,
@@ -61,26 +247,23 @@ class GoogleCalendarService:
         additional_guests: int,
         location_summary: str,
     ):
+        from google.auth import exceptions
+
         if not self.service or not all([name, email, start_time, end_time]):
             print("Google Calendar API authentication failed or missing parameters.")
             return
 
         try:
-            event = {
-                "start": {"dateTime": start_time, "timeZone": "America/Los_Angeles"},
-                "end": {"dateTime": end_time, "timeZone": "America/Los_Angeles"},
-                "attendees": [
-                    {
-                        "displayName": name,
-                        "email": email,
-                        "additionalGuests": additional_guests,
-                    }
-                ],
-                "summary": location_summary,
-            }
-            self.service.events().insert(
-                calendarId="primary", body=event, sendUpdates="all"
-            ).execute()
+            return self.insert_event(
+                self.build_event(
+                    name,
+                    email,
+                    start_time,
+                    end_time,
+                    additional_guests,
+                    location_summary,
+                )
+            )
 
         except exceptions.GoogleAuthError as auth_error:
             print(f"Google Authentication Error: {auth_error}")
@@ -89,36 +272,423 @@ class GoogleCalendarService:
             print(f"An error occurred: {str(e)}")
             print("create event")
 
+    def build_event(
+        self,
+        name: str,
+        email: str,
+        start_time: str,
+        end_time: str,
+        additional_guests: int,
+        location_summary: str,
+        event_id: Optional[str] = None,
+    ) -> dict:
+        room: Optional[MeetingRoom] = get_room_registry().get(location_summary)
+        time_zone: str = room.timezone.key if room is not None else settings.TIME_ZONE
+        event = {
+            "start": {"dateTime": start_time, "timeZone": time_zone},
+            "end": {"dateTime": end_time, "timeZone": time_zone},
+            "attendees": [
+                {
+                    "displayName": name,
+                    "email": email,
+                    "additionalGuests": additional_guests,
+                }
+            ],
+            "summary": location_summary,
+        }
+        if room is not None and room.calendar_id:
+            # Inviting the room's own calendar puts the booking on it, so
+            # free/busy queries against the room calendars see it as busy.
+            event["attendees"].append({"email": room.calendar_id, "resource": True})
+        if event_id:
+            event["id"] = event_id
+        return event
+
+    def insert_event(self, event: dict) -> dict:
+        return self.execute(
+            self.service.events().insert(
+                calendarId="primary", body=event, sendUpdates="all"
+            ),
+            idempotent="id" in event,
+        )
+
+    def get_event(self, event_id: str) -> dict:
+        return self.execute(
+            self.service.events().get(calendarId="primary", eventId=event_id)
+        )
+
+    def add_listener(self, listener: Callable[[list[dict], list[str], bool], None]):
+        self._listeners.append(listener)
+
+    def _notify_listeners(
+        self, updated_events: list[dict], removed_event_ids: list[str], full_sync: bool
+    ):
+        self.store_version += 1
+        for listener in self._listeners:
+            listener(updated_events, removed_event_ids, full_sync)
+
     def get_events(self):
-        if not self.service:
-            print("Google Calendar API authentication failed.")
+        # A failed refresh still leaves the last good events in the store, which
+        # is safer than reporting every room as free.
+        if not self.refresh_events() and self.last_verified_at is None:
             return []
+        return self.upcoming_events()
 
-        try:
-            local_timezone = timezone.get_current_timezone()
-            now: datetime = datetime.now(local_timezone)
-            start_time: str = now.isoformat()
+    def upcoming_events(self) -> list[dict]:
+        local_timezone = timezone.get_current_timezone()
+        now: datetime = datetime.now(local_timezone)
+
+        december_31st: datetime = datetime(now.year, 12, 31, 23, 59)
+        december_31st: datetime = december_31st.astimezone(local_timezone)
+
+        return self.events_between(now, december_31st)
 
-            december_31st: datetime = datetime(now.year, 12, 31, 23, 59)
-            december_31st: datetime = december_31st.astimezone(local_timezone)
-            december_31st_iso: str = december_31st.isoformat()
+    def refresh_events(self) -> bool:
+        if self.serve_while_revalidating():
+            return True
+        return self.refresh_events_now()
 
-            events_result = self.list_events(start_time, december_31st_iso)
+    # Kiosks tend to refresh together; concurrent callers share one sync. Push
+    # notifications call this directly, since serving stale events would
+    # ignore the change they report.
+    def refresh_events_now(self) -> bool:
+        return self.refresh_flights.do("refresh_events", self._refresh_events)
 
-            events_items = events_result.get("items", [])
-            return events_items
+    def serve_while_revalidating(self) -> bool:
+        if (
+            not settings.GOOGLE_CALENDAR_STALE_WHILE_REVALIDATE
+            or self.last_verified_at is None
+        ):
+            return False
+        if self.staleness_seconds() > self.STALE_AFTER_SECONDS:
+            self.revalidate_in_background()
+        return True
+
+    def revalidate_in_background(self):
+        with self._revalidate_lock:
+            if self._revalidating:
+                return
+            self._revalidating = True
+
+        def revalidate():
+            try:
+                self.refresh_events_now()
+            finally:
+                self._revalidating = False
+
+        threading.Thread(
+            target=revalidate, name="calendar-revalidate", daemon=True
+        ).start()
+
+    def mark_verified(self):
+        self.last_verified_at = time_module.time()
+
+    def staleness_seconds(self) -> Optional[float]:
+        if self.last_verified_at is None:
+            return None
+        return time_module.time() - self.last_verified_at
+
+    def _refresh_events(self) -> bool:
+        from google.auth import exceptions
+
+        if not self.service:
+            print("Google Calendar API authentication failed.")
+            return False
+
+        if self.has_current_events():
+            return True
+
+        try:
+            self.sync_events()
+            return True
+
+        except CircuitOpenError as e:
+            print(f"Serving stored events: {str(e)}")
+            return False
 
         except exceptions.GoogleAuthError as auth_error:
             print(f"Google Authentication Error: {auth_error}")
-            return []
+            return False
 
         except Exception as e:
             print(f"An error occurred: {str(e)}")
             print("get event")
-            return []
+            return False
+
+    def stored_events(self) -> list[dict]:
+        with self._store_lock:
+            return list(self._event_store.values())
+
+    def stored_event_ids(self) -> set[str]:
+        with self._store_lock:
+            return set(self._event_store)
+
+    def events_between(self, start: datetime, end: datetime) -> list[dict]:
+        events: list[dict] = self.stored_events()
+        return sorted(
+            (
+                event
+                for event in events
+                if self._event_starts_before(event, end)
+                and self._event_ends_after(event, start)
+            ),
+            key=lambda event: self._event_time(event["start"]),
+        )
+
+    def _event_starts_before(self, event: dict, moment: datetime) -> bool:
+        return self._event_time(event["start"]) < moment
+
+    def _event_ends_after(self, event: dict, moment: datetime) -> bool:
+        return self._event_time(event["end"]) > moment
+
+    def _event_time(self, event_time: dict) -> datetime:
+        value: datetime = datetime.fromisoformat(
+            event_time.get("dateTime") or event_time["date"]
+        )
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, timezone.get_current_timezone())
+        return value
+
+    def sync_events(self):
+        with self._store_lock:
+            notification: Optional[str] = self.load_last_notification()
+
+            if self._sync_token is None:
+                self._full_sync()
+            else:
+                try:
+                    self._incremental_sync()
+                except Exception as error:
+                    if http_error_status(error) != 410:
+                        raise
+                    print("Calendar sync token expired, running a full sync.")
+                    self._full_sync()
+
+            self._synced_notification = notification
+            self.mark_verified()
+
+    def has_current_events(self) -> bool:
+        if self._sync_token is None or not self.is_watch_channel_active():
+            return False
+        staleness_seconds: Optional[float] = self.staleness_seconds()
+        if (
+            staleness_seconds is None
+            or staleness_seconds > self.WATCH_MAX_QUIET_SECONDS
+        ):
+            return False
+        return self._synced_notification == self.load_last_notification()
+
+    def is_watch_channel_active(self) -> bool:
+        channel: Optional[dict] = self.load_watch_channel()
+        if not channel:
+            return False
+        return int(channel.get("expiration", 0)) > time_module.time() * 1000
+
+    def load_watch_channel(self) -> Optional[dict]:
+        if not os.path.exists(self.WATCH_CHANNEL_FILE):
+            return None
+        with open(self.WATCH_CHANNEL_FILE) as channel_file:
+            return json.load(channel_file)
+
+    def save_watch_channel(self, channel: dict):
+        self._write_atomically(self.WATCH_CHANNEL_FILE, json.dumps(channel))
 
-    def list_events(self, start_time: str, end_time: str):
+    def load_last_notification(self) -> Optional[str]:
+        if not os.path.exists(self.WATCH_NOTIFICATION_FILE):
+            return None
+        with open(self.WATCH_NOTIFICATION_FILE) as notification_file:
+            return notification_file.read()
+
+    def record_notification(self, message_number: str):
+        self._write_atomically(self.WATCH_NOTIFICATION_FILE, message_number)
+
+    def _write_atomically(self, path: str, content: str):
+        temporary_path: str = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "w") as temporary_file:
+            temporary_file.write(content)
+        os.replace(temporary_path, path)
+
+    def watch_events(
+        self, channel_id: str, address: str, token: str, ttl_seconds: int
+    ) -> dict:
+        return self.execute(
+            self.service.events().watch(
+                calendarId="primary",
+                body={
+                    "id": channel_id,
+                    "type": "web_hook",
+                    "address": address,
+                    "token": token,
+                    "params": {"ttl": str(ttl_seconds)},
+                },
+            )
+        )
+
+    def stop_channel(self, channel_id: str, resource_id: str):
+        self.execute(
+            self.service.channels().stop(
+                body={"id": channel_id, "resourceId": resource_id}
+            )
+        )
+
+    @property
+    def sync_token(self) -> Optional[str]:
+        return self._sync_token
+
+    def apply_sync(
+        self,
+        events: list[dict],
+        sync_token: Optional[str],
+        base_sync_token: Optional[str],
+        notification: Optional[str],
+    ) -> bool:
+        with self._store_lock:
+            if base_sync_token is None:
+                self._replace_events(events, sync_token)
+            elif base_sync_token == self._sync_token:
+                self._apply_changes(events, sync_token)
+            else:
+                # Another sync moved the store past this batch's starting point.
+                return False
+            self._synced_notification = notification
+            self.mark_verified()
+            return True
+
+    def _full_sync(self):
+        self._replace_events(*self._fetch_changes())
+
+    def _incremental_sync(self):
+        self._apply_changes(*self._fetch_changes(self._sync_token))
+
+    def _replace_events(self, events: list[dict], sync_token: Optional[str]):
+        self._event_store = {
+            event["id"]: event for event in events if event.get("status") != "cancelled"
+        }
+        self._sync_token = sync_token
+        self._notify_listeners(list(self._event_store.values()), [], True)
+
+    def _apply_changes(self, events: list[dict], sync_token: Optional[str]):
+        updated_events: list[dict] = []
+        removed_event_ids: list[str] = []
+        for event in events:
+            if event.get("status") == "cancelled":
+                self._event_store.pop(event["id"], None)
+                removed_event_ids.append(event["id"])
+            else:
+                self._event_store[event["id"]] = event
+                updated_events.append(event)
+        self._sync_token = sync_token
+        if updated_events or removed_event_ids:
+            self._notify_listeners(updated_events, removed_event_ids, False)
+
+    def _fetch_changes(
+        self, sync_token: Optional[str] = None
+    ) -> Tuple[list[dict], Optional[str]]:
+        items: list[dict] = []
+        response: dict = {}
+
+        for response in self._iter_pages(
+            singleEvents=True, syncToken=sync_token, fields=self.EVENT_LIST_FIELDS
+        ):
+            items.extend(response.get("items", []))
+        return items, response.get("nextSyncToken")
+
+    def _iter_pages(self, calendar_id: str = "primary", **params) -> Iterator[dict]:
         events = self.service.events()
-        return events.list(
-            calendarId="primary", timeMin=start_time, timeMax=end_time
-        ).execute()
+        page_token: Optional[str] = None
+
+        while True:
+            response = self.execute(
+                events.list(calendarId=calendar_id, pageToken=page_token, **params)
+            )
+            yield response
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    def query_free_busy(
+        self, start_time: str, end_time: str, calendar_ids: list[str]
+    ) -> dict[str, list[Tuple[datetime, datetime]]]:
+        response = self.execute(
+            self.service.freebusy().query(
+                body={
+                    "timeMin": start_time,
+                    "timeMax": end_time,
+                    "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+                }
+            )
+        )
+
+        return self.parse_free_busy(response)
+
+    def parse_free_busy(
+        self, response: dict
+    ) -> dict[str, list[Tuple[datetime, datetime]]]:
+        busy_intervals: dict[str, list[Tuple[datetime, datetime]]] = {}
+        for calendar_id, calendar in response.get("calendars", {}).items():
+            if calendar.get("errors"):
+                raise ValueError(
+                    f"Free/busy lookup failed for {calendar_id}: {calendar['errors']}"
+                )
+            busy_intervals[calendar_id] = [
+                (
+                    datetime.fromisoformat(interval["start"]),
+                    datetime.fromisoformat(interval["end"]),
+                )
+                for interval in calendar.get("busy", [])
+            ]
+        return busy_intervals
+
+    def list_events(
+        self, start_time: str, end_time: str, calendar_id: str = "primary"
+    ) -> Iterator[dict]:
+        for response in self._iter_pages(
+            calendar_id,
+            timeMin=start_time,
+            timeMax=end_time,
+            singleEvents=True,
+            orderBy="startTime",
+            fields=self.EVENT_LIST_FIELDS,
+        ):
+            yield from response.get("items", [])
+
+    def list_room_events(
+        self,
+        start_time: str,
+        end_time: str,
+        room_calendars: dict[str, str],
+        timeout: Optional[float] = None,
+    ) -> dict[str, list[dict]]:
+        # Without a transport pool every call shares one httplib2.Http, which
+        # cannot serve two threads at once.
+        max_workers: int = (
+            min(len(room_calendars), self.http_pool.size)
+            if self.http_pool is not None
+            else 1
+        )
+        executor = ThreadPoolExecutor(
+            max_workers=max(max_workers, 1), thread_name_prefix="room-calendar"
+        )
+        try:
+            futures = {
+                room: executor.submit(
+                    lambda calendar_id: list(
+                        self.list_events(start_time, end_time, calendar_id)
+                    ),
+                    calendar_id,
+                )
+                for room, calendar_id in room_calendars.items()
+            }
+            _, pending = wait(
+                futures.values(), timeout=timeout or self.ROOM_FETCH_TIMEOUT_SECONDS
+            )
+            if pending:
+                slow_rooms: list[str] = [
+                    room for room, future in futures.items() if future in pending
+                ]
+                raise TimeoutError(
+                    f"Timed out fetching room calendars: {', '.join(slow_rooms)}"
+                )
+            return {room: future.result() for room, future in futures.items()}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,11 +1,65 @@
-from datetime import datetime
-from typing import List, Tuple
+from asgiref.sync import sync_to_async
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from django.conf import settings
 from django.utils import timezone
+from .appointment_utils import (
+    Appointment,
+    intern_room,
+    parse_epoch,
+    parse_epochs,
+    to_epoch,
+)
+from .async_google_calendar_service import AsyncGoogleCalendarService
 from .google_calendar_service import GoogleCalendarService
-from .room_capacity_utils import SMALL_ROOM_MAX_CAPACITY, LARGE_ROOM_MAX_CAPACITY
+from .reservation_mirror_utils import (
+    ReservationIndex,
+    get_mirror_staleness_seconds,
+    get_mirrored_appointments,
+    is_reservation_mirror_enabled,
+    mirror_reservations,
+)
+from .room_index_utils import RoomIntervalIndex
+from .room_occupancy_utils import RoomOccupancyIndex
+from .room_registry_utils import get_room_registry
+from .single_flight_utils import SharedSingleFlight, SingleFlight
+from .status_timeline_utils import RoomStatusTimeline
+import heapq
+import os
 import random
+import tempfile
+import time
 
 calendar_service: GoogleCalendarService = GoogleCalendarService()
+async_calendar_service: AsyncGoogleCalendarService = AsyncGoogleCalendarService(
+    calendar_service
+)
+status_timeline: Tuple[int, RoomStatusTimeline] = (-1, RoomStatusTimeline([]))
+
+
+def make_window_flights() -> SingleFlight:
+    if not settings.CALENDAR_SINGLE_FLIGHT_SHARED:
+        return SingleFlight()
+    from django.core.cache import cache
+
+    return SharedSingleFlight(
+        cache, os.path.join(tempfile.gettempdir(), "meetingroom-calendar-locks")
+    )
+
+
+window_flights: SingleFlight = make_window_flights()
+
+
+def make_room_index() -> RoomIntervalIndex | RoomOccupancyIndex:
+    if settings.ROOM_OCCUPANCY_BITMAPS:
+        return RoomOccupancyIndex()
+    return RoomIntervalIndex()
+
+
+room_index: RoomIntervalIndex | RoomOccupancyIndex = make_room_index()
+
+# Below this many events, NumPy's per-call overhead outweighs the parsing it saves.
+BATCH_PARSE_MIN_EVENTS: int = 256
 
 
 def parse_iso_datetime(datetime_str: str) -> datetime:
@@ -13,34 +67,412 @@ def parse_iso_datetime(datetime_str: str) -> datetime:
 
 
 def sort_appointments(
-    appointments: List[dict],
-) -> List[Tuple[datetime, datetime, int, str]]:
+    appointments: Iterable[dict],
+    presorted: bool = False,
+) -> List[Appointment]:
+    events: List[dict] = list(appointments)
+    sorted_appointments: Optional[List[Appointment]] = None
+    if len(events) >= BATCH_PARSE_MIN_EVENTS:
+        sorted_appointments = parse_appointments_batch(events, presorted)
+    if sorted_appointments is None:
+        sorted_appointments = list(iter_appointments(events))
+        if not presorted:
+            sorted_appointments.sort()
+    return sorted_appointments
+
+
+def parse_appointments_batch(
+    events: List[dict], presorted: bool = False
+) -> Optional[List[Appointment]]:
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    timed = numpy.fromiter(
+        (
+            bool(
+                event.get("start", {}).get("dateTime")
+                and event.get("end", {}).get("dateTime")
+            )
+            for event in events
+        ),
+        dtype=bool,
+        count=len(events),
+    )
+    if not timed.all():
+        print(f"Skipping {len(events) - timed.sum()} events with no start or end time")
+    titled = numpy.fromiter(
+        (bool(event.get("summary")) for event in events),
+        dtype=bool,
+        count=len(events),
+    )
+    if not titled[timed].all():
+        print(f"Skipping {(timed & ~titled).sum()} events with no room")
+    timed_events: List[dict] = [
+        events[i] for i in numpy.flatnonzero(timed & titled).tolist()
+    ]
+
+    try:
+        starts = parse_epochs([event["start"]["dateTime"] for event in timed_events])
+        ends = parse_epochs([event["end"]["dateTime"] for event in timed_events])
+    except ValueError as e:
+        print(f"Batch timestamp parsing failed, parsing events one by one: {str(e)}")
+        return None
+    additional_guests = numpy.fromiter(
+        (
+            (event.get("attendees") or [{}])[0].get("additionalGuests", 0)
+            for event in timed_events
+        ),
+        dtype=numpy.int64,
+        count=len(timed_events),
+    )
+    room_ids = numpy.fromiter(
+        (intern_room(event["summary"]) for event in timed_events),
+        dtype=numpy.int64,
+        count=len(timed_events),
+    )
+
+    if not presorted:
+        # Same order as sorting the records: start, end, guests, then room.
+        order = numpy.lexsort((room_ids, additional_guests, ends, starts))
+        starts, ends = starts[order], ends[order]
+        additional_guests, room_ids = additional_guests[order], room_ids[order]
+    return list(
+        map(
+            Appointment,
+            starts.tolist(),
+            ends.tolist(),
+            additional_guests.tolist(),
+            room_ids.tolist(),
+        )
+    )
 
-    sorted_appointments: list[tuple[datetime, datetime, int, str]] = []
-    for appointment in appointments:
 
-        if not appointment["start"].get("dateTime") or not appointment["end"].get(
-            "dateTime"
-        ):
-            print("Skipping due to missing start or end time")
+def iter_appointments(
+    appointments: Iterable[dict],
+) -> Iterator[Appointment]:
+    for appointment in appointments:
+        parsed_appointment = parse_appointment(appointment)
+        if parsed_appointment is None:
             continue
-        sorted_appointments.append(
-            (
-                parse_iso_datetime(appointment["start"]["dateTime"]),
-                parse_iso_datetime(appointment["end"]["dateTime"]),
-                appointment["attendees"][0].get("additionalGuests", 0),
-                appointment["summary"],
+        yield parsed_appointment
+
+
+def iter_room_appointments(room: str, events: Iterable[dict]) -> Iterator[Appointment]:
+    # Events on a room's own calendar belong to that room whatever their title.
+    for event in events:
+        appointment = parse_appointment(event, room)
+        if appointment is not None:
+            yield appointment
+
+
+def merge_room_appointments(
+    room_events: dict[str, Iterable[dict]],
+) -> Iterator[Appointment]:
+    return heapq.merge(
+        *(iter_room_appointments(room, events) for room, events in room_events.items()),
+        key=lambda appointment: appointment.start,
+    )
+
+
+def parse_appointment(
+    appointment: dict,
+    room: Optional[str] = None,
+) -> Optional[Appointment]:
+    start: dict = appointment.get("start", {})
+    end: dict = appointment.get("end", {})
+    if not start.get("dateTime") or not end.get("dateTime"):
+        print("Skipping due to missing start or end time")
+        return None
+    # Events the app did not create (personal blocks, untitled holds) may have
+    # no title or attendees; on the primary calendar, no title means no room.
+    room = room or appointment.get("summary")
+    if not room:
+        print("Skipping due to missing room")
+        return None
+    attendees: List[dict] = appointment.get("attendees") or [{}]
+    return Appointment(
+        parse_epoch(start["dateTime"]),
+        parse_epoch(end["dateTime"]),
+        attendees[0].get("additionalGuests", 0),
+        intern_room(room),
+    )
+
+
+def update_room_index(
+    updated_events: List[dict], removed_event_ids: List[str], full_sync: bool
+):
+    # Holding the index lock for the whole batch means no availability check
+    # sees a full sync half-applied.
+    with room_index.lock:
+        if full_sync:
+            room_index.clear()
+        for event_id in removed_event_ids:
+            room_index.discard(event_id)
+        for event in updated_events:
+            room_index.discard(event["id"])
+            appointment = parse_appointment(event)
+            if appointment is not None:
+                room_index.add(appointment, key=event["id"])
+
+
+calendar_service.add_listener(update_room_index)
+
+
+def mirror_calendar_changes(
+    updated_events: List[dict], removed_event_ids: List[str], full_sync: bool
+):
+    mirror_reservations(
+        [(event["id"], parse_appointment(event)) for event in updated_events],
+        removed_event_ids,
+        full_sync,
+    )
+
+
+def warm_up_calendar_service() -> bool:
+    calendar_service.warm_up()
+    return calendar_service.refresh_events()
+
+
+def get_room_index() -> RoomIntervalIndex | RoomOccupancyIndex:
+    calendar_service.refresh_events()
+    return room_index
+
+
+async def aget_room_index() -> RoomIntervalIndex | RoomOccupancyIndex:
+    await async_calendar_service.refresh_events()
+    return room_index
+
+
+def get_status_timeline() -> RoomStatusTimeline:
+    global status_timeline
+    version, timeline = status_timeline
+    if version != calendar_service.store_version:
+        version = calendar_service.store_version
+        timeline = RoomStatusTimeline(
+            iter_appointments(calendar_service.stored_events())
+        )
+        status_timeline = (version, timeline)
+    return timeline
+
+
+def get_room_status(snapshot: "AppointmentSnapshot") -> dict[str, object]:
+    if not snapshot.is_verified:
+        return {
+            "is_available": False,
+            "is_unknown": True,
+            "next_transition": None,
+            "staleness_seconds": None,
+        }
+
+    timeline: RoomStatusTimeline = snapshot.status_timeline
+    now: datetime = get_current_datetime()
+    return {
+        "is_available": not timeline.is_busy(now),
+        "is_unknown": False,
+        "next_transition": timeline.next_transition(now),
+        "staleness_seconds": snapshot.staleness_seconds,
+    }
+
+
+def is_room_calendars_enabled() -> bool:
+    return (
+        settings.GOOGLE_CALENDAR_USE_ROOM_CALENDARS
+        and get_room_registry().has_calendars()
+    )
+
+
+def get_room_appointments(
+    start_datetime: datetime, end_datetime: datetime
+) -> List[Appointment]:
+    return list(
+        merge_room_appointments(
+            calendar_service.list_room_events(
+                start_datetime.isoformat(),
+                end_datetime.isoformat(),
+                get_room_registry().calendars(),
+            )
+        )
+    )
+
+
+async def aget_room_appointments(
+    start_datetime: datetime, end_datetime: datetime
+) -> List[Appointment]:
+    return list(
+        merge_room_appointments(
+            await async_calendar_service.list_room_events(
+                start_datetime.isoformat(),
+                end_datetime.isoformat(),
+                get_room_registry().calendars(),
             )
         )
-    print("sorted appointments", sorted_appointments)
+    )
 
-    return sorted(sorted_appointments)
 
+def is_free_busy_enabled() -> bool:
+    return settings.GOOGLE_CALENDAR_USE_FREEBUSY and get_room_registry().has_calendars()
+
+
+def booking_day_window(start_datetime: datetime) -> Tuple[datetime, datetime]:
+    day_start: datetime = start_datetime.replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return day_start, day_start + timedelta(days=1)
 
-def is_current_time_between(start_time: datetime, end_time: datetime) -> bool:
-    local_timezone = timezone.get_current_timezone()
-    current_time: datetime = datetime.now(local_timezone)
-    return start_time <= current_time <= end_time
+
+class AppointmentSnapshot:
+    def __init__(self, interval_index: RoomIntervalIndex):
+        self.room_index: RoomIntervalIndex = interval_index
+        self.decisions: dict[Tuple[int, int, int], Tuple[bool, str]] = {}
+        self.staleness_seconds: Optional[float] = None
+
+    @classmethod
+    def capture(cls) -> "AppointmentSnapshot":
+        if is_reservation_mirror_enabled():
+            return cls(ReservationIndex()).with_staleness(
+                get_mirror_staleness_seconds()
+            )
+        return cls(get_room_index()).with_staleness(
+            calendar_service.staleness_seconds()
+        )
+
+    @classmethod
+    def capture_for(
+        cls, start_datetime: datetime, end_datetime: datetime
+    ) -> "AppointmentSnapshot":
+        if is_free_busy_enabled() and not is_reservation_mirror_enabled():
+            try:
+                return cls.from_free_busy(start_datetime, end_datetime)
+            except Exception as e:
+                print(f"Free/busy lookup failed, using the event listing: {str(e)}")
+        if is_room_calendars_enabled() and not is_reservation_mirror_enabled():
+            try:
+                return cls.from_room_calendars(start_datetime, end_datetime)
+            except Exception as e:
+                print(f"Room calendar fetch failed, using the event listing: {str(e)}")
+        return cls.capture()
+
+    @classmethod
+    async def acapture(cls) -> "AppointmentSnapshot":
+        if is_reservation_mirror_enabled():
+            return cls(ReservationIndex()).with_staleness(
+                await sync_to_async(get_mirror_staleness_seconds)()
+            )
+        return cls(await aget_room_index()).with_staleness(
+            calendar_service.staleness_seconds()
+        )
+
+    @classmethod
+    async def acapture_for(
+        cls, start_datetime: datetime, end_datetime: datetime
+    ) -> "AppointmentSnapshot":
+        if is_free_busy_enabled() and not is_reservation_mirror_enabled():
+            try:
+                return await cls.afrom_free_busy(start_datetime, end_datetime)
+            except Exception as e:
+                print(f"Free/busy lookup failed, using the event listing: {str(e)}")
+        if is_room_calendars_enabled() and not is_reservation_mirror_enabled():
+            try:
+                return await cls.afrom_room_calendars(start_datetime, end_datetime)
+            except Exception as e:
+                print(f"Room calendar fetch failed, using the event listing: {str(e)}")
+        return await cls.acapture()
+
+    @classmethod
+    def from_free_busy(
+        cls, start_datetime: datetime, end_datetime: datetime
+    ) -> "AppointmentSnapshot":
+        day_start, day_end = booking_day_window(start_datetime)
+        return cls.from_busy_intervals(
+            calendar_service.query_free_busy(
+                day_start.isoformat(),
+                day_end.isoformat(),
+                list(get_room_registry().calendars().values()),
+            )
+        )
+
+    @classmethod
+    async def afrom_free_busy(
+        cls, start_datetime: datetime, end_datetime: datetime
+    ) -> "AppointmentSnapshot":
+        day_start, day_end = booking_day_window(start_datetime)
+        return cls.from_busy_intervals(
+            await async_calendar_service.query_free_busy(
+                day_start.isoformat(),
+                day_end.isoformat(),
+                list(get_room_registry().calendars().values()),
+            )
+        )
+
+    # Each room's own calendar is listed for the booking day, in parallel, and
+    # its events count for that room whatever their title.
+    @classmethod
+    def from_room_calendars(
+        cls, start_datetime: datetime, end_datetime: datetime
+    ) -> "AppointmentSnapshot":
+        day_start, day_end = booking_day_window(start_datetime)
+        return cls(
+            RoomIntervalIndex.from_appointments(get_appointments(day_start, day_end))
+        ).with_staleness(0.0)
+
+    @classmethod
+    async def afrom_room_calendars(
+        cls, start_datetime: datetime, end_datetime: datetime
+    ) -> "AppointmentSnapshot":
+        day_start, day_end = booking_day_window(start_datetime)
+        return cls(
+            RoomIntervalIndex.from_appointments(
+                await aget_room_appointments(day_start, day_end)
+            )
+        ).with_staleness(0.0)
+
+    @classmethod
+    def from_busy_intervals(
+        cls, busy_intervals: dict[str, list[Tuple[datetime, datetime]]]
+    ) -> "AppointmentSnapshot":
+        interval_index = RoomIntervalIndex()
+        for room in get_room_registry().rooms:
+            for busy_start, busy_end in busy_intervals.get(room.calendar_id, []):
+                interval_index.add(
+                    Appointment(to_epoch(busy_start), to_epoch(busy_end), 0, room.id)
+                )
+        return cls(interval_index).with_staleness(0.0)
+
+    def with_staleness(
+        self, staleness_seconds: Optional[float]
+    ) -> "AppointmentSnapshot":
+        self.staleness_seconds = staleness_seconds
+        return self
+
+    # None means the calendar was never read successfully, so an empty index
+    # says nothing about whether the rooms are free.
+    @property
+    def is_verified(self) -> bool:
+        return self.staleness_seconds is not None
+
+    @property
+    def is_too_stale_to_book(self) -> bool:
+        return (
+            not self.is_verified
+            or self.staleness_seconds > settings.BOOKING_MAX_STALENESS_SECONDS
+        )
+
+    @property
+    def status_timeline(self) -> RoomStatusTimeline:
+        if is_reservation_mirror_enabled():
+            now: datetime = get_current_datetime()
+            return RoomStatusTimeline(
+                get_mirrored_appointments(
+                    now - timedelta(days=1), now + timedelta(days=1)
+                )
+            )
+        return get_status_timeline()
+
+
+def is_current_time_between(start_time: int, end_time: int) -> bool:
+    return start_time <= int(time.time()) <= end_time
 
 
 def get_current_datetime() -> datetime:
@@ -48,19 +480,49 @@ def get_current_datetime() -> datetime:
     return datetime.now(local_timezone).astimezone()
 
 
-def get_appointments() -> List[Tuple[datetime, datetime, int, str]]:
-    appointments_data: list = calendar_service.get_events()
-    appointments: List[Tuple[datetime, datetime, int, str]] = sort_appointments(
-        appointments_data
-    )
+def get_appointments(
+    start_datetime: Optional[datetime] = None, end_datetime: Optional[datetime] = None
+) -> List[Appointment]:
+    if is_reservation_mirror_enabled():
+        now: datetime = get_current_datetime()
+        return get_mirrored_appointments(
+            start_datetime or now,
+            end_datetime or now.replace(month=12, day=31, hour=23, minute=59),
+        )
 
-    if not appointments:
-        return []
+    if start_datetime is None or end_datetime is None:
+        appointments_data: list = calendar_service.get_events()
+        appointments: List[Appointment] = sort_appointments(appointments_data)
+    elif is_room_calendars_enabled():
+        appointments = list(
+            window_flights.do(
+                (start_datetime.isoformat(), end_datetime.isoformat()),
+                lambda: get_room_appointments(start_datetime, end_datetime),
+            )
+        )
+    else:
+        # The synced store already holds the whole primary calendar, so a
+        # window is cut from it rather than listed from the API again.
+        calendar_service.refresh_events()
+        appointments = sort_appointments(
+            calendar_service.events_between(start_datetime, end_datetime),
+            presorted=True,
+        )
 
-    print("get_appointments(): ", appointments)
     return appointments
 
 
+def get_calendar_metrics() -> dict[str, dict]:
+    return {
+        "http_pool": calendar_service.http_pool_metrics(),
+        "refresh_flights": calendar_service.refresh_flights.metrics(),
+        "window_flights": window_flights.metrics(),
+        "circuit_breaker": calendar_service.breaker.metrics(),
+        "request_executor": calendar_service.request_executor.metrics(),
+        "staleness_seconds": {"events": calendar_service.staleness_seconds()},
+    }
+
+
 def format_time_slots(time_slots: List[Tuple[datetime, datetime]]) -> List[List[str]]:
     return [
         [start.strftime("%#I:%M %p"), end.strftime("%#I:%M %p")]
@@ -68,78 +530,128 @@ def format_time_slots(time_slots: List[Tuple[datetime, datetime]]) -> List[List[
     ]
 
 
+def is_invalid_request(
+    start_datetime: datetime,
+    end_datetime: datetime,
+    number_of_people: int,
+    now: datetime,
+) -> bool:
+    if number_of_people < 1 or number_of_people > get_room_registry().max_capacity:
+        return True
+    if end_datetime.date() != start_datetime.date():
+        return True
+    return end_datetime < now
+
+
 def appointments_overlap(
-    start_datetime: datetime, end_datetime: datetime, number_of_people: int
+    start_datetime: datetime,
+    end_datetime: datetime,
+    number_of_people: int,
+    snapshot: Optional[AppointmentSnapshot] = None,
 ) -> Tuple[bool, str]:
 
-    if number_of_people < 1 or number_of_people > LARGE_ROOM_MAX_CAPACITY:
+    if is_invalid_request(
+        start_datetime, end_datetime, number_of_people, get_current_datetime()
+    ):
         return (True, "Error")
 
-    if end_datetime.date() != start_datetime.date():
-        return (True, "Error")
+    if snapshot is None:
+        snapshot = AppointmentSnapshot.capture_for(start_datetime, end_datetime)
 
-    if end_datetime < get_current_datetime():
-        return (True, "Error")
-
-    appointments: List[Tuple[datetime, datetime, int, str]] = get_appointments()
+    start: int = to_epoch(start_datetime)
+    end: int = to_epoch(end_datetime)
+    decision_key = (start, end, number_of_people)
+    if decision_key not in snapshot.decisions:
+        snapshot.decisions[decision_key] = find_available_room(
+            snapshot.room_index, start, end, number_of_people
+        )
+    return snapshot.decisions[decision_key]
 
-    if not appointments:
-        if 1 <= number_of_people <= SMALL_ROOM_MAX_CAPACITY:
-            rand_int = random.randint(0, 1)
-            if rand_int == 1:
-                return (False, "Launchpad")
-            return (False, "Wall Street")
-        if SMALL_ROOM_MAX_CAPACITY < number_of_people <= LARGE_ROOM_MAX_CAPACITY:
-            return (False, "Radio City")
 
-    is_launchpad_booked: bool = False
-    is_wall_street_booked: bool = False
+def availability_matrix(
+    intervals: Sequence[Tuple[datetime, datetime]],
+    party_sizes: Sequence[int],
+    snapshot: Optional[AppointmentSnapshot] = None,
+) -> List[List[Tuple[bool, str]]]:
+    if snapshot is None:
+        snapshot = AppointmentSnapshot.capture()
 
-    for time_slot in appointments:
-        print("time slot", time_slot)
-        print("additional guests", time_slot[2])
+    epoch_intervals: List[Tuple[int, int]] = [
+        (to_epoch(start_datetime), to_epoch(end_datetime))
+        for start_datetime, end_datetime in intervals
+    ]
+    interval_index = snapshot.room_index
+    if isinstance(interval_index, ReservationIndex) and intervals:
+        # The database mirror answers one range query per call; load the whole
+        # grid's range once and sweep it in memory instead.
+        interval_index = RoomIntervalIndex.from_appointments(
+            get_mirrored_appointments(
+                min(start for start, _ in intervals),
+                max(end for _, end in intervals),
+            )
+        )
+    has_appointments: bool = bool(interval_index)
+
+    rooms: set[str] = set()
+    for number_of_people in party_sizes:
+        rooms.update(candidate_rooms(number_of_people))
+    busy: dict[str, List[bool]] = {
+        room: interval_index.busy_mask(room, epoch_intervals) for room in rooms
+    }
+
+    now: datetime = get_current_datetime()
+    matrix: List[List[Tuple[bool, str]]] = []
+    for position, (start_datetime, end_datetime) in enumerate(intervals):
+        row: List[Tuple[bool, str]] = []
+        for number_of_people in party_sizes:
+            if is_invalid_request(start_datetime, end_datetime, number_of_people, now):
+                row.append((True, "Error"))
+                continue
+            row.append(
+                assign_room(
+                    number_of_people,
+                    lambda room: busy[room][position],
+                    has_appointments,
+                )
+            )
+        matrix.append(row)
+    return matrix
 
-        if (
-            1 <= number_of_people <= SMALL_ROOM_MAX_CAPACITY
-            and SMALL_ROOM_MAX_CAPACITY - 1 < time_slot[2] <= LARGE_ROOM_MAX_CAPACITY
-        ):
-            continue
-        if (
-            SMALL_ROOM_MAX_CAPACITY < number_of_people <= LARGE_ROOM_MAX_CAPACITY
-            and 1 - 1 <= time_slot[2] <= SMALL_ROOM_MAX_CAPACITY - 1
-        ):
-            continue
 
-        if (
-            (start_datetime < time_slot[0] < end_datetime)
-            or (time_slot[0] <= start_datetime < time_slot[1])
-            or (time_slot[0] < end_datetime <= time_slot[1])
-        ):
+def candidate_rooms(number_of_people: int) -> List[str]:
+    return [room.name for room in get_room_registry().candidate_rooms(number_of_people)]
 
-            if (
-                SMALL_ROOM_MAX_CAPACITY < number_of_people <= LARGE_ROOM_MAX_CAPACITY
-                and time_slot[3] == "Radio City"
-            ):
-                return (True, "Radio City")
 
-            if 1 <= number_of_people <= SMALL_ROOM_MAX_CAPACITY:
-                if time_slot[3] == "Launchpad":
-                    is_launchpad_booked = True
-                elif time_slot[3] == "Wall Street":
-                    is_wall_street_booked = True
+def find_available_room(
+    interval_index: RoomIntervalIndex,
+    start: int,
+    end: int,
+    number_of_people: int,
+) -> Tuple[bool, str]:
+    return assign_room(
+        number_of_people,
+        lambda room: interval_index.overlaps(room, start, end),
+        bool(interval_index),
+    )
 
-        if is_launchpad_booked and is_wall_street_booked:
-            return (True, "Both")
 
-    if 1 <= number_of_people <= SMALL_ROOM_MAX_CAPACITY:
-        if not is_launchpad_booked:
-            return (False, "Launchpad")
-        if not is_wall_street_booked:
-            return (False, "Wall Street")
-    elif SMALL_ROOM_MAX_CAPACITY < number_of_people <= LARGE_ROOM_MAX_CAPACITY:
-        return (False, "Radio City")
+def assign_room(
+    number_of_people: int,
+    is_room_busy: Callable[[str], bool],
+    has_appointments: bool = True,
+) -> Tuple[bool, str]:
+    rooms: List[str] = candidate_rooms(number_of_people)
+    if not rooms:
+        return (True, "Error")
+    if not has_appointments:
+        return (False, random.choice(rooms))
 
-    return (True, "end of func")
+    for room in rooms:
+        if not is_room_busy(room):
+            return (False, room)
+    if len(rooms) == 1:
+        return (True, rooms[0])
+    return (True, "Both" if len(rooms) == 2 else "All")
 
 
 def create_event(
@@ -150,7 +662,25 @@ def create_event(
     number_of_people: int,
     location_summary: str,
 ):
-    calendar_service.create_event(
+    return calendar_service.create_event(
+        name,
+        email,
+        start_datetime_formatted,
+        end_datetime_formatted,
+        number_of_people - 1,
+        location_summary,
+    )
+
+
+async def acreate_event(
+    name: str,
+    email: str,
+    start_datetime_formatted: str,
+    end_datetime_formatted: str,
+    number_of_people: int,
+    location_summary: str,
+):
+    return await async_calendar_service.create_event(
         name,
         email,
         start_datetime_formatted,
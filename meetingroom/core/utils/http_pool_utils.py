@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+import queue
+import threading
+import time
+
+
+class SharedCredentials:
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.refresh_lock = threading.Lock()
+        self.refresh_count: int = 0
+
+    @property
+    def valid(self) -> bool:
+        return self.credentials.valid
+
+    @property
+    def token(self) -> Optional[str]:
+        return self.credentials.token
+
+    def refresh(self, request):
+        stale_token: Optional[str] = self.credentials.token
+        with self.refresh_lock:
+            # Another transport may have refreshed while this one waited for the lock.
+            if self.credentials.valid and self.credentials.token != stale_token:
+                return
+            self.credentials.refresh(request)
+            self.refresh_count += 1
+
+    def apply(self, headers: dict, token: Optional[str] = None):
+        self.credentials.apply(headers, token=token)
+
+    def before_request(self, request, method: str, url: str, headers: dict):
+        if not self.credentials.valid:
+            self.refresh(request)
+        self.apply(headers)
+
+
+class HttpPool:
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int,
+        timeout: Optional[float] = None,
+    ):
+        self.factory = factory
+        self.size: int = size
+        self.timeout: Optional[float] = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created: int = 0
+        self.in_use: int = 0
+        self.checkouts: int = 0
+        self.waits: int = 0
+        self.total_wait_seconds: float = 0.0
+        self.max_wait_seconds: float = 0.0
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create: bool = self.created < self.size
+            if can_create:
+                self.created += 1
+        if can_create:
+            try:
+                return self.factory()
+            except Exception:
+                with self._lock:
+                    self.created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No HTTP transport became free within {self.timeout} seconds."
+            )
+
+    @contextmanager
+    def checkout(self) -> Iterator[Any]:
+        started: float = time.perf_counter()
+        transport = self._acquire()
+        waited: float = time.perf_counter() - started
+
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            if waited > 0.001:
+                self.waits += 1
+        try:
+            yield transport
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._idle.put(transport)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "in_use": self.in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "total_wait_seconds": self.total_wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "average_wait_seconds": (
+                    self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+                ),
+            }
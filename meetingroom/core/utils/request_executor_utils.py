@@ -0,0 +1,142 @@
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: Optional[float] = None):
+        self.rate_per_second: float = rate_per_second
+        self.capacity: float = capacity or rate_per_second
+        self.tokens: float = self.capacity
+        self.updated_at: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now: float = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.rate_per_second,
+            )
+            self.updated_at = now
+            # Callers that find the bucket empty queue up behind earlier reservations.
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate_per_second
+
+
+class RetryBudget:
+    def __init__(self, ratio: float = 0.1, minimum: float = 10, maximum: float = 100):
+        self.ratio: float = ratio
+        self.maximum: float = maximum
+        self.balance: float = minimum
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.balance = min(self.maximum, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class RequestExecutor:
+    def __init__(
+        self,
+        rate_limiter: TokenBucket,
+        retry_budget: RetryBudget,
+        is_retryable: Callable[[Exception, bool], bool],
+        max_attempts: int = 4,
+        base_delay_seconds: float = 0.5,
+        max_delay_seconds: float = 8,
+    ):
+        self.rate_limiter = rate_limiter
+        self.retry_budget = retry_budget
+        self.is_retryable = is_retryable
+        self.max_attempts: int = max_attempts
+        self.base_delay_seconds: float = base_delay_seconds
+        self.max_delay_seconds: float = max_delay_seconds
+        self._lock = threading.Lock()
+        self.counters: dict[str, float] = {
+            "requests": 0,
+            "attempts": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "rate_limit_wait_seconds": 0.0,
+            "retry_budget_exhausted": 0,
+            "failures": 0,
+        }
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def get_retry_delay(self, attempt: int) -> float:
+        delay: float = min(
+            self.max_delay_seconds, self.base_delay_seconds * 2 ** (attempt - 1)
+        )
+        return random.uniform(delay / 2, delay)
+
+    def _rate_limit_delay(self) -> float:
+        delay: float = self.rate_limiter.reserve()
+        self._count("attempts")
+        if delay > 0:
+            self._count("rate_limited")
+            self._count("rate_limit_wait_seconds", delay)
+        return delay
+
+    def _should_retry(self, error: Exception, attempt: int, idempotent: bool) -> bool:
+        if attempt >= self.max_attempts or not self.is_retryable(error, idempotent):
+            return False
+        # Retries only spend what successful traffic has earned, so an outage
+        # cannot turn every request into max_attempts requests.
+        if not self.retry_budget.withdraw():
+            self._count("retry_budget_exhausted")
+            return False
+        self._count("retries")
+        return True
+
+    def run(self, function: Callable[[], Any], idempotent: bool = True) -> Any:
+        self._count("requests")
+        self.retry_budget.deposit()
+        attempt: int = 0
+        while True:
+            attempt += 1
+            time.sleep(self._rate_limit_delay())
+            try:
+                return function()
+            except Exception as error:
+                if not self._should_retry(error, attempt, idempotent):
+                    self._count("failures")
+                    raise
+            time.sleep(self.get_retry_delay(attempt))
+
+    async def arun(
+        self, function: Callable[[], Awaitable[Any]], idempotent: bool = True
+    ) -> Any:
+        self._count("requests")
+        self.retry_budget.deposit()
+        attempt: int = 0
+        while True:
+            attempt += 1
+            await asyncio.sleep(self._rate_limit_delay())
+            try:
+                return await function()
+            except Exception as error:
+                if not self._should_retry(error, attempt, idempotent):
+                    self._count("failures")
+                    raise
+            await asyncio.sleep(self.get_retry_delay(attempt))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            metrics: dict = dict(self.counters)
+        metrics["retry_budget_balance"] = self.retry_budget.balance
+        return metrics
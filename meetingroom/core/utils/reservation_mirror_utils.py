@@ -0,0 +1,115 @@
+from datetime import datetime
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from typing import Hashable, List, Optional, Tuple
+from ..models import MirrorSync, Room, Reservation
+from .appointment_utils import Appointment, from_epoch, intern_room, to_epoch
+
+
+def is_reservation_mirror_enabled() -> bool:
+    return settings.RESERVATION_MIRROR_ENABLED
+
+
+def get_room(name: str) -> Room:
+    room, _ = Room.objects.get_or_create(name=name)
+    return room
+
+
+def reservation_fields(appointment: Appointment) -> dict:
+    return {
+        "room": get_room(appointment.room),
+        "start": appointment.start_datetime,
+        "end": appointment.end_datetime,
+        "additional_guests": appointment.additional_guests,
+    }
+
+
+def mirror_reservations(
+    updated_appointments: List[Tuple[str, Optional[Appointment]]],
+    removed_event_ids: List[str],
+    full_sync: bool,
+):
+    with transaction.atomic():
+        if full_sync:
+            Reservation.objects.all().delete()
+        if removed_event_ids:
+            Reservation.objects.filter(event_id__in=removed_event_ids).delete()
+
+        for event_id, appointment in updated_appointments:
+            if appointment is None:
+                Reservation.objects.filter(event_id=event_id).delete()
+                continue
+            Reservation.objects.update_or_create(
+                event_id=event_id, defaults=reservation_fields(appointment)
+            )
+
+
+def record_mirror_sync(synced_at: float):
+    MirrorSync.objects.update_or_create(
+        pk=1,
+        defaults={
+            "synced_at": datetime.fromtimestamp(
+                synced_at, timezone.get_current_timezone()
+            )
+        },
+    )
+
+
+def get_mirror_staleness_seconds() -> Optional[float]:
+    synced_at: Optional[datetime] = (
+        MirrorSync.objects.filter(pk=1).values_list("synced_at", flat=True).first()
+    )
+    if synced_at is None:
+        return None
+    return (timezone.now() - synced_at).total_seconds()
+
+
+def get_mirrored_appointments(
+    start_datetime: datetime, end_datetime: datetime
+) -> List[Appointment]:
+    return [
+        Appointment(
+            to_epoch(start), to_epoch(end), additional_guests, intern_room(room)
+        )
+        for start, end, additional_guests, room in Reservation.objects.filter(
+            start__lt=end_datetime, end__gt=start_datetime
+        )
+        .order_by("start", "end")
+        .values_list("start", "end", "additional_guests", "room__name")
+    ]
+
+
+class ReservationIndex:
+    def __bool__(self) -> bool:
+        return Reservation.objects.exists()
+
+    def __len__(self) -> int:
+        return Reservation.objects.count()
+
+    def add(
+        self,
+        appointment: Appointment,
+        key: Optional[Hashable] = None,
+    ):
+        if key is None:
+            return
+        Reservation.objects.update_or_create(
+            event_id=key, defaults=reservation_fields(appointment)
+        )
+
+    def discard(self, key: Hashable):
+        Reservation.objects.filter(event_id=key).delete()
+
+    def conflicts(self, room: str, start: int, end: int) -> List[Tuple[int, int]]:
+        return [
+            (to_epoch(reservation_start), to_epoch(reservation_end))
+            for reservation_start, reservation_end in Reservation.objects.filter(
+                room__name=room, start__lt=from_epoch(end), end__gt=from_epoch(start)
+            ).values_list("start", "end")
+        ]
+
+    def overlaps(self, room: str, start: int, end: int) -> bool:
+        return Reservation.objects.filter(
+            room__name=room, start__lt=from_epoch(end), end__gt=from_epoch(start)
+        ).exists()
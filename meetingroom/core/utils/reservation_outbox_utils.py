@@ -0,0 +1,272 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.http import HttpRequest, JsonResponse
+from django.utils import timezone
+from typing import Hashable, List, Optional, Tuple
+from ..models import Reservation, ReservationRequest
+from .appointment_utils import Appointment, from_epoch, parse_epoch, to_epoch
+from .booking_utils import claim_room
+from .google_calendar_service import http_error_status
+from .google_calendar_utils import AppointmentSnapshot, calendar_service
+from .reservation_mirror_utils import get_room, is_reservation_mirror_enabled
+import random
+
+OUTBOX_MAX_ATTEMPTS: int = 8
+OUTBOX_BASE_DELAY_SECONDS: float = 2.0
+OUTBOX_MAX_DELAY_SECONDS: float = 15 * 60.0
+OUTBOX_SEND_LEASE_SECONDS: float = 5 * 60.0
+OUTBOX_ACTIVE_STATUSES: List[str] = [
+    ReservationRequest.PENDING,
+    ReservationRequest.SENDING,
+]
+# A confirmed reservation keeps its slot until the event shows up in what this
+# process books against, but no longer than this in case it was deleted since.
+OUTBOX_CONFIRMED_HOLD_SECONDS: float = 10 * 60.0
+
+
+def is_calendar_outbox_enabled() -> bool:
+    return settings.CALENDAR_OUTBOX_ENABLED
+
+
+def get_synced_event_ids(event_ids: List[str]) -> set[str]:
+    if not event_ids:
+        return set()
+    if is_reservation_mirror_enabled():
+        return set(
+            Reservation.objects.filter(event_id__in=event_ids).values_list(
+                "event_id", flat=True
+            )
+        )
+    return calendar_service.stored_event_ids().intersection(event_ids)
+
+
+def get_unsynced_reservations(**filters) -> List[Tuple[datetime, datetime]]:
+    confirmed_after: datetime = timezone.now() - timedelta(
+        seconds=OUTBOX_CONFIRMED_HOLD_SECONDS
+    )
+    reservations: List[Tuple[str, datetime, datetime]] = list(
+        ReservationRequest.objects.filter(
+            Q(status__in=OUTBOX_ACTIVE_STATUSES)
+            | Q(status=ReservationRequest.CONFIRMED, confirmed_at__gt=confirmed_after),
+            **filters,
+        ).values_list("event_id", "start", "end")
+    )
+    synced_event_ids: set[str] = get_synced_event_ids(
+        [event_id for event_id, _, _ in reservations]
+    )
+    return [
+        (start, end)
+        for event_id, start, end in reservations
+        if event_id not in synced_event_ids
+    ]
+
+
+class PendingReservationIndex:
+    def __bool__(self) -> bool:
+        return bool(get_unsynced_reservations())
+
+    def overlaps(self, room: str, start: int, end: int) -> bool:
+        return bool(self.conflicts(room, start, end))
+
+    def conflicts(self, room: str, start: int, end: int) -> List[Tuple[int, int]]:
+        return [
+            (to_epoch(reservation_start), to_epoch(reservation_end))
+            for reservation_start, reservation_end in get_unsynced_reservations(
+                room__name=room,
+                start__lt=from_epoch(end),
+                end__gt=from_epoch(start),
+            )
+        ]
+
+    # Queued rows are written by queue_room, so holds need no extra bookkeeping.
+    def add(self, appointment: Appointment, key: Hashable):
+        pass
+
+    def discard(self, key: Hashable):
+        pass
+
+
+def queue_room(
+    name: str,
+    email: str,
+    start_datetime: datetime,
+    end_datetime: datetime,
+    number_of_people: int,
+    snapshot: AppointmentSnapshot,
+) -> Tuple[bool, str, Optional[ReservationRequest]]:
+    with claim_room(
+        start_datetime,
+        end_datetime,
+        number_of_people,
+        snapshot,
+        PendingReservationIndex(),
+    ) as (has_time_conflict, location, _):
+        if has_time_conflict:
+            return (True, location, None)
+
+        reservation: ReservationRequest = ReservationRequest.objects.create(
+            name=name,
+            email=email,
+            room=get_room(location),
+            start=start_datetime,
+            end=end_datetime,
+            number_of_people=number_of_people,
+        )
+        # The queued row is the hold: PendingReservationIndex reports it until
+        # the worker fails it or its event is synced. A hold in the in-memory
+        # index would outlive a failed send, since no sync ever removes an event
+        # that was never created.
+
+    return (False, location, reservation)
+
+
+def claim_due_reservations(limit: int) -> List[int]:
+    now: datetime = timezone.now()
+    due_ids: List[int] = list(
+        ReservationRequest.objects.filter(
+            Q(status=ReservationRequest.PENDING)
+            # A send that never finished (crashed worker) is retried once its lease runs out.
+            | Q(status=ReservationRequest.SENDING),
+            next_attempt_at__lte=now,
+        )
+        .order_by("next_attempt_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+
+    claimed_ids: List[int] = []
+    for reservation_id in due_ids:
+        claimed: int = ReservationRequest.objects.filter(
+            pk=reservation_id,
+            status__in=OUTBOX_ACTIVE_STATUSES,
+            next_attempt_at__lte=now,
+        ).update(
+            status=ReservationRequest.SENDING,
+            next_attempt_at=now + timedelta(seconds=OUTBOX_SEND_LEASE_SECONDS),
+        )
+        if claimed:
+            claimed_ids.append(reservation_id)
+    return claimed_ids
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    delay: float = min(
+        OUTBOX_MAX_DELAY_SECONDS, OUTBOX_BASE_DELAY_SECONDS * 2 ** (attempts - 1)
+    )
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def is_retryable(error: Exception) -> bool:
+    status: Optional[int] = http_error_status(error)
+    if status is not None:
+        return status in (403, 429) or status >= 500
+    return True
+
+
+def is_reservation_event(stored_event: dict, event: dict) -> bool:
+    return (
+        stored_event.get("status") != "cancelled"
+        and stored_event.get("summary") == event["summary"]
+        and "dateTime" in stored_event.get("start", {})
+        and parse_epoch(stored_event["start"]["dateTime"])
+        == parse_epoch(event["start"]["dateTime"])
+    )
+
+
+def insert_reservation_event(event: dict):
+    try:
+        calendar_service.insert_event(event)
+    except Exception as e:
+        # The id is taken. That is our own event when an earlier attempt created
+        # it before failing to report back, but a deleted event keeps its id too,
+        # so a conflict only counts as sent once the stored event matches.
+        if http_error_status(e) != 409 or not is_reservation_event(
+            calendar_service.get_event(event["id"]), event
+        ):
+            raise
+
+
+def send_reservation(reservation_id: int) -> str:
+    reservation: ReservationRequest = ReservationRequest.objects.select_related(
+        "room"
+    ).get(pk=reservation_id)
+    event: dict = calendar_service.build_event(
+        reservation.name,
+        reservation.email,
+        timezone.localtime(reservation.start).isoformat(),
+        timezone.localtime(reservation.end).isoformat(),
+        reservation.number_of_people - 1,
+        reservation.room.name,
+        reservation.event_id,
+    )
+
+    try:
+        insert_reservation_event(event)
+        reservation.status = ReservationRequest.CONFIRMED
+        reservation.confirmed_at = timezone.now()
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+        print("send reservation")
+        reservation.attempts += 1
+        reservation.last_error = str(e)
+        if is_retryable(e) and reservation.attempts < OUTBOX_MAX_ATTEMPTS:
+            reservation.status = ReservationRequest.PENDING
+            reservation.next_attempt_at = timezone.now() + get_retry_delay(
+                reservation.attempts
+            )
+        else:
+            reservation.status = ReservationRequest.FAILED
+
+    reservation.save(
+        update_fields=[
+            "status",
+            "attempts",
+            "last_error",
+            "next_attempt_at",
+            "confirmed_at",
+        ]
+    )
+    return reservation.status
+
+
+def send_reservation_in_worker(reservation_id: int) -> str:
+    try:
+        return send_reservation(reservation_id)
+    finally:
+        connection.close()
+
+
+def drain_outbox(max_workers: int = 4, limit: int = 100) -> int:
+    reservation_ids: List[int] = claim_due_reservations(limit)
+    if max_workers <= 1:
+        for reservation_id in reservation_ids:
+            send_reservation(reservation_id)
+        return len(reservation_ids)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(send_reservation_in_worker, reservation_ids))
+    return len(reservation_ids)
+
+
+def get_reservation_status(req: HttpRequest, reservation_id: int) -> JsonResponse:
+    reservation: Optional[ReservationRequest] = (
+        ReservationRequest.objects.select_related("room")
+        .filter(pk=reservation_id)
+        .first()
+    )
+    if reservation is None:
+        return JsonResponse({"error": "Reservation not found"}, status=404)
+
+    return JsonResponse(
+        {
+            "id": reservation.pk,
+            "status": reservation.status,
+            "room": reservation.room.name,
+            "start": reservation.start.isoformat(),
+            "end": reservation.end.isoformat(),
+            "attempts": reservation.attempts,
+            "last_error": reservation.last_error,
+        }
+    )
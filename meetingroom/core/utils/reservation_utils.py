@@ -1,13 +1,20 @@
+from asgiref.sync import sync_to_async
+from .booking_utils import abook_room
+from .reservation_outbox_utils import is_calendar_outbox_enabled, queue_room
+from .slot_finder_utils import suggest_free_slots
 from .google_calendar_utils import (
+    AppointmentSnapshot,
     get_current_datetime,
     appointments_overlap,
-    create_event,
     get_appointments,
 )
 from datetime import time, datetime
 from typing import List, Tuple, Optional
 from django.http import HttpResponse, HttpRequest
-from ..forms import EventForm
+
+# core.forms imports core.utils, so bind the module and look EventForm up on use.
+from .. import forms
+from ..models import ReservationRequest
 from django.shortcuts import render
 from .utils import handle_error
 
@@ -16,7 +23,7 @@ def render_reservation_form(
     req: HttpRequest,
 ) -> HttpResponse:
     context = {
-        "form": EventForm(),
+        "form": forms.EventForm(),
         "now": get_current_datetime(),
     }
     return render(req, "create_event.html", context)
@@ -44,10 +51,10 @@ def get_form_data(form_data: dict) -> Tuple[datetime, datetime, str, str, int]:
     return start_datetime, end_datetime, name, email, number_of_people
 
 
-def process_reservation_form(
+async def aprocess_reservation_form(
     req: HttpRequest,
 ) -> HttpResponse:
-    form = EventForm(req.POST)
+    form = forms.EventForm(req.POST)
     context = {
         "form": form,
         "now": get_current_datetime(),
@@ -65,25 +72,42 @@ def process_reservation_form(
             form.cleaned_data
         )
 
-        if appointments_overlap(start_datetime, end_datetime, number_of_people)[0]:
+        snapshot: AppointmentSnapshot = await AppointmentSnapshot.acapture_for(
+            start_datetime, end_datetime
+        )
+        if snapshot.is_too_stale_to_book:
+            context["calendar_is_stale"] = True
+            return render(req, "create_event.html", context, status=503)
+
+        # The snapshot may be backed by the database mirror.
+        has_time_conflict, location = await sync_to_async(appointments_overlap)(
+            start_datetime, end_datetime, number_of_people, snapshot
+        )
+        if has_time_conflict:
             context["has_time_conflict"] = True
+            if location != "Error":
+                context["suggested_slots"] = await sync_to_async(suggest_free_slots)(
+                    snapshot, start_datetime, end_datetime, number_of_people
+                )
             return render(req, "create_event.html", context)
 
-        start_datetime_formatted: str = start_datetime.strftime("%Y-%m-%dT%H:%M:%S%z")
-        end_datetime_formatted: str = end_datetime.strftime("%Y-%m-%dT%H:%M:%S%z")
-
-        location: str = appointments_overlap(
-            start_datetime, end_datetime, number_of_people
-        )[1]
+        reservation: Optional[ReservationRequest] = None
+        if is_calendar_outbox_enabled():
+            has_time_conflict, location, reservation = await sync_to_async(queue_room)(
+                name, email, start_datetime, end_datetime, number_of_people, snapshot
+            )
+        else:
+            has_time_conflict, location = await abook_room(
+                name, email, start_datetime, end_datetime, number_of_people, snapshot
+            )
+        if has_time_conflict:
+            context["has_time_conflict"] = True
+            return render(req, "create_event.html", context)
 
-        create_event(
-            name,
-            email,
-            start_datetime_formatted,
-            end_datetime_formatted,
-            number_of_people,
-            location,
+        return render(
+            req,
+            "success.html",
+            {"message": "Event scheduled successfully", "reservation": reservation},
         )
-        return render(req, "success.html", {"message": "Event scheduled successfully"})
     except Exception as e:
         return handle_error(req, e, "process reservation form")
@@ -1,2 +0,0 @@
-SMALL_ROOM_MAX_CAPACITY: int = 4
-LARGE_ROOM_MAX_CAPACITY: int = 10
@@ -0,0 +1,198 @@
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Hashable, Iterable, List, Optional, Sequence, Tuple
+from .appointment_utils import Appointment, intern_room
+import threading
+
+
+class RoomIntervals:
+    # Intervals are kept in start order, split into blocks of at most
+    # 2 * BLOCK_SIZE. Each block keeps the running max of its own ends and the
+    # room keeps the running max across blocks, so after a booking or a sync
+    # change the next read rebuilds one block plus one entry per block instead
+    # of every interval.
+    BLOCK_SIZE = 256
+
+    def __init__(self):
+        self._starts: List[List[int]] = []
+        self._entries: List[List[Tuple[int, int, Hashable]]] = []
+        # _max_ends[b][i] is the latest end among the first i + 1 intervals of
+        # block b, and _block_max_ends[b] the latest end in blocks 0..b. Both
+        # are None until a read needs them again.
+        self._max_ends: List[Optional[List[int]]] = []
+        self._block_max_ends: Optional[List[int]] = None
+        self._firsts: List[int] = []
+        self._length: int = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def add(self, start: int, end: int, key: Hashable):
+        if not self._entries:
+            self._starts.append([])
+            self._entries.append([])
+            self._max_ends.append([])
+            self._firsts.append(start)
+        block: int = max(bisect_right(self._firsts, start) - 1, 0)
+        position: int = bisect_right(self._starts[block], start)
+        self._starts[block].insert(position, start)
+        self._entries[block].insert(position, (start, end, key))
+        self._length += 1
+
+        if len(self._entries[block]) > 2 * self.BLOCK_SIZE:
+            self._split(block)
+        else:
+            self._invalidate(block)
+
+    def remove(self, start: int, key: Hashable):
+        # Equal starts can straddle a block boundary, so begin one block early.
+        block: int = max(bisect_left(self._firsts, start) - 1, 0)
+        while block < len(self._entries) and self._firsts[block] <= start:
+            starts: List[int] = self._starts[block]
+            position: int = bisect_left(starts, start)
+            while position < len(starts) and starts[position] == start:
+                if self._entries[block][position][2] == key:
+                    del starts[position]
+                    del self._entries[block][position]
+                    self._length -= 1
+                    if starts:
+                        self._invalidate(block)
+                    else:
+                        del self._starts[block]
+                        del self._entries[block]
+                        del self._max_ends[block]
+                        del self._firsts[block]
+                        self._block_max_ends = None
+                    return
+                position += 1
+            block += 1
+
+    def _split(self, block: int):
+        half: int = len(self._entries[block]) // 2
+        starts: List[int] = self._starts[block]
+        entries: List[Tuple[int, int, Hashable]] = self._entries[block]
+        self._starts[block : block + 1] = [starts[:half], starts[half:]]
+        self._entries[block : block + 1] = [entries[:half], entries[half:]]
+        self._max_ends[block : block + 1] = [None, None]
+        self._firsts[block : block + 1] = [0, 0]
+        self._invalidate(block)
+        self._invalidate(block + 1)
+
+    def _invalidate(self, block: int):
+        self._max_ends[block] = None
+        self._block_max_ends = None
+        self._firsts[block] = self._starts[block][0]
+
+    def max_ends(self, block: int) -> List[int]:
+        max_ends: Optional[List[int]] = self._max_ends[block]
+        if max_ends is None:
+            max_ends = self._max_ends[block] = list(
+                accumulate((end for _, end, _ in self._entries[block]), max)
+            )
+        return max_ends
+
+    def block_max_ends(self) -> List[int]:
+        if self._block_max_ends is None:
+            self._block_max_ends = list(
+                accumulate(
+                    (self.max_ends(block)[-1] for block in range(len(self._entries))),
+                    max,
+                )
+            )
+        return self._block_max_ends
+
+    def overlaps(self, start: int, end: int) -> bool:
+        # An interval starting before `end` runs past `start` exactly when the
+        # latest end among the intervals starting before `end` is after `start`.
+        block: int = bisect_left(self._firsts, end) - 1
+        if block < 0:
+            return False
+        if block > 0 and self.block_max_ends()[block - 1] > start:
+            return True
+        high: int = bisect_left(self._starts[block], end)
+        return self.max_ends(block)[high - 1] > start
+
+    def conflicts(self, start: int, end: int) -> List[Tuple[int, int]]:
+        # Only blocks holding an interval that ends after `start` are scanned, so
+        # one long meeting does not turn every lookup into a scan of everything
+        # after it.
+        conflicts: List[Tuple[int, int]] = []
+        for block in range(bisect_left(self._firsts, end)):
+            if self.max_ends(block)[-1] <= start:
+                continue
+            for entry_start, entry_end, _ in self._entries[block]:
+                if entry_start >= end:
+                    break
+                if entry_end > start:
+                    conflicts.append((entry_start, entry_end))
+        return conflicts
+
+    def busy_mask(self, intervals: Sequence[Tuple[int, int]]) -> List[bool]:
+        return [self.overlaps(start, end) for start, end in intervals]
+
+
+class RoomIntervalIndex:
+    def __init__(self):
+        self._rooms: dict[int, RoomIntervals] = {}
+        self._keys: dict[Hashable, Tuple[int, int]] = {}
+        # Booking threads, the sync listener and every availability check share
+        # one index, so each mutation and read happens under this lock.
+        self.lock: threading.RLock = threading.RLock()
+
+    @classmethod
+    def from_appointments(
+        cls, appointments: Iterable[Appointment]
+    ) -> "RoomIntervalIndex":
+        index = cls()
+        for appointment in appointments:
+            index.add(appointment)
+        return index
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._keys)
+
+    def clear(self):
+        with self.lock:
+            self._rooms.clear()
+            self._keys.clear()
+
+    def add(
+        self,
+        appointment: Appointment,
+        key: Optional[Hashable] = None,
+    ):
+        key = appointment if key is None else key
+        with self.lock:
+            self.discard(key)
+            self._rooms.setdefault(appointment.room_id, RoomIntervals()).add(
+                appointment.start, appointment.end, key
+            )
+            self._keys[key] = (appointment.room_id, appointment.start)
+
+    def discard(self, key: Hashable):
+        with self.lock:
+            location: Optional[Tuple[int, int]] = self._keys.pop(key, None)
+            if location is None:
+                return
+            room_id, start = location
+            self._rooms[room_id].remove(start, key)
+
+    def conflicts(self, room: str, start: int, end: int) -> List[Tuple[int, int]]:
+        with self.lock:
+            intervals: Optional[RoomIntervals] = self._rooms.get(intern_room(room))
+            if intervals is None:
+                return []
+            return intervals.conflicts(start, end)
+
+    def overlaps(self, room: str, start: int, end: int) -> bool:
+        with self.lock:
+            intervals: Optional[RoomIntervals] = self._rooms.get(intern_room(room))
+            return intervals is not None and intervals.overlaps(start, end)
+
+    def busy_mask(self, room: str, intervals: Sequence[Tuple[int, int]]) -> List[bool]:
+        with self.lock:
+            room_intervals: Optional[RoomIntervals] = self._rooms.get(intern_room(room))
+            if room_intervals is None:
+                return [False] * len(intervals)
+            return room_intervals.busy_mask(intervals)
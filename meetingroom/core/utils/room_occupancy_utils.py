@@ -0,0 +1,128 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .appointment_utils import Appointment, from_epoch, intern_room, to_epoch
+import threading
+
+
+@lru_cache(maxsize=1024)
+def day_bounds(day: date) -> Tuple[int, int]:
+    return (
+        to_epoch(datetime.combine(day, time())),
+        to_epoch(datetime.combine(day + timedelta(days=1), time())),
+    )
+
+
+def iter_day_cells(start: int, end: int) -> Iterator[Tuple[date, int, int]]:
+    # Cells are whole minutes from local midnight, rounded outwards so a partly
+    # covered minute still counts as busy.
+    while start < end:
+        day: date = from_epoch(start).date()
+        day_start, day_end = day_bounds(day)
+        segment_end: int = min(end, day_end)
+        yield (day, (start - day_start) // 60, -(-(segment_end - day_start) // 60))
+        start = segment_end
+
+
+def cell_mask(first_cell: int, end_cell: int) -> int:
+    return ((1 << (end_cell - first_cell)) - 1) << first_cell
+
+
+class RoomOccupancyIndex:
+    def __init__(self):
+        # One bitmap per room-day, a couple of hundred bytes however busy the
+        # day is. To cancel a booking without clearing minutes another booking
+        # still covers, each booking also keeps its (first, end) cell range,
+        # and a cancellation rebuilds that day from the ranges left.
+        self._days: dict[Tuple[int, date], int] = {}
+        self._bookings: dict[Tuple[int, date], dict[Hashable, Tuple[int, int]]] = {}
+        self._keys: dict[Hashable, List[Tuple[int, date]]] = {}
+        # Shared by booking threads, the sync listener and availability checks.
+        self.lock: threading.RLock = threading.RLock()
+
+    @classmethod
+    def from_appointments(
+        cls, appointments: Iterable[Appointment]
+    ) -> "RoomOccupancyIndex":
+        index = cls()
+        for appointment in appointments:
+            index.add(appointment)
+        return index
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._keys)
+
+    def clear(self):
+        with self.lock:
+            self._days.clear()
+            self._bookings.clear()
+            self._keys.clear()
+
+    def add(
+        self,
+        appointment: Appointment,
+        key: Optional[Hashable] = None,
+    ):
+        key = appointment if key is None else key
+        with self.lock:
+            self.discard(key)
+            room_days: List[Tuple[int, date]] = []
+            for day, first_cell, end_cell in iter_day_cells(
+                appointment.start, appointment.end
+            ):
+                room_day: Tuple[int, date] = (appointment.room_id, day)
+                self._bookings.setdefault(room_day, {})[key] = (first_cell, end_cell)
+                self._days[room_day] = self._days.get(room_day, 0) | cell_mask(
+                    first_cell, end_cell
+                )
+                room_days.append(room_day)
+            self._keys[key] = room_days
+
+    def discard(self, key: Hashable):
+        with self.lock:
+            for room_day in self._keys.pop(key, []):
+                bookings: dict[Hashable, Tuple[int, int]] = self._bookings[room_day]
+                del bookings[key]
+                if not bookings:
+                    del self._bookings[room_day]
+                    del self._days[room_day]
+                    continue
+                occupancy: int = 0
+                for first_cell, end_cell in bookings.values():
+                    occupancy |= cell_mask(first_cell, end_cell)
+                self._days[room_day] = occupancy
+
+    def overlaps(self, room: str, start: int, end: int) -> bool:
+        with self.lock:
+            room_id: int = intern_room(room)
+            return any(
+                self._days.get((room_id, day), 0) & cell_mask(first_cell, end_cell)
+                for day, first_cell, end_cell in iter_day_cells(start, end)
+            )
+
+    def conflicts(self, room: str, start: int, end: int) -> List[Tuple[int, int]]:
+        with self.lock:
+            room_id: int = intern_room(room)
+            intervals: List[Tuple[int, int]] = []
+            for day, first_cell, end_cell in iter_day_cells(start, end):
+                busy: int = self._days.get((room_id, day), 0) & cell_mask(
+                    first_cell, end_cell
+                )
+                day_start, _ = day_bounds(day)
+                while busy:
+                    run_start: int = (busy & -busy).bit_length() - 1
+                    run = busy >> run_start
+                    run_length: int = (~run & (run + 1)).bit_length() - 1
+                    intervals.append(
+                        (
+                            day_start + run_start * 60,
+                            day_start + (run_start + run_length) * 60,
+                        )
+                    )
+                    busy &= ~cell_mask(run_start, run_start + run_length)
+            return intervals
+
+    def busy_mask(self, room: str, intervals: Sequence[Tuple[int, int]]) -> List[bool]:
+        with self.lock:
+            return [self.overlaps(room, start, end) for start, end in intervals]
@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from typing import Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from .appointment_utils import intern_room
+import threading
+
+
+class MeetingRoom:
+    __slots__ = ("id", "name", "capacity", "calendar_id", "timezone")
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        calendar_id: str = "",
+        timezone: Optional[str] = None,
+    ):
+        self.id: int = intern_room(name)
+        self.name: str = name
+        self.capacity: int = capacity
+        self.calendar_id: str = calendar_id
+        self.timezone: ZoneInfo = ZoneInfo(timezone or settings.TIME_ZONE)
+
+    def __repr__(self) -> str:
+        return f"MeetingRoom({self.name!r}, capacity={self.capacity})"
+
+
+class RoomRegistry:
+    def __init__(self, rooms: Iterable[MeetingRoom]):
+        # Sorting is stable, so rooms of one capacity keep their configured order,
+        # which is the order allocation tries them in.
+        self.rooms: List[MeetingRoom] = sorted(rooms, key=lambda room: room.capacity)
+        self.by_name: dict[str, MeetingRoom] = {room.name: room for room in self.rooms}
+        self.max_capacity: int = max((room.capacity for room in self.rooms), default=0)
+
+        # rooms_by_party_size[n] holds the rooms of the smallest capacity that
+        # seats n people, so picking candidates is a list lookup.
+        self.rooms_by_party_size: List[Tuple[MeetingRoom, ...]] = [()] * (
+            self.max_capacity + 1
+        )
+        smaller_capacity: int = 0
+        for capacity in sorted({room.capacity for room in self.rooms}):
+            bucket: Tuple[MeetingRoom, ...] = tuple(
+                room for room in self.rooms if room.capacity == capacity
+            )
+            for party_size in range(smaller_capacity + 1, capacity + 1):
+                self.rooms_by_party_size[party_size] = bucket
+            smaller_capacity = capacity
+
+    @classmethod
+    def from_settings(cls) -> "RoomRegistry":
+        return cls(
+            MeetingRoom(
+                room["name"],
+                int(room["capacity"]),
+                room.get("calendar_id", ""),
+                room.get("timezone"),
+            )
+            for room in settings.MEETING_ROOMS
+        )
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def get(self, name: str) -> Optional[MeetingRoom]:
+        return self.by_name.get(name)
+
+    def candidate_rooms(self, number_of_people: int) -> Tuple[MeetingRoom, ...]:
+        if 1 <= number_of_people <= self.max_capacity:
+            return self.rooms_by_party_size[number_of_people]
+        return ()
+
+    def calendars(self) -> dict[str, str]:
+        return {room.name: room.calendar_id for room in self.rooms}
+
+    def has_calendars(self) -> bool:
+        return all(room.calendar_id for room in self.rooms)
+
+
+room_registry: Optional[RoomRegistry] = None
+room_registry_lock: threading.Lock = threading.Lock()
+
+
+def get_room_registry() -> RoomRegistry:
+    global room_registry
+    registry: Optional[RoomRegistry] = room_registry
+    if registry is None:
+        with room_registry_lock:
+            registry = room_registry
+            if registry is None:
+                registry = room_registry = RoomRegistry.from_settings()
+    return registry
+
+
+def reset_room_registry(setting: str, **kwargs):
+    global room_registry
+    if setting in ("MEETING_ROOMS", "TIME_ZONE"):
+        with room_registry_lock:
+            room_registry = None
+
+
+setting_changed.connect(reset_room_registry)
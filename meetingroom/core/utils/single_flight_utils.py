@@ -0,0 +1,172 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Hashable, Iterator, Optional
+import asyncio
+import hashlib
+import os
+import threading
+import time
+
+SHARED_RESULT_TTL_SECONDS: int = 5
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: dict[Hashable, Flight] = {}
+        self._async_flights: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.calls: int = 0
+        self.executions: int = 0
+        self.coalesced: int = 0
+        self.total_wait_seconds: float = 0.0
+        self.max_wait_seconds: float = 0.0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            flight: Optional[Flight] = self._flights.get(key)
+            is_leader: bool = flight is None
+            if is_leader:
+                flight = self._flights[key] = Flight()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            return self._wait(flight)
+
+        try:
+            flight.result = self.execute(key, function)
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                self.executions += 1
+            flight.done.set()
+        return flight.result
+
+    def _wait(self, flight: Flight) -> Any:
+        started: float = time.perf_counter()
+        flight.done.wait()
+        self._record_wait(time.perf_counter() - started)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    # Async callers wait on a thread-safe future, so requests running on
+    # different event loops (one per request under WSGI) share one call too.
+    async def ado(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            self.calls += 1
+            future: Optional[Future] = self._async_flights.get(key)
+            is_leader: bool = future is None
+            if is_leader:
+                future = self._async_flights[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            started: float = time.perf_counter()
+            try:
+                # Shielded so a cancelled waiter does not cancel the leader's call.
+                return await asyncio.shield(asyncio.wrap_future(future))
+            finally:
+                self._record_wait(time.perf_counter() - started)
+
+        try:
+            result: Any = await function()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._async_flights[key]
+                self.executions += 1
+        return result
+
+    def execute(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        return function()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "coalesce_ratio": self.coalesced / self.calls if self.calls else 0.0,
+                "total_wait_seconds": self.total_wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+class SharedSingleFlight(SingleFlight):
+    def __init__(
+        self,
+        cache,
+        lock_directory: str,
+        ttl_seconds: int = SHARED_RESULT_TTL_SECONDS,
+    ):
+        super().__init__()
+        self.cache = cache
+        self.lock_directory: str = lock_directory
+        self.ttl_seconds: int = ttl_seconds
+        self.cache_hits: int = 0
+
+    def execute(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        cache_key: str = (
+            "single-flight:" + hashlib.sha256(repr(key).encode()).hexdigest()
+        )
+        missing = object()
+
+        result = self.cache.get(cache_key, missing)
+        if result is missing:
+            # The first process to take the lock fetches; the others find its result.
+            with self.file_lock(cache_key):
+                result = self.cache.get(cache_key, missing)
+                if result is missing:
+                    result = function()
+                    self.cache.set(cache_key, result, self.ttl_seconds)
+                    return result
+
+        with self._lock:
+            self.cache_hits += 1
+        return result
+
+    @contextmanager
+    def file_lock(self, name: str) -> Iterator[None]:
+        try:
+            import fcntl
+        except ImportError:
+            # No advisory file locks on this platform; the cache alone still
+            # absorbs most duplicate fetches.
+            yield
+            return
+
+        os.makedirs(self.lock_directory, exist_ok=True)
+        path: str = os.path.join(self.lock_directory, f"{name.split(':')[-1]}.lock")
+        with open(path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def metrics(self) -> dict:
+        metrics: dict = super().metrics()
+        metrics["cache_hits"] = self.cache_hits
+        return metrics
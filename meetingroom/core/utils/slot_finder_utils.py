@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from heapq import merge
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+from .appointment_utils import from_epoch, to_epoch
+from .booking_utils import BookingIndex
+from .google_calendar_utils import (
+    AppointmentSnapshot,
+    candidate_rooms,
+    get_current_datetime,
+    room_index,
+)
+from .reservation_outbox_utils import (
+    PendingReservationIndex,
+    is_calendar_outbox_enabled,
+)
+from .utils import handle_error
+
+SLOT_STEP_SECONDS: int = 15 * 60
+FREE_SLOT_DEFAULT_COUNT: int = 5
+FREE_SLOT_MAX_COUNT: int = 50
+FREE_SLOT_SUGGESTIONS: int = 3
+FREE_SLOT_DEFAULT_RANGE: timedelta = timedelta(days=7)
+FREE_SLOT_MAX_RANGE: timedelta = timedelta(days=31)
+
+
+def merge_busy_intervals(
+    intervals: Iterable[Tuple[int, int]],
+) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def align_to_step(seconds: int, step: int = SLOT_STEP_SECONDS) -> int:
+    return -(-seconds // step) * step
+
+
+def iter_free_starts(
+    busy: List[Tuple[int, int]],
+    start: int,
+    end: int,
+    duration: int,
+    step: int = SLOT_STEP_SECONDS,
+) -> Iterator[int]:
+    candidate: int = align_to_step(start, step)
+    for busy_start, busy_end in [*busy, (end, end)]:
+        while candidate + duration <= min(busy_start, end):
+            # Bookings have to start and end on the same day.
+            if from_epoch(candidate).date() == from_epoch(candidate + duration).date():
+                yield candidate
+            candidate += step
+        candidate = max(candidate, align_to_step(busy_end, step))
+
+
+def iter_room_slots(
+    interval_index, room: str, start: int, end: int, duration: int
+) -> Iterator[Tuple[int, str]]:
+    busy: List[Tuple[int, int]] = merge_busy_intervals(
+        interval_index.conflicts(room, start, end)
+    )
+    for slot_start in iter_free_starts(busy, start, end, duration):
+        yield (slot_start, room)
+
+
+def find_free_slots(
+    interval_index,
+    number_of_people: int,
+    start: int,
+    end: int,
+    duration: int,
+    count: int = FREE_SLOT_DEFAULT_COUNT,
+) -> List[Tuple[str, int, int]]:
+    # Each room yields its free starts in order, so merging the streams and
+    # stopping after `count` only sweeps as far as the answer needs.
+    slots: Iterator[Tuple[int, str]] = merge(
+        *(
+            iter_room_slots(interval_index, room, start, end, duration)
+            for room in candidate_rooms(number_of_people)
+        )
+    )
+    return [
+        (room, slot_start, slot_start + duration)
+        for slot_start, room in islice(slots, count)
+    ]
+
+
+def get_slot_index(snapshot: AppointmentSnapshot) -> BookingIndex:
+    if is_calendar_outbox_enabled():
+        return BookingIndex(snapshot.room_index, room_index, PendingReservationIndex())
+    return BookingIndex(snapshot.room_index, room_index)
+
+
+def format_free_slots(slots: List[Tuple[str, int, int]]) -> List[dict]:
+    return [
+        {"room": room, "start": from_epoch(start), "end": from_epoch(end)}
+        for room, start, end in slots
+    ]
+
+
+def suggest_free_slots(
+    snapshot: AppointmentSnapshot,
+    start_datetime: datetime,
+    end_datetime: datetime,
+    number_of_people: int,
+) -> List[dict]:
+    start: int = max(to_epoch(start_datetime), to_epoch(get_current_datetime()))
+    return format_free_slots(
+        find_free_slots(
+            get_slot_index(snapshot),
+            number_of_people,
+            start,
+            start + int(FREE_SLOT_DEFAULT_RANGE.total_seconds()),
+            to_epoch(end_datetime) - to_epoch(start_datetime),
+            FREE_SLOT_SUGGESTIONS,
+        )
+    )
+
+
+def parse_query_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def get_free_slots(req: HttpRequest) -> HttpResponse:
+    try:
+        duration: timedelta = timedelta(minutes=int(req.GET["duration"]))
+        number_of_people: int = int(req.GET["number_of_people"])
+        count: int = int(req.GET.get("count", FREE_SLOT_DEFAULT_COUNT))
+        now: datetime = get_current_datetime()
+        start_datetime: datetime = parse_query_datetime(req.GET.get("start")) or now
+        end_datetime: datetime = (
+            parse_query_datetime(req.GET.get("end"))
+            or start_datetime + FREE_SLOT_DEFAULT_RANGE
+        )
+    except (KeyError, ValueError):
+        return JsonResponse(
+            {"error": "duration and number_of_people are required"}, status=400
+        )
+
+    start: int = max(to_epoch(start_datetime), to_epoch(now))
+    end: int = to_epoch(end_datetime)
+    if not timedelta(0) < duration < timedelta(days=1):
+        return JsonResponse({"error": "Invalid duration"}, status=400)
+    if not candidate_rooms(number_of_people):
+        return JsonResponse({"error": "Invalid number of people"}, status=400)
+    if not 1 <= count <= FREE_SLOT_MAX_COUNT:
+        return JsonResponse({"error": "Invalid count"}, status=400)
+    if not 0 < end - start <= FREE_SLOT_MAX_RANGE.total_seconds():
+        return JsonResponse({"error": "Invalid date range"}, status=400)
+
+    try:
+        snapshot: AppointmentSnapshot = AppointmentSnapshot.capture()
+        if snapshot.is_too_stale_to_book:
+            return JsonResponse(
+                {"error": "Room availability could not be confirmed"}, status=503
+            )
+        slots: List[Tuple[str, int, int]] = find_free_slots(
+            get_slot_index(snapshot),
+            number_of_people,
+            start,
+            end,
+            int(duration.total_seconds()),
+            count,
+        )
+    except Exception as e:
+        return handle_error(req, e, "get free slots")
+
+    return JsonResponse({"slots": format_free_slots(slots)})
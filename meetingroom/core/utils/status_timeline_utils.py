@@ -0,0 +1,49 @@
+from bisect import bisect_right
+from collections import Counter
+from datetime import datetime
+from typing import FrozenSet, Iterable, List, Optional
+from .appointment_utils import Appointment, from_epoch, room_names, to_epoch
+
+
+class RoomStatusTimeline:
+    def __init__(self, appointments: Iterable[Appointment]):
+        changes: dict[int, Counter] = {}
+        for appointment in appointments:
+            if appointment.end <= appointment.start:
+                continue
+            changes.setdefault(appointment.start, Counter())[appointment.room_id] += 1
+            changes.setdefault(appointment.end, Counter())[appointment.room_id] -= 1
+
+        self.instants: List[int] = []
+        self.states: List[FrozenSet[str]] = []
+
+        in_progress: Counter = Counter()
+        for instant in sorted(changes):
+            in_progress.update(changes[instant])
+            busy_rooms = frozenset(
+                room_names[room_id]
+                for room_id, count in in_progress.items()
+                if count > 0
+            )
+            if self.states and self.states[-1] == busy_rooms:
+                continue
+            self.instants.append(instant)
+            self.states.append(busy_rooms)
+
+    def busy_rooms_at(self, moment: datetime) -> FrozenSet[str]:
+        position: int = bisect_right(self.instants, to_epoch(moment))
+        if position == 0:
+            return frozenset()
+        return self.states[position - 1]
+
+    def is_busy(self, moment: datetime, room: Optional[str] = None) -> bool:
+        busy_rooms: FrozenSet[str] = self.busy_rooms_at(moment)
+        if room is None:
+            return bool(busy_rooms)
+        return room in busy_rooms
+
+    def next_transition(self, moment: datetime) -> Optional[datetime]:
+        position: int = bisect_right(self.instants, to_epoch(moment))
+        if position == len(self.instants):
+            return None
+        return from_epoch(self.instants[position])
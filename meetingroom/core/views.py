@@ -1,33 +1,59 @@
-from django.http import HttpResponse, HttpRequest
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpRequest, JsonResponse
 from django.shortcuts import render
-from googleapiclient.errors import HttpError
-from datetime import datetime
-from typing import List, Tuple
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 
 from .utils import (
-    get_appointments,
-    is_current_time_between,
+    AppointmentSnapshot,
+    aprocess_reservation_form,
+    async_calendar_service,
+    get_room_status,
     handle_error,
     render_reservation_form,
-    process_reservation_form,
+    process_calendar_notification,
+    get_reservation_status,
+    get_free_slots,
+    get_calendar_metrics,
+    http_error_status,
 )
 
 
-def index(req: HttpRequest) -> HttpResponse:
+async def index(req: HttpRequest) -> HttpResponse:
     try:
-        appointments: List[Tuple[datetime, datetime]] = get_appointments()
-        is_available: bool = not (
-            appointments and is_current_time_between(*appointments[0])
-        )
-        context: dict[str, bool] = {"is_available": is_available}
+        async with async_calendar_service.session():
+            snapshot: AppointmentSnapshot = await AppointmentSnapshot.acapture()
+        context: dict[str, object] = await sync_to_async(get_room_status)(snapshot)
         return render(req, "index.html", context)
-    except HttpError as error:
+    except Exception as error:
+        if http_error_status(error) is None:
+            raise
         return handle_error(req, error, "index")
 
 
-def book_reservation(req: HttpRequest) -> HttpResponse:
+async def book_reservation(req: HttpRequest) -> HttpResponse:
 
     if req.method != "POST":
         return render_reservation_form(req)
 
-    return process_reservation_form(req)
+    async with async_calendar_service.session():
+        return await aprocess_reservation_form(req)
+
+
+def reservation_status(req: HttpRequest, reservation_id: int) -> HttpResponse:
+    return get_reservation_status(req, reservation_id)
+
+
+def free_slots(req: HttpRequest) -> HttpResponse:
+    return get_free_slots(req)
+
+
+@csrf_exempt
+@require_POST
+def calendar_notifications(req: HttpRequest) -> HttpResponse:
+    return process_calendar_notification(req)
+
+
+@require_GET
+def calendar_metrics(req: HttpRequest) -> JsonResponse:
+    return JsonResponse(get_calendar_metrics())
@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meetingroom.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings
+
+if settings.GOOGLE_CALENDAR_WARM_UP:
+    from core.utils.google_calendar_utils import warm_up_calendar_service
+
+    warm_up_calendar_service()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
+import json
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -122,3 +123,84 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Google Calendar push notifications
+# https://developers.google.com/calendar/api/guides/push
+
+GOOGLE_CALENDAR_WEBHOOK_URL = os.environ.get('GOOGLE_CALENDAR_WEBHOOK_URL', '')
+
+# Authenticate and load the calendar when a server worker boots instead of on
+# its first request. Management commands and tests never warm up.
+
+GOOGLE_CALENDAR_WARM_UP = os.environ.get('GOOGLE_CALENDAR_WARM_UP') == '1'
+
+# Meeting rooms. `capacity` is the largest party a room seats; a party is
+# offered the rooms with the smallest capacity that fits it. `calendar_id` is
+# the room's own Google calendar, used for free/busy checks and per-room
+# listings; bookings invite it as a resource so they show up there. `timezone`
+# defaults to TIME_ZONE. Point MEETING_ROOMS_FILE at a JSON list of the same
+# objects to configure rooms without editing this file.
+# https://developers.google.com/calendar/api/v3/reference/freebusy/query
+
+MEETING_ROOMS = [
+    {'name': 'Launchpad', 'capacity': 4, 'calendar_id': os.environ.get('LAUNCHPAD_CALENDAR_ID', '')},
+    {'name': 'Wall Street', 'capacity': 4, 'calendar_id': os.environ.get('WALL_STREET_CALENDAR_ID', '')},
+    {'name': 'Radio City', 'capacity': 10, 'calendar_id': os.environ.get('RADIO_CITY_CALENDAR_ID', '')},
+]
+
+if os.environ.get('MEETING_ROOMS_FILE'):
+    with open(os.environ['MEETING_ROOMS_FILE']) as meeting_rooms_file:
+        MEETING_ROOMS = json.load(meeting_rooms_file)
+
+GOOGLE_CALENDAR_USE_FREEBUSY = os.environ.get('GOOGLE_CALENDAR_USE_FREEBUSY') == '1'
+
+# Check bookings against each room's own calendar above, fetched in parallel
+# for the booking day, instead of matching event titles on the primary calendar.
+# When GOOGLE_CALENDAR_USE_FREEBUSY is also set, free/busy is tried first.
+
+GOOGLE_CALENDAR_USE_ROOM_CALENDARS = os.environ.get('GOOGLE_CALENDAR_USE_ROOM_CALENDARS') == '1'
+
+# Let server processes share calendar window reads: the first process fetches
+# under a file lock and caches the result for a few seconds. Needs a CACHES
+# backend that every process can reach (file-based, Memcached or Redis).
+
+CALENDAR_SINGLE_FLIGHT_SHARED = os.environ.get('CALENDAR_SINGLE_FLIGHT_SHARED') == '1'
+
+# Serve availability from the local Room/Reservation tables. Keep them in sync
+# with `python manage.py sync_reservations`.
+
+RESERVATION_MIRROR_ENABLED = os.environ.get('RESERVATION_MIRROR_ENABLED') == '1'
+
+# Queue bookings locally and insert them into Google Calendar from a worker
+# (`python manage.py process_outbox`) instead of on the request thread.
+
+CALENDAR_OUTBOX_ENABLED = os.environ.get('CALENDAR_OUTBOX_ENABLED') == '1'
+
+# Upper bound on concurrent Google Calendar API calls per process. Each call
+# checks out its own keep-alive connection, so this should match the number of
+# threads a server worker runs.
+
+GOOGLE_CALENDAR_HTTP_POOL_SIZE = int(os.environ.get('GOOGLE_CALENDAR_HTTP_POOL_SIZE', '10'))
+
+# Calendar API requests per second each process may send (token bucket). Keep
+# the sum across processes under the project's quota in the Cloud console.
+
+GOOGLE_CALENDAR_QUOTA_PER_SECOND = float(os.environ.get('GOOGLE_CALENDAR_QUOTA_PER_SECOND', '10'))
+
+# Serve the last good calendar data while one background refresh runs instead of
+# making requests wait on Google. Bookings are refused once the data a booking
+# would be checked against is older than BOOKING_MAX_STALENESS_SECONDS, or while
+# it has never been read at all (for the database mirror: until the
+# sync_reservations worker has completed a sync).
+
+GOOGLE_CALENDAR_STALE_WHILE_REVALIDATE = os.environ.get('GOOGLE_CALENDAR_STALE_WHILE_REVALIDATE') == '1'
+
+BOOKING_MAX_STALENESS_SECONDS = int(os.environ.get('BOOKING_MAX_STALENESS_SECONDS', '300'))
+
+# Keep the in-process room index as one minute-resolution bitmap per room and
+# day instead of sorted interval lists. Conflict checks become a bitwise AND,
+# and each room-day bitmap stays a couple of hundred bytes however busy it is.
+# So that cancellations can be applied, every booking also keeps its start and
+# end minute, a few dozen bytes each.
+
+ROOM_OCCUPANCY_BITMAPS = os.environ.get('ROOM_OCCUPANCY_BITMAPS') == '1'
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meetingroom.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings
+
+if settings.GOOGLE_CALENDAR_WARM_UP:
+    from core.utils.google_calendar_utils import warm_up_calendar_service
+
+    warm_up_calendar_service()
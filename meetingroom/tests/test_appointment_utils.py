@@ -0,0 +1,67 @@
+import pytest
+from datetime import datetime
+from django.utils import timezone
+from core.utils.appointment_utils import (
+    Appointment,
+    from_epoch,
+    intern_room,
+    parse_epoch,
+    to_epoch,
+)
+
+
+def test_intern_room_returns_one_id_per_name():
+    assert intern_room("Launchpad") == intern_room("Launchpad")
+    assert intern_room("Launchpad") != intern_room("Wall Street")
+
+
+def test_epoch_round_trip_treats_naive_datetimes_as_local_time():
+    start = datetime(2024, 5, 3, 10, 0)
+
+    assert to_epoch(start) == to_epoch(timezone.make_aware(start))
+    assert from_epoch(to_epoch(start)) == timezone.make_aware(start)
+    assert parse_epoch("2024-05-03T10:00:00") == to_epoch(start)
+    assert parse_epoch("2024-05-03T10:00:00+00:00") == 1714730400
+
+
+def test_appointment_is_a_slotted_record():
+    appointment = Appointment.from_datetimes(
+        datetime(2024, 5, 3, 10, 0), datetime(2024, 5, 3, 11, 0), 2, "Launchpad"
+    )
+
+    assert appointment.room == "Launchpad"
+    assert appointment.end - appointment.start == 60 * 60
+    assert appointment.overlaps(appointment.end - 1, appointment.end + 60)
+    assert not appointment.overlaps(appointment.end, appointment.end + 60)
+    with pytest.raises(AttributeError):
+        appointment.summary = "Launchpad"
+
+
+def test_appointments_sort_by_start_then_end():
+    later = Appointment.from_datetimes(
+        datetime(2024, 5, 3, 11, 0), datetime(2024, 5, 3, 12, 0), 0, "Launchpad"
+    )
+    earlier = Appointment.from_datetimes(
+        datetime(2024, 5, 3, 10, 0), datetime(2024, 5, 3, 12, 0), 0, "Launchpad"
+    )
+
+    assert sorted([later, earlier]) == [earlier, later]
+    assert len({earlier, later, Appointment(*earlier.key())}) == 2
+
+
+def test_parse_epochs_matches_parse_epoch():
+    pytest.importorskip("numpy")
+    from core.utils.appointment_utils import parse_epochs
+
+    datetime_strs = [
+        "2024-05-03T10:00:00-07:00",
+        "2024-05-03T10:00:00Z",
+        "2024-11-03T01:30:00+05:30",
+        "2024-05-03T10:00:00",
+        "2024-05-03T10:00:00.500+02:00",
+    ]
+
+    assert parse_epochs(datetime_strs).tolist() == [
+        parse_epoch(datetime_str) for datetime_str in datetime_strs
+    ]
+    assert parse_epochs([]).tolist() == []
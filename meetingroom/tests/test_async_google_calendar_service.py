@@ -0,0 +1,291 @@
+import asyncio
+import json
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from core.utils.async_google_calendar_service import AsyncGoogleCalendarService
+from core.utils.google_calendar_service import GoogleCalendarService
+from core.utils.google_calendar_utils import room_index
+from core.utils.http_pool_utils import SharedCredentials
+
+
+def make_event(event_id: str, start: str, end: str, summary: str = "Launchpad"):
+    return {
+        "id": event_id,
+        "status": "confirmed",
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+        "attendees": [{"additionalGuests": 0}],
+        "summary": summary,
+    }
+
+
+class StubCredentials:
+    def __init__(self):
+        self.token = "token-0"
+        self.valid = True
+        self.refresh_calls = 0
+
+    def refresh(self, request):
+        self.refresh_calls += 1
+        self.token = f"token-{self.refresh_calls}"
+
+    def apply(self, headers, token=None):
+        headers["authorization"] = f"Bearer {token or self.token}"
+
+
+class CalendarStandIn:
+    def __init__(self, *responses):
+        self.requests: list[httpx.Request] = []
+        self.responses = list(responses)
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        status_code, body = self.responses.pop(0)
+        return httpx.Response(status_code, json=body)
+
+
+@pytest.fixture
+def calendar_service(mocker):
+    service = GoogleCalendarService()
+    mocker.patch.object(service, "service", mocker.MagicMock())
+    credentials = StubCredentials()
+    mocker.patch.object(service, "credentials", SharedCredentials(credentials))
+    service.reset_event_store()
+    yield service
+    service.reset_event_store()
+
+
+def make_client(calendar_service, *responses):
+    stand_in = CalendarStandIn(*responses)
+    return (
+        AsyncGoogleCalendarService(calendar_service, httpx.MockTransport(stand_in)),
+        stand_in,
+    )
+
+
+def test_refresh_events_syncs_pages_into_shared_store(calendar_service):
+    client, stand_in = make_client(
+        calendar_service,
+        (
+            200,
+            {
+                "items": [
+                    make_event("a", "2024-05-03T10:00:00", "2024-05-03T11:00:00")
+                ],
+                "nextPageToken": "page-2",
+            },
+        ),
+        (
+            200,
+            {
+                "items": [
+                    make_event(
+                        "b", "2024-05-03T12:00:00", "2024-05-03T13:00:00", "Radio City"
+                    )
+                ],
+                "nextSyncToken": "sync-1",
+            },
+        ),
+    )
+
+    assert async_to_sync(client.refresh_events)()
+
+    assert set(calendar_service._event_store) == {"a", "b"}
+    assert calendar_service.sync_token == "sync-1"
+    assert len(room_index) == 2
+    assert stand_in.requests[1].url.params["pageToken"] == "page-2"
+    assert stand_in.requests[0].headers["authorization"] == "Bearer token-0"
+
+
+def test_concurrent_refreshes_share_one_sync(calendar_service):
+    client, stand_in = make_client(
+        calendar_service,
+        (
+            200,
+            {
+                "items": [
+                    make_event("a", "2024-05-03T10:00:00", "2024-05-03T11:00:00")
+                ],
+                "nextSyncToken": "sync-1",
+            },
+        ),
+    )
+    coalesced = calendar_service.refresh_flights.metrics()["coalesced"]
+
+    async def refresh_together():
+        return await asyncio.gather(*(client.refresh_events() for _ in range(5)))
+
+    assert async_to_sync(refresh_together)() == [True] * 5
+    assert len(stand_in.requests) == 1
+    assert calendar_service.refresh_flights.metrics()["coalesced"] == coalesced + 4
+
+
+def test_expired_sync_token_runs_full_sync(calendar_service):
+    client, stand_in = make_client(
+        calendar_service,
+        (
+            200,
+            {
+                "items": [
+                    make_event("a", "2024-05-03T10:00:00", "2024-05-03T11:00:00")
+                ],
+                "nextSyncToken": "sync-1",
+            },
+        ),
+        (410, {"error": {"code": 410}}),
+        (
+            200,
+            {
+                "items": [
+                    make_event("b", "2024-05-03T12:00:00", "2024-05-03T13:00:00")
+                ],
+                "nextSyncToken": "sync-2",
+            },
+        ),
+    )
+
+    async_to_sync(client.refresh_events)()
+    async_to_sync(client.refresh_events)()
+
+    assert set(calendar_service._event_store) == {"b"}
+    assert calendar_service.sync_token == "sync-2"
+    assert stand_in.requests[1].url.params["syncToken"] == "sync-1"
+    assert "syncToken" not in stand_in.requests[2].url.params
+
+
+def test_unauthorised_request_refreshes_token_and_retries(calendar_service):
+    client, stand_in = make_client(
+        calendar_service,
+        (401, {"error": {"code": 401}}),
+        (200, {"calendars": {"room": {"busy": []}}}),
+    )
+
+    busy = async_to_sync(client.query_free_busy)(
+        "2024-05-03T00:00:00-07:00", "2024-05-04T00:00:00-07:00", ["room"]
+    )
+
+    assert busy == {"room": []}
+    assert calendar_service.credentials.refresh_count == 1
+    assert stand_in.requests[1].headers["authorization"] == "Bearer token-1"
+
+
+def test_session_shares_one_client_and_closes_it(calendar_service, mocker):
+    client, stand_in = make_client(
+        calendar_service,
+        (200, {"calendars": {"room": {"busy": []}}}),
+        (200, {"calendars": {"room": {"busy": []}}}),
+        (200, {"calendars": {"room": {"busy": []}}}),
+    )
+    make_client_spy = mocker.spy(client, "_make_client")
+
+    async def query_twice():
+        async with client.session() as session_client:
+            for _ in range(2):
+                await client.query_free_busy("start", "end", ["room"])
+        return session_client
+
+    session_client = async_to_sync(query_twice)()
+    assert make_client_spy.call_count == 1
+    assert session_client.is_closed
+
+    async_to_sync(client.query_free_busy)("start", "end", ["room"])
+    assert make_client_spy.call_count == 2
+    assert make_client_spy.spy_return.is_closed
+    assert len(stand_in.requests) == 3
+
+
+def test_list_events_streams_pages(calendar_service):
+    client, stand_in = make_client(
+        calendar_service,
+        (
+            200,
+            {
+                "items": [
+                    make_event("a", "2024-05-03T10:00:00", "2024-05-03T11:00:00")
+                ],
+                "nextPageToken": "page-2",
+            },
+        ),
+        (
+            200,
+            {"items": [make_event("b", "2024-05-03T12:00:00", "2024-05-03T13:00:00")]},
+        ),
+    )
+
+    async def collect() -> list[str]:
+        return [
+            event["id"]
+            async for event in client.list_events(
+                "2024-05-03T00:00:00-07:00", "2024-05-04T00:00:00-07:00"
+            )
+        ]
+
+    assert async_to_sync(collect)() == ["a", "b"]
+    assert stand_in.requests[0].url.params["orderBy"] == "startTime"
+    assert stand_in.requests[0].url.params["singleEvents"] == "true"
+
+
+def test_create_event_inserts_with_invitations(calendar_service):
+    created = make_event("c", "2024-05-03T10:00:00", "2024-05-03T11:00:00")
+    client, stand_in = make_client(calendar_service, (200, created))
+
+    event = async_to_sync(client.create_event)(
+        "Ada",
+        "ada@example.com",
+        "2024-05-03T10:00:00-0700",
+        "2024-05-03T11:00:00-0700",
+        0,
+        "Launchpad",
+    )
+
+    assert event == created
+    assert stand_in.requests[0].method == "POST"
+    assert stand_in.requests[0].url.params["sendUpdates"] == "all"
+    assert json.loads(stand_in.requests[0].content)["summary"] == "Launchpad"
+
+
+def test_create_event_returns_none_on_api_error(calendar_service):
+    client, _ = make_client(calendar_service, (500, {"error": {"code": 500}}))
+
+    assert (
+        async_to_sync(client.create_event)(
+            "Ada",
+            "ada@example.com",
+            "2024-05-03T10:00:00-0700",
+            "2024-05-03T11:00:00-0700",
+            0,
+            "Launchpad",
+        )
+        is None
+    )
+
+
+def test_list_room_events_gathers_room_calendars(calendar_service):
+    def respond(request: httpx.Request) -> httpx.Response:
+        calendar_id = request.url.path.split("/")[-2]
+        return httpx.Response(
+            200,
+            json={
+                "items": [
+                    make_event(
+                        calendar_id, "2024-05-03T10:00:00", "2024-05-03T11:00:00"
+                    )
+                ]
+            },
+        )
+
+    client = AsyncGoogleCalendarService(calendar_service, httpx.MockTransport(respond))
+
+    room_events = async_to_sync(client.list_room_events)(
+        "2024-05-03T00:00:00-07:00",
+        "2024-05-04T00:00:00-07:00",
+        {"Launchpad": "launchpad", "Radio City": "radio"},
+    )
+
+    assert {
+        room: [event["id"] for event in events] for room, events in room_events.items()
+    } == {
+        "Launchpad": ["launchpad"],
+        "Radio City": ["radio"],
+    }
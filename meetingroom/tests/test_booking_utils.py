@@ -0,0 +1,121 @@
+import pytest
+import threading
+from asgiref.sync import async_to_sync
+from datetime import datetime, timedelta
+from django.utils import timezone
+from core.utils.appointment_utils import to_epoch
+from core.utils.booking_utils import abook_room
+from core.utils.google_calendar_utils import AppointmentSnapshot
+from core.utils.room_index_utils import RoomIntervalIndex
+
+
+@pytest.fixture(autouse=True)
+def shared_room_index(mocker):
+    return mocker.patch("core.utils.booking_utils.room_index", RoomIntervalIndex())
+
+
+def make_created_event(*args) -> dict:
+    name, email, start, end, number_of_people, location = args
+    return {
+        "id": f"event-{location}-{start}",
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+        "attendees": [{"additionalGuests": number_of_people - 1}],
+        "summary": location,
+    }
+
+
+def book_concurrently(snapshot, slots, number_of_people: int) -> list:
+    results: list = [None] * len(slots)
+
+    def book(position: int, start: datetime, end: datetime):
+        results[position] = async_to_sync(abook_room)(
+            "Test Event", "test@example.com", start, end, number_of_people, snapshot
+        )
+
+    threads = [
+        threading.Thread(target=book, args=(position, start, end))
+        for position, (start, end) in enumerate(slots)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def next_hour() -> datetime:
+    return timezone.localtime(timezone.now()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+
+
+def test_concurrent_bookings_of_the_same_room_do_not_double_book(mocker):
+    inserting = threading.Event()
+
+    def slow_create_event(*args):
+        inserting.set()
+        threading.Event().wait(0.05)
+        return make_created_event(*args)
+
+    create_event_mock = mocker.patch(
+        "core.utils.booking_utils.acreate_event", side_effect=slow_create_event
+    )
+    snapshot = AppointmentSnapshot(RoomIntervalIndex())
+    start = next_hour()
+
+    results = book_concurrently(
+        snapshot,
+        [(start, start + timedelta(hours=1)), (start, start + timedelta(hours=1))],
+        6,
+    )
+
+    assert sorted(results) == [(False, "Radio City"), (True, "Radio City")]
+    create_event_mock.assert_called_once()
+
+
+def test_independent_days_book_in_parallel(mocker):
+    both_inserting = threading.Barrier(2, timeout=2)
+
+    def create_event_waiting_for_the_other_day(*args):
+        both_inserting.wait()
+        return make_created_event(*args)
+
+    mocker.patch(
+        "core.utils.booking_utils.acreate_event",
+        side_effect=create_event_waiting_for_the_other_day,
+    )
+    snapshot = AppointmentSnapshot(RoomIntervalIndex())
+    start = next_hour()
+    next_day = start + timedelta(days=1)
+
+    results = book_concurrently(
+        snapshot,
+        [
+            (start, start + timedelta(hours=1)),
+            (next_day, next_day + timedelta(hours=1)),
+        ],
+        6,
+    )
+
+    assert results == [(False, "Radio City"), (False, "Radio City")]
+
+
+def test_failed_insert_releases_the_hold(mocker):
+    mocker.patch("core.utils.booking_utils.acreate_event", side_effect=ValueError)
+    snapshot = AppointmentSnapshot(RoomIntervalIndex())
+    start = next_hour()
+
+    with pytest.raises(ValueError):
+        async_to_sync(abook_room)(
+            "Test Event",
+            "test@example.com",
+            start,
+            start + timedelta(hours=1),
+            6,
+            snapshot,
+        )
+
+    assert not snapshot.room_index.overlaps(
+        "Radio City", to_epoch(start), to_epoch(start + timedelta(hours=1))
+    )
@@ -0,0 +1,162 @@
+import time
+import pytest
+from django.test import Client
+from django.urls import reverse
+from core.utils.calendar_watch_utils import renew_watch_channel
+from core.utils.google_calendar_service import GoogleCalendarService
+from core.utils.google_calendar_utils import get_room_index
+
+client = Client()
+
+
+def make_event(event_id: str, summary: str) -> dict:
+    return {
+        "id": event_id,
+        "status": "confirmed",
+        "start": {"dateTime": "2024-05-03T10:00:00-07:00"},
+        "end": {"dateTime": "2024-05-03T11:00:00-07:00"},
+        "attendees": [{"additionalGuests": 0}],
+        "summary": summary,
+    }
+
+
+class CalendarStandIn:
+    def __init__(self, mocker):
+        self.api = mocker.MagicMock()
+        self.list_calls: list[dict] = []
+        self.pending_changes: list[dict] = [make_event("a", "Launchpad")]
+        self.api.events.return_value.list.side_effect = self.list
+        self.api.events.return_value.watch.side_effect = self.watch
+
+    def list(self, **params):
+        self.list_calls.append(params)
+        changes, self.pending_changes = self.pending_changes, []
+        response = {"items": changes, "nextSyncToken": f"sync-{len(self.list_calls)}"}
+        return type("Request", (), {"execute": lambda _: response})()
+
+    def watch(self, calendarId: str, body: dict):
+        channel = {
+            "id": body["id"],
+            "resourceId": "resource-1",
+            "expiration": str(int((time.time() + int(body["params"]["ttl"])) * 1000)),
+        }
+        return type("Request", (), {"execute": lambda _: channel})()
+
+
+def post_notification(channel: dict, state: str, message_number: str, token=None):
+    return client.post(
+        reverse("calendar_notifications"),
+        headers={
+            "X-Goog-Channel-ID": channel["id"],
+            "X-Goog-Channel-Token": token or channel["token"],
+            "X-Goog-Resource-State": state,
+            "X-Goog-Message-Number": message_number,
+        },
+    )
+
+
+@pytest.fixture
+def calendar(mocker, tmp_path):
+    service = GoogleCalendarService()
+    stand_in = CalendarStandIn(mocker)
+    mocker.patch.object(service, "service", stand_in.api)
+    mocker.patch.object(
+        GoogleCalendarService, "WATCH_CHANNEL_FILE", str(tmp_path / "channel.json")
+    )
+    mocker.patch.object(
+        GoogleCalendarService,
+        "WATCH_NOTIFICATION_FILE",
+        str(tmp_path / "channel.notified"),
+    )
+    service.reset_event_store()
+    yield stand_in
+    service.reset_event_store()
+
+
+def test_no_list_calls_between_notifications(calendar):
+    renew_watch_channel("https://example.com/calendar-notifications")
+    channel = GoogleCalendarService().load_watch_channel()
+
+    assert post_notification(channel, "sync", "1").status_code == 200
+    get_room_index()
+    get_room_index()
+    get_room_index()
+    assert len(calendar.list_calls) == 1
+
+    calendar.pending_changes = [make_event("b", "Wall Street")]
+    assert post_notification(channel, "exists", "2").status_code == 200
+    assert len(calendar.list_calls) == 2
+    assert calendar.list_calls[-1]["syncToken"] == "sync-1"
+
+    index = get_room_index()
+    get_room_index()
+    assert len(calendar.list_calls) == 2
+    assert len(index) == 2
+
+
+def test_quiet_channel_still_syncs_after_the_max_quiet_period(calendar):
+    renew_watch_channel("https://example.com/calendar-notifications")
+    channel = GoogleCalendarService().load_watch_channel()
+    assert post_notification(channel, "sync", "1").status_code == 200
+    service = GoogleCalendarService()
+    get_room_index()
+    verified_at = service.last_verified_at
+
+    # Reads between notifications neither call Google nor count as a sync.
+    get_room_index()
+    assert len(calendar.list_calls) == 1
+    assert service.last_verified_at == verified_at
+
+    service.last_verified_at -= service.WATCH_MAX_QUIET_SECONDS + 1
+    calendar.pending_changes = [make_event("b", "Wall Street")]
+
+    assert len(get_room_index()) == 2
+    assert len(calendar.list_calls) == 2
+    assert calendar.list_calls[-1]["syncToken"] == "sync-1"
+    assert service.staleness_seconds() < 1
+
+
+def test_notification_syncs_while_serving_stale_events(calendar, settings):
+    settings.GOOGLE_CALENDAR_STALE_WHILE_REVALIDATE = True
+    renew_watch_channel("https://example.com/calendar-notifications")
+    channel = GoogleCalendarService().load_watch_channel()
+    get_room_index()
+    assert len(calendar.list_calls) == 1
+
+    calendar.pending_changes = [make_event("b", "Wall Street")]
+    assert post_notification(channel, "exists", "2").status_code == 200
+
+    assert len(calendar.list_calls) == 2
+    assert len(get_room_index()) == 2
+
+
+def test_notification_with_wrong_token_is_rejected(calendar):
+    renew_watch_channel("https://example.com/calendar-notifications")
+    channel = GoogleCalendarService().load_watch_channel()
+    get_room_index()
+
+    response = post_notification(channel, "exists", "2", token="forged")
+
+    assert response.status_code == 403
+    assert len(calendar.list_calls) == 1
+
+
+def test_reads_sync_without_an_active_channel(calendar):
+    get_room_index()
+    get_room_index()
+
+    assert len(calendar.list_calls) == 2
+
+
+def test_renew_watch_channel_keeps_fresh_channel(calendar):
+    channel = renew_watch_channel("https://example.com/calendar-notifications")
+
+    assert renew_watch_channel("https://example.com/calendar-notifications") is None
+    renewed = renew_watch_channel(
+        "https://example.com/calendar-notifications", force=True
+    )
+
+    assert renewed["id"] != channel["id"]
+    calendar.api.channels.return_value.stop.assert_called_once_with(
+        body={"id": channel["id"], "resourceId": "resource-1"}
+    )
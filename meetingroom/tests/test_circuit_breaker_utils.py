@@ -0,0 +1,61 @@
+import pytest
+from core.utils.circuit_breaker_utils import CircuitBreaker, CircuitOpenError
+
+
+def fail():
+    raise TimeoutError("timed out")
+
+
+def test_opens_after_repeated_failures_and_rejects_calls():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout_seconds=60)
+    calls: list[int] = []
+
+    for _ in range(3):
+        with pytest.raises(TimeoutError):
+            breaker.call(fail)
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+
+    assert calls == []
+    assert breaker.metrics()["state"] == CircuitBreaker.OPEN
+    assert breaker.metrics()["trips"] == 1
+    assert breaker.metrics()["rejected_calls"] == 1
+
+
+def test_trial_call_after_reset_timeout_closes_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=0)
+
+    with pytest.raises(TimeoutError):
+        breaker.call(fail)
+
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.metrics()["state"] == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_call_reopens_circuit():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=0)
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            breaker.call(fail)
+    breaker.reset_timeout_seconds = 60
+    breaker.opened_at -= 120
+    with pytest.raises(TimeoutError):
+        breaker.call(fail)
+
+    assert breaker.metrics()["state"] == CircuitBreaker.OPEN
+    assert breaker.metrics()["trips"] == 2
+
+
+def test_errors_that_are_not_outages_keep_circuit_closed():
+    breaker = CircuitBreaker(
+        failure_threshold=1, is_failure=lambda error: not isinstance(error, KeyError)
+    )
+
+    def missing():
+        raise KeyError("event")
+
+    with pytest.raises(KeyError):
+        breaker.call(missing)
+
+    assert breaker.metrics()["state"] == CircuitBreaker.CLOSED
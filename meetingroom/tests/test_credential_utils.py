@@ -0,0 +1,85 @@
+import json
+from datetime import datetime, timedelta, timezone
+from core.utils.credential_utils import CredentialRefresher
+from core.utils.google_calendar_service import GoogleCalendarService
+from core.utils.http_pool_utils import SharedCredentials
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class StubCredentials:
+    def __init__(self, expires_in: timedelta):
+        self.token = "token-0"
+        self.refresh_token = "refresh"
+        self.expiry = utc_now() + expires_in
+        self.refresh_calls = 0
+
+    @property
+    def valid(self) -> bool:
+        return self.expiry > utc_now()
+
+    def refresh(self, request):
+        self.refresh_calls += 1
+        self.token = f"token-{self.refresh_calls}"
+        self.expiry = utc_now() + timedelta(hours=1)
+
+    def to_json(self) -> str:
+        return json.dumps({"token": self.token})
+
+
+def make_refresher(credentials, saved: list) -> CredentialRefresher:
+    return CredentialRefresher(
+        SharedCredentials(credentials), object, saved.append, 600, 60
+    )
+
+
+def test_refreshes_token_ahead_of_expiry():
+    credentials = StubCredentials(timedelta(minutes=5))
+    saved: list = []
+
+    assert make_refresher(credentials, saved).refresh_if_due()
+    assert credentials.refresh_calls == 1
+    assert credentials.valid
+    assert saved == [credentials]
+
+
+def test_leaves_fresh_token_alone():
+    credentials = StubCredentials(timedelta(hours=1))
+    saved: list = []
+
+    assert not make_refresher(credentials, saved).refresh_if_due()
+    assert credentials.refresh_calls == 0
+    assert saved == []
+
+
+def test_failed_refresh_is_counted_and_retried(mocker):
+    credentials = StubCredentials(timedelta(minutes=5))
+    mocker.patch.object(credentials, "refresh", side_effect=OSError("offline"))
+    refresher = make_refresher(credentials, [])
+
+    assert not refresher.refresh_if_due()
+    assert not refresher.refresh_if_due()
+    assert refresher.failures == 2
+
+
+def test_background_thread_refreshes_on_start():
+    credentials = StubCredentials(timedelta(minutes=5))
+    saved: list = []
+    refresher = make_refresher(credentials, saved)
+
+    refresher.start()
+    refresher.stop()
+
+    assert credentials.refresh_calls == 1
+
+
+def test_save_credentials_replaces_token_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "token.json").write_text("{}")
+
+    GoogleCalendarService().save_credentials(StubCredentials(timedelta(hours=1)))
+
+    assert json.loads((tmp_path / "token.json").read_text()) == {"token": "token-0"}
+    assert [path.name for path in tmp_path.iterdir()] == ["token.json"]
@@ -0,0 +1,111 @@
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+from core.utils.google_calendar_service import GoogleCalendarService
+
+ROOMS: list[str] = ["Launchpad", "Wall Street", "Radio City"]
+
+
+def make_full_event(index: int, start: datetime) -> dict:
+    end: datetime = start + timedelta(hours=1)
+    email: str = f"guest{index}@example.com"
+    return {
+        "kind": "calendar#event",
+        "etag": f'"{3400000000000000 + index}"',
+        "id": f"event{index:08d}",
+        "status": "confirmed",
+        "htmlLink": f"https://www.google.com/calendar/event?eid=ZXZlbnQ{index:08d}",
+        "created": "2024-01-02T09:00:00.000Z",
+        "updated": "2024-01-02T09:00:00.000Z",
+        "summary": ROOMS[index % len(ROOMS)],
+        "description": "Booked from the meeting room kiosk.",
+        "creator": {"email": "rooms@example.com", "self": True},
+        "organizer": {"email": "rooms@example.com", "self": True},
+        "start": {
+            "dateTime": start.isoformat(),
+            "timeZone": "America/Los_Angeles",
+        },
+        "end": {"dateTime": end.isoformat(), "timeZone": "America/Los_Angeles"},
+        "iCalUID": f"event{index:08d}@google.com",
+        "sequence": 0,
+        "attendees": [
+            {
+                "email": email,
+                "displayName": f"Guest {index}",
+                "responseStatus": "needsAction",
+                "additionalGuests": index % 5,
+            },
+            {"email": "rooms@example.com", "organizer": True, "self": True},
+        ],
+        "guestsCanInviteOthers": False,
+        "reminders": {"useDefault": True},
+        "eventType": "default",
+    }
+
+
+def project(event: dict) -> dict:
+    # What Google returns for GoogleCalendarService.EVENT_FIELDS.
+    return {
+        "id": event["id"],
+        "status": event["status"],
+        "summary": event["summary"],
+        "start": {"dateTime": event["start"]["dateTime"]},
+        "end": {"dateTime": event["end"]["dateTime"]},
+        "attendees": [
+            {
+                key: attendee[key]
+                for key in ("email", "additionalGuests")
+                if key in attendee
+            }
+            for attendee in event["attendees"]
+        ],
+    }
+
+
+def make_year_of_bookings() -> list[dict]:
+    first_day = datetime(2024, 1, 1, 9).astimezone()
+    events: list[dict] = []
+    for day in range(365):
+        for slot in range(8):
+            start = first_day + timedelta(days=day, hours=slot)
+            events.append(make_full_event(len(events), start))
+    return events
+
+
+def measure(payload: dict) -> tuple[int, float]:
+    body: bytes = gzip.compress(json.dumps(payload).encode())
+    started: float = time.perf_counter()
+    for _ in range(5):
+        json.loads(gzip.decompress(body))
+    return len(body), (time.perf_counter() - started) / 5
+
+
+def test_projected_listing_is_smaller_and_faster_to_parse(capsys):
+    events = make_year_of_bookings()
+    full_bytes, full_seconds = measure({"items": events})
+    projected_bytes, projected_seconds = measure(
+        {"items": [project(event) for event in events]}
+    )
+    raw_full = len(json.dumps({"items": events}).encode())
+    raw_projected = len(
+        json.dumps({"items": [project(event) for event in events]}).encode()
+    )
+
+    with capsys.disabled():
+        print(
+            f"\n{len(events)} events: full {raw_full} B ({full_bytes} B gzip, "
+            f"{full_seconds * 1000:.1f} ms), fields {raw_projected} B "
+            f"({projected_bytes} B gzip, {projected_seconds * 1000:.1f} ms)"
+        )
+
+    assert raw_full > 3 * raw_projected
+    assert full_bytes > 2 * projected_bytes
+    assert projected_seconds < full_seconds
+
+
+def test_listing_requests_partial_response():
+    fields: str = GoogleCalendarService.EVENT_LIST_FIELDS
+
+    assert "nextSyncToken" in fields
+    assert "attendees(email,additionalGuests)" in fields
@@ -0,0 +1,327 @@
+import pytest
+import httplib2
+import threading
+import time
+from datetime import datetime, timedelta
+from googleapiclient.errors import HttpError
+from core.utils.circuit_breaker_utils import CircuitBreaker
+from core.utils.google_calendar_service import GoogleCalendarService, is_outage
+from core.utils.http_pool_utils import HttpPool
+
+
+def make_event(event_id: str, start: str, end: str, summary: str = "Launchpad"):
+    return {
+        "id": event_id,
+        "status": "confirmed",
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+        "attendees": [{"additionalGuests": 0}],
+        "summary": summary,
+    }
+
+
+@pytest.fixture
+def calendar_service(mocker):
+    service = GoogleCalendarService()
+    mocker.patch.object(service, "service", mocker.MagicMock())
+    service.reset_event_store()
+    yield service
+    service.reset_event_store()
+
+
+def respond_with(calendar_service, *responses):
+    execute = calendar_service.service.events.return_value.list.return_value.execute
+    execute.side_effect = list(responses)
+    return calendar_service.service.events.return_value.list
+
+
+def test_sync_events_full_sync_follows_pages(calendar_service):
+    list_call = respond_with(
+        calendar_service,
+        {
+            "items": [make_event("a", "2024-05-03T10:00:00", "2024-05-03T11:00:00")],
+            "nextPageToken": "page-2",
+        },
+        {
+            "items": [make_event("b", "2024-05-03T12:00:00", "2024-05-03T13:00:00")],
+            "nextSyncToken": "sync-1",
+        },
+    )
+
+    calendar_service.sync_events()
+
+    assert set(calendar_service._event_store) == {"a", "b"}
+    assert calendar_service._sync_token == "sync-1"
+    assert list_call.call_args.kwargs["pageToken"] == "page-2"
+
+
+def test_sync_events_incremental_applies_changes(calendar_service):
+    list_call = respond_with(
+        calendar_service,
+        {
+            "items": [
+                make_event("a", "2024-05-03T10:00:00", "2024-05-03T11:00:00"),
+                make_event("b", "2024-05-03T12:00:00", "2024-05-03T13:00:00"),
+            ],
+            "nextSyncToken": "sync-1",
+        },
+        {
+            "items": [
+                {"id": "a", "status": "cancelled"},
+                make_event("c", "2024-05-03T14:00:00", "2024-05-03T15:00:00"),
+            ],
+            "nextSyncToken": "sync-2",
+        },
+    )
+
+    calendar_service.sync_events()
+    calendar_service.sync_events()
+
+    assert set(calendar_service._event_store) == {"b", "c"}
+    assert calendar_service._sync_token == "sync-2"
+    assert list_call.call_args.kwargs["syncToken"] == "sync-1"
+
+
+def test_sync_events_expired_token_runs_full_sync(calendar_service):
+    expired = HttpError(httplib2.Response({"status": 410}), b"Gone")
+    respond_with(
+        calendar_service,
+        {
+            "items": [make_event("a", "2024-05-03T10:00:00", "2024-05-03T11:00:00")],
+            "nextSyncToken": "sync-1",
+        },
+        expired,
+        {
+            "items": [make_event("b", "2024-05-03T12:00:00", "2024-05-03T13:00:00")],
+            "nextSyncToken": "sync-2",
+        },
+    )
+
+    calendar_service.sync_events()
+    calendar_service.sync_events()
+
+    assert set(calendar_service._event_store) == {"b"}
+    assert calendar_service._sync_token == "sync-2"
+
+
+def test_list_events_streams_pages_lazily(calendar_service):
+    list_call = respond_with(
+        calendar_service,
+        {
+            "items": [make_event("a", "2024-05-03T10:00:00", "2024-05-03T11:00:00")],
+            "nextPageToken": "page-2",
+        },
+        {"items": [make_event("b", "2024-05-03T12:00:00", "2024-05-03T13:00:00")]},
+    )
+
+    events = calendar_service.list_events(
+        "2024-05-03T00:00:00-07:00", "2024-05-04T00:00:00-07:00"
+    )
+    assert next(events)["id"] == "a"
+    assert list_call.call_count == 1
+    assert [event["id"] for event in events] == ["b"]
+    assert list_call.call_count == 2
+    assert list_call.call_args.kwargs["orderBy"] == "startTime"
+    assert list_call.call_args.kwargs["singleEvents"] is True
+    assert list_call.call_args.kwargs["timeMin"] == "2024-05-03T00:00:00-07:00"
+
+
+def test_query_free_busy_parses_busy_intervals(calendar_service):
+    query = calendar_service.service.freebusy.return_value.query
+    query.return_value.execute.return_value = {
+        "calendars": {
+            "launchpad@example.com": {
+                "busy": [
+                    {"start": "2024-05-03T10:00:00Z", "end": "2024-05-03T11:00:00Z"}
+                ]
+            },
+            "radio-city@example.com": {"busy": []},
+        }
+    }
+
+    busy = calendar_service.query_free_busy(
+        "2024-05-03T00:00:00Z",
+        "2024-05-04T00:00:00Z",
+        ["launchpad@example.com", "radio-city@example.com"],
+    )
+
+    assert query.call_args.kwargs["body"]["items"] == [
+        {"id": "launchpad@example.com"},
+        {"id": "radio-city@example.com"},
+    ]
+    assert [interval[0].hour for interval in busy["launchpad@example.com"]] == [10]
+    assert busy["radio-city@example.com"] == []
+    calendar_service.service.events.return_value.list.assert_not_called()
+
+
+def test_query_free_busy_raises_on_calendar_errors(calendar_service):
+    query = calendar_service.service.freebusy.return_value.query
+    query.return_value.execute.return_value = {
+        "calendars": {
+            "launchpad@example.com": {"errors": [{"reason": "notFound"}], "busy": []}
+        }
+    }
+
+    with pytest.raises(ValueError):
+        calendar_service.query_free_busy(
+            "2024-05-03T00:00:00Z", "2024-05-04T00:00:00Z", ["launchpad@example.com"]
+        )
+
+
+def test_build_event_invites_the_room_calendar(calendar_service, settings):
+    settings.MEETING_ROOMS = [
+        {"name": "Launchpad", "capacity": 4, "calendar_id": "launchpad@example.com"},
+        {"name": "Radio City", "capacity": 10},
+    ]
+
+    event = calendar_service.build_event(
+        "Ada", "ada@example.com", "start", "end", 1, "Launchpad"
+    )
+    assert event["attendees"][0]["email"] == "ada@example.com"
+    assert event["attendees"][1] == {"email": "launchpad@example.com", "resource": True}
+
+    event = calendar_service.build_event(
+        "Ada", "ada@example.com", "start", "end", 1, "Radio City"
+    )
+    assert [attendee["email"] for attendee in event["attendees"]] == ["ada@example.com"]
+
+
+def test_build_event_uses_the_room_timezone(calendar_service, settings):
+    settings.MEETING_ROOMS = [
+        {"name": "Launchpad", "capacity": 4, "timezone": "Europe/Berlin"},
+        {"name": "Radio City", "capacity": 10},
+    ]
+
+    event = calendar_service.build_event(
+        "Ada", "ada@example.com", "start", "end", 1, "Launchpad"
+    )
+    assert event["start"]["timeZone"] == "Europe/Berlin"
+    assert event["end"]["timeZone"] == "Europe/Berlin"
+
+    event = calendar_service.build_event(
+        "Ada", "ada@example.com", "start", "end", 1, "Radio City"
+    )
+    assert event["start"]["timeZone"] == settings.TIME_ZONE
+
+
+def respond_per_calendar(calendar_service, responses: dict, delays: dict = {}):
+    def list_events(calendarId, **params):
+        time.sleep(delays.get(calendarId, 0))
+        response = responses[calendarId]
+        return type("Request", (), {"execute": lambda _, http=None: response})()
+
+    calendar_service.service.events.return_value.list.side_effect = list_events
+
+
+def test_list_room_events_fetches_room_calendars_in_parallel(calendar_service):
+    calendar_service.http_pool = HttpPool(object, 3)
+    respond_per_calendar(
+        calendar_service,
+        {
+            "launchpad": {"items": [make_event("a", "2024-05-03T10:00:00", "x")]},
+            "wall-street": {"items": [make_event("b", "2024-05-03T11:00:00", "x")]},
+            "radio-city": {"items": []},
+        },
+        {"launchpad": 0.2, "wall-street": 0.2, "radio-city": 0.2},
+    )
+
+    started = time.perf_counter()
+    room_events = calendar_service.list_room_events(
+        "2024-05-03T00:00:00-07:00",
+        "2024-05-04T00:00:00-07:00",
+        {
+            "Launchpad": "launchpad",
+            "Wall Street": "wall-street",
+            "Radio City": "radio-city",
+        },
+    )
+
+    assert time.perf_counter() - started < 0.5
+    assert [event["id"] for event in room_events["Launchpad"]] == ["a"]
+    assert [event["id"] for event in room_events["Wall Street"]] == ["b"]
+    assert room_events["Radio City"] == []
+
+
+def test_list_room_events_times_out_on_slow_room(calendar_service):
+    calendar_service.http_pool = HttpPool(object, 2)
+    respond_per_calendar(
+        calendar_service,
+        {"launchpad": {"items": []}, "radio-city": {"items": []}},
+        {"radio-city": 0.5},
+    )
+
+    with pytest.raises(TimeoutError, match="Radio City"):
+        calendar_service.list_room_events(
+            "2024-05-03T00:00:00-07:00",
+            "2024-05-04T00:00:00-07:00",
+            {"Launchpad": "launchpad", "Radio City": "radio-city"},
+            timeout=0.05,
+        )
+
+
+def test_concurrent_refreshes_share_one_sync(calendar_service, mocker):
+    def slow_sync():
+        time.sleep(0.05)
+
+    sync_events = mocker.patch.object(
+        calendar_service, "sync_events", side_effect=slow_sync
+    )
+    threads = [
+        threading.Thread(target=calendar_service.refresh_events) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sync_events.call_count == 1
+
+
+def test_get_events_keeps_last_good_events_when_api_fails(calendar_service):
+    start = datetime.now().astimezone() + timedelta(minutes=1)
+    respond_with(
+        calendar_service,
+        {
+            "items": [
+                make_event(
+                    "a",
+                    start.isoformat(),
+                    (start + timedelta(minutes=1)).isoformat(),
+                )
+            ],
+            "nextSyncToken": "sync-1",
+        },
+        TimeoutError("timed out"),
+    )
+
+    assert [event["id"] for event in calendar_service.get_events()] == ["a"]
+    assert [event["id"] for event in calendar_service.get_events()] == ["a"]
+    assert calendar_service.staleness_seconds() < 1
+
+
+def test_circuit_opens_after_repeated_timeouts(calendar_service, mocker):
+    mocker.patch.object(calendar_service, "breaker", CircuitBreaker(2, 60, is_outage))
+    list_call = respond_with(calendar_service, *[TimeoutError("timed out")] * 5)
+
+    for _ in range(4):
+        assert not calendar_service.refresh_events()
+
+    assert list_call.return_value.execute.call_count == 2
+    assert calendar_service.breaker.metrics()["state"] == CircuitBreaker.OPEN
+
+
+def test_stale_events_are_served_while_revalidating(calendar_service, settings, mocker):
+    settings.GOOGLE_CALENDAR_STALE_WHILE_REVALIDATE = True
+    respond_with(calendar_service, {"items": [], "nextSyncToken": "sync-1"})
+    assert calendar_service.refresh_events()
+
+    revalidated = threading.Event()
+    mocker.patch.object(
+        calendar_service, "_refresh_events", side_effect=lambda: revalidated.set()
+    )
+    assert calendar_service.refresh_events()
+    assert not revalidated.is_set()
+
+    calendar_service.last_verified_at -= calendar_service.STALE_AFTER_SECONDS + 1
+    assert calendar_service.refresh_events()
+    assert revalidated.wait(1)
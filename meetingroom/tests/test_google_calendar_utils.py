@@ -1,3 +1,6 @@
+import pytest
+import sys
+from asgiref.sync import async_to_sync
 from datetime import datetime, timedelta
 from core.utils.google_calendar_utils import (
     parse_iso_datetime,
@@ -7,12 +10,22 @@ from core.utils.google_calendar_utils import (
     get_appointments,
     format_time_slots,
     appointments_overlap,
+    availability_matrix,
     create_event,
+    update_room_index,
+    AppointmentSnapshot,
+    get_room_status,
+    get_status_timeline,
+    iter_appointments,
+    parse_appointment,
+    parse_appointments_batch,
 )
+from core.utils import google_calendar_utils
+from core.utils.appointment_utils import Appointment, to_epoch
 from core.utils.google_calendar_service import GoogleCalendarService
+from core.utils.room_index_utils import RoomIntervalIndex
 from django.utils import timezone
 
-
 # Dummy data for testing
 APPOINTMENTS_DATA: list[dict[str, dict[str, str]]] = [
     {
@@ -48,13 +61,13 @@ def test_sort_appointments():
         },
     ]
     expected_sorted_appointments = [
-        (
+        Appointment.from_datetimes(
             parse_iso_datetime("2024-05-03T10:00:00"),
             parse_iso_datetime("2024-05-03T12:00:00"),
             2,
             "Launchpad",
         ),
-        (
+        Appointment.from_datetimes(
             parse_iso_datetime("2024-05-03T14:00:00"),
             parse_iso_datetime("2024-05-03T16:00:00"),
             1,
@@ -64,23 +77,16 @@ def test_sort_appointments():
     assert sort_appointments(appointments) == expected_sorted_appointments
 
 
-def test_is_current_time_between(mocker):
-    current_time = timezone.localtime(timezone.now())
-    start_time: datetime = current_time - timedelta(hours=1)
-    end_time: datetime = current_time + timedelta(hours=1)
-
-    mocked_datetime = mocker.patch("datetime.datetime")
-    mocked_datetime.now.return_value = current_time
-
-    assert is_current_time_between(start_time, end_time)
-
-    start_time: datetime = current_time - timedelta(days=1)
-    end_time: datetime = current_time + timedelta(days=1)
-
-    mocked_datetime = mocker.patch("datetime.datetime")
-    mocked_datetime.now.return_value = current_time
+def test_is_current_time_between():
+    current_time: int = to_epoch(timezone.localtime(timezone.now()))
 
-    assert is_current_time_between(start_time, end_time)
+    assert is_current_time_between(current_time - 60 * 60, current_time + 60 * 60)
+    assert is_current_time_between(
+        current_time - 24 * 60 * 60, current_time + 24 * 60 * 60
+    )
+    assert not is_current_time_between(
+        current_time + 60 * 60, current_time + 2 * 60 * 60
+    )
 
 
 def test_get_current_datetime(mocker):
@@ -112,17 +118,11 @@ def test_get_appointments(mocker):
     ]
 
     assert get_appointments() == [
-        (
-            datetime(2024, 5, 3, 10, 0),
-            datetime(2024, 5, 3, 12, 0),
-            2,
-            "Launchpad",
+        Appointment.from_datetimes(
+            datetime(2024, 5, 3, 10, 0), datetime(2024, 5, 3, 12, 0), 2, "Launchpad"
         ),
-        (
-            datetime(2024, 5, 3, 14, 0),
-            datetime(2024, 5, 3, 16, 0),
-            1,
-            "Wall Street",
+        Appointment.from_datetimes(
+            datetime(2024, 5, 3, 14, 0), datetime(2024, 5, 3, 16, 0), 1, "Wall Street"
         ),
     ]
 
@@ -154,8 +154,8 @@ def test_format_time_slots():
 
 def test_appointments_overlap_empty(mocker):
     mocker.patch(
-        "core.utils.google_calendar_utils.get_appointments",
-        return_value=[],
+        "core.utils.google_calendar_utils.get_room_index",
+        return_value=RoomIntervalIndex(),
     )
     insert_start_datetime: datetime = datetime.now(
         timezone.get_current_timezone()
@@ -193,15 +193,10 @@ def test_appointments_overlap_wall_street_booked(mocker):
     ) + timedelta(hours=2)
 
     mocker.patch(
-        "core.utils.google_calendar_utils.get_appointments",
-        return_value=[
-            (
-                meeting_start,
-                meeting_end,
-                4,
-                "Wall Street",
-            )
-        ],
+        "core.utils.google_calendar_utils.get_room_index",
+        return_value=RoomIntervalIndex.from_appointments(
+            [Appointment.from_datetimes(meeting_start, meeting_end, 4, "Wall Street")]
+        ),
     )
     insert_start_datetime: datetime = datetime.now(
         timezone.get_current_timezone()
@@ -241,15 +236,10 @@ def test_appointments_overlap_wall_street_booked(mocker):
     ) + timedelta(days=1, hours=2)
 
     mocker.patch(
-        "core.utils.google_calendar_utils.get_appointments",
-        return_value=[
-            (
-                meeting_start,
-                meeting_end,
-                4,
-                "Wall Street",
-            )
-        ],
+        "core.utils.google_calendar_utils.get_room_index",
+        return_value=RoomIntervalIndex.from_appointments(
+            [Appointment.from_datetimes(meeting_start, meeting_end, 4, "Wall Street")]
+        ),
     )
 
     insert_start_datetime: datetime = datetime.now(
@@ -276,16 +266,15 @@ def test_appointments_overlap_both_booked(mocker):
     ) + timedelta(hours=2)
 
     mocker.patch(
-        "core.utils.google_calendar_utils.get_appointments",
-        return_value=[
-            (
-                meeting_start,
-                meeting_end,
-                3,
-                "Wall Street",
-            ),
-            (meeting_start, meeting_end, 3, "Launchpad"),
-        ],
+        "core.utils.google_calendar_utils.get_room_index",
+        return_value=RoomIntervalIndex.from_appointments(
+            [
+                Appointment.from_datetimes(
+                    meeting_start, meeting_end, 3, "Wall Street"
+                ),
+                Appointment.from_datetimes(meeting_start, meeting_end, 3, "Launchpad"),
+            ]
+        ),
     )
 
     insert_start_datetime: datetime = datetime.now(
@@ -326,16 +315,15 @@ def test_appointments_overlap_both_booked(mocker):
     ) + timedelta(days=1, hours=2)
 
     mocker.patch(
-        "core.utils.google_calendar_utils.get_appointments",
-        return_value=[
-            (
-                meeting_start,
-                meeting_end,
-                3,
-                "Wall Street",
-            ),
-            (meeting_start, meeting_end, 3, "Launchpad"),
-        ],
+        "core.utils.google_calendar_utils.get_room_index",
+        return_value=RoomIntervalIndex.from_appointments(
+            [
+                Appointment.from_datetimes(
+                    meeting_start, meeting_end, 3, "Wall Street"
+                ),
+                Appointment.from_datetimes(meeting_start, meeting_end, 3, "Launchpad"),
+            ]
+        ),
     )
 
     insert_start_datetime: datetime = datetime.now(
@@ -362,15 +350,12 @@ def test_appointments_overlap_radio_city_booked(mocker):
     ) + timedelta(hours=2)
 
     mocker.patch(
-        "core.utils.google_calendar_utils.get_appointments",
-        return_value=[
-            (
-                meeting_start,
-                meeting_end,
-                4,
-                "Radio City",
-            ),
-        ],
+        "core.utils.google_calendar_utils.get_room_index",
+        return_value=RoomIntervalIndex.from_appointments(
+            [
+                Appointment.from_datetimes(meeting_start, meeting_end, 4, "Radio City"),
+            ]
+        ),
     )
 
     insert_start_datetime: datetime = datetime.now(
@@ -411,15 +396,12 @@ def test_appointments_overlap_radio_city_booked(mocker):
     ) + timedelta(days=1, hours=2)
 
     mocker.patch(
-        "core.utils.google_calendar_utils.get_appointments",
-        return_value=[
-            (
-                meeting_start,
-                meeting_end,
-                4,
-                "Radio City",
-            ),
-        ],
+        "core.utils.google_calendar_utils.get_room_index",
+        return_value=RoomIntervalIndex.from_appointments(
+            [
+                Appointment.from_datetimes(meeting_start, meeting_end, 4, "Radio City"),
+            ]
+        ),
     )
 
     insert_start_datetime: datetime = datetime.now(
@@ -470,3 +452,356 @@ def test_create_event(mocker):
         number_of_people - 1,
         location_summary,
     )
+
+
+def test_update_room_index_applies_sync_changes(mocker):
+    index = RoomIntervalIndex()
+    mocker.patch("core.utils.google_calendar_utils.room_index", index)
+    event = {
+        "id": "event-1",
+        "start": {"dateTime": "2024-05-03T10:00:00"},
+        "end": {"dateTime": "2024-05-03T12:00:00"},
+        "attendees": [{"additionalGuests": 2}],
+        "summary": "Launchpad",
+    }
+
+    update_room_index([event], [], True)
+    assert index.overlaps(
+        "Launchpad",
+        to_epoch(datetime(2024, 5, 3, 11, 0)),
+        to_epoch(datetime(2024, 5, 3, 13, 0)),
+    )
+
+    update_room_index([], ["event-1"], False)
+    assert not index
+
+
+def test_appointments_overlap_reuses_snapshot_decision(mocker):
+    get_room_index_mock = mocker.patch(
+        "core.utils.google_calendar_utils.get_room_index",
+        return_value=RoomIntervalIndex(),
+    )
+    find_available_room_mock = mocker.patch(
+        "core.utils.google_calendar_utils.find_available_room",
+        return_value=(False, "Radio City"),
+    )
+    start: datetime = datetime.now(timezone.get_current_timezone()).replace(
+        minute=0, second=0
+    ) + timedelta(hours=1)
+    end: datetime = start + timedelta(minutes=30)
+
+    snapshot = AppointmentSnapshot.capture()
+    assert appointments_overlap(start, end, 6, snapshot) == (False, "Radio City")
+    assert appointments_overlap(start, end, 6, snapshot) == (False, "Radio City")
+
+    get_room_index_mock.assert_called_once()
+    find_available_room_mock.assert_called_once()
+
+
+def test_get_appointments_window_reads_the_synced_store(mocker):
+    list_events_mock = mocker.patch.object(GoogleCalendarService, "list_events")
+    mocker.patch.object(GoogleCalendarService, "refresh_events", return_value=True)
+    events_between_mock = mocker.patch.object(
+        GoogleCalendarService,
+        "events_between",
+        return_value=[
+            {
+                "start": {"dateTime": "2024-05-03T10:00:00"},
+                "end": {"dateTime": "2024-05-03T12:00:00"},
+                "attendees": [{"additionalGuests": 5}],
+                "summary": "Radio City",
+            },
+            {
+                "start": {"dateTime": "2024-05-03T10:00:00"},
+                "end": {"dateTime": "2024-05-03T11:00:00"},
+                "attendees": [{"additionalGuests": 1}],
+                "summary": "Launchpad",
+            },
+        ],
+    )
+
+    appointments = get_appointments(datetime(2024, 5, 3), datetime(2024, 5, 4))
+
+    events_between_mock.assert_called_once_with(
+        datetime(2024, 5, 3), datetime(2024, 5, 4)
+    )
+    list_events_mock.assert_not_called()
+    assert [appointment.room for appointment in appointments] == [
+        "Radio City",
+        "Launchpad",
+    ]
+
+
+def test_get_appointments_merges_room_calendars(mocker, settings):
+    settings.GOOGLE_CALENDAR_USE_ROOM_CALENDARS = True
+    settings.MEETING_ROOMS = [
+        {"name": "Launchpad", "capacity": 4, "calendar_id": "launchpad"},
+        {"name": "Radio City", "capacity": 10, "calendar_id": "radio"},
+    ]
+
+    def event(start: str) -> dict:
+        return {
+            "start": {"dateTime": start},
+            "end": {"dateTime": start.replace("T1", "T2")},
+            "attendees": [{"additionalGuests": 0}],
+            "summary": "Team sync",
+        }
+
+    list_room_events_mock = mocker.patch.object(
+        google_calendar_utils.calendar_service,
+        "list_room_events",
+        return_value={
+            "Launchpad": [event("2024-05-03T10:00:00"), event("2024-05-03T13:00:00")],
+            "Radio City": [event("2024-05-03T11:00:00")],
+        },
+    )
+    start = datetime(2024, 5, 3)
+
+    appointments = get_appointments(start, start + timedelta(days=1))
+
+    assert [
+        (appointment.start_datetime.hour, appointment.room)
+        for appointment in appointments
+    ] == [
+        (10, "Launchpad"),
+        (11, "Radio City"),
+        (13, "Launchpad"),
+    ]
+    list_room_events_mock.assert_called_once()
+
+
+def test_get_status_timeline_rebuilds_only_when_events_change(mocker):
+    calendar_service = GoogleCalendarService()
+    stored_events_mock = mocker.patch.object(
+        GoogleCalendarService, "stored_events", return_value=[]
+    )
+    mocker.patch.object(calendar_service, "store_version", 1)
+
+    timeline = get_status_timeline()
+    assert get_status_timeline() is timeline
+    stored_events_mock.assert_called_once()
+
+    calendar_service.store_version += 1
+    assert get_status_timeline() is not timeline
+    assert stored_events_mock.call_count == 2
+
+
+def test_appointments_overlap_uses_free_busy_when_enabled(mocker, settings):
+    settings.GOOGLE_CALENDAR_USE_FREEBUSY = True
+    settings.MEETING_ROOMS = [
+        {"name": "Launchpad", "capacity": 4, "calendar_id": "launchpad@example.com"},
+        {
+            "name": "Wall Street",
+            "capacity": 4,
+            "calendar_id": "wall-street@example.com",
+        },
+        {"name": "Radio City", "capacity": 10, "calendar_id": "radio-city@example.com"},
+    ]
+    start: datetime = datetime.now(timezone.get_current_timezone()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    end: datetime = start + timedelta(hours=1)
+    query_free_busy_mock = mocker.patch.object(
+        GoogleCalendarService,
+        "query_free_busy",
+        return_value={
+            "launchpad@example.com": [(start, end)],
+            "wall-street@example.com": [],
+            "radio-city@example.com": [],
+        },
+    )
+    get_room_index_mock = mocker.patch(
+        "core.utils.google_calendar_utils.get_room_index"
+    )
+
+    assert appointments_overlap(start, end, 3) == (False, "Wall Street")
+    query_free_busy_mock.assert_called_once()
+    get_room_index_mock.assert_not_called()
+
+
+def make_batch_events() -> list[dict]:
+    return [
+        {
+            "start": {"dateTime": f"2024-05-{day:02d}T{hour:02d}:00:00{offset}"},
+            "end": {"dateTime": f"2024-05-{day:02d}T{hour + 1:02d}:30:00{offset}"},
+            "attendees": [{"additionalGuests": hour % 3}],
+            "summary": ["Launchpad", "Wall Street", "Radio City"][day % 3],
+        }
+        for day in range(28, 0, -1)
+        for hour in range(17, 8, -2)
+        for offset in ["-07:00", "Z", ""]
+    ] + [
+        {
+            "start": {"date": "2024-05-03"},
+            "end": {"date": "2024-05-04"},
+            "attendees": [{}],
+            "summary": "Launchpad",
+        },
+        {
+            "start": {"dateTime": "2024-05-03T12:00:00Z"},
+            "end": {"dateTime": "2024-05-03T13:00:00Z"},
+        },
+        {
+            "start": {"dateTime": "2024-05-03T12:00:00Z"},
+            "end": {"dateTime": "2024-05-03T13:00:00Z"},
+            "summary": "Radio City",
+        },
+    ]
+
+
+def test_batch_parsing_matches_per_event_parsing(mocker):
+    pytest.importorskip("numpy")
+    events = make_batch_events()
+    mocker.patch("core.utils.google_calendar_utils.BATCH_PARSE_MIN_EVENTS", 0)
+    parse_appointment_mock = mocker.patch(
+        "core.utils.google_calendar_utils.parse_appointment"
+    )
+
+    batch_sorted = sort_appointments(events)
+    batch_presorted = sort_appointments(events, presorted=True)
+
+    parse_appointment_mock.assert_not_called()
+    mocker.stopall()
+    assert batch_sorted == sorted(iter_appointments(events))
+    assert batch_presorted == list(iter_appointments(events))
+
+
+def test_sort_appointments_falls_back_without_numpy(mocker):
+    events = make_batch_events()
+    mocker.patch.dict(sys.modules, {"numpy": None})
+    mocker.patch("core.utils.google_calendar_utils.BATCH_PARSE_MIN_EVENTS", 0)
+
+    assert parse_appointments_batch(events) is None
+    assert sort_appointments(events) == sorted(iter_appointments(events))
+
+
+def test_availability_matrix_matches_appointments_overlap():
+    day: datetime = datetime.now(timezone.get_current_timezone()).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    snapshot = AppointmentSnapshot(
+        RoomIntervalIndex.from_appointments(
+            [
+                Appointment.from_datetimes(
+                    day.replace(hour=9), day.replace(hour=11), 2, "Launchpad"
+                ),
+                Appointment.from_datetimes(
+                    day.replace(hour=10),
+                    day.replace(hour=10, minute=30),
+                    1,
+                    "Wall Street",
+                ),
+                Appointment.from_datetimes(
+                    day.replace(hour=14), day.replace(hour=17), 6, "Radio City"
+                ),
+            ]
+        )
+    )
+    intervals = [
+        (start, start + timedelta(minutes=45))
+        for start in (day + timedelta(minutes=15 * step) for step in range(-8, 96))
+    ]
+    party_sizes = [0, 2, 4, 6, 12]
+
+    matrix = availability_matrix(intervals, party_sizes, snapshot)
+
+    assert matrix == [
+        [
+            appointments_overlap(start, end, number_of_people, snapshot)
+            for number_of_people in party_sizes
+        ]
+        for start, end in intervals
+    ]
+    assert matrix[40 + 8][1:3] == [(True, "Both"), (True, "Both")]
+
+
+def test_parse_appointment_skips_events_without_a_room():
+    event = {
+        "id": "personal",
+        "start": {"dateTime": "2024-05-03T09:00:00-07:00"},
+        "end": {"dateTime": "2024-05-03T10:00:00-07:00"},
+    }
+    assert parse_appointment(event) is None
+
+    event["summary"] = "Launchpad"
+    appointment = parse_appointment(event)
+    assert appointment.room == "Launchpad"
+    assert appointment.additional_guests == 0
+
+
+def test_capture_for_checks_room_calendars_when_enabled(mocker, settings):
+    settings.GOOGLE_CALENDAR_USE_ROOM_CALENDARS = True
+    settings.MEETING_ROOMS = [
+        {"name": "Launchpad", "capacity": 4, "calendar_id": "launchpad"},
+        {"name": "Wall Street", "capacity": 4, "calendar_id": "wall-street"},
+    ]
+    start: datetime = datetime.now(timezone.get_current_timezone()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    end: datetime = start + timedelta(hours=1)
+    list_room_events_mock = mocker.patch.object(
+        google_calendar_utils.calendar_service,
+        "list_room_events",
+        return_value={
+            "Launchpad": [
+                {
+                    "start": {"dateTime": start.isoformat()},
+                    "end": {"dateTime": end.isoformat()},
+                }
+            ],
+            "Wall Street": [],
+        },
+    )
+    get_room_index_mock = mocker.patch(
+        "core.utils.google_calendar_utils.get_room_index"
+    )
+
+    assert appointments_overlap(start, end, 3) == (False, "Wall Street")
+    list_room_events_mock.assert_called_once()
+    assert list_room_events_mock.call_args.args[2] == {
+        "Launchpad": "launchpad",
+        "Wall Street": "wall-street",
+    }
+    get_room_index_mock.assert_not_called()
+
+
+def test_acapture_for_checks_room_calendars_when_enabled(mocker, settings):
+    settings.GOOGLE_CALENDAR_USE_ROOM_CALENDARS = True
+    settings.MEETING_ROOMS = [
+        {"name": "Launchpad", "capacity": 4, "calendar_id": "launchpad"},
+    ]
+    start: datetime = datetime(2024, 5, 3, 10, tzinfo=timezone.get_current_timezone())
+    list_room_events_mock = mocker.patch.object(
+        google_calendar_utils.async_calendar_service,
+        "list_room_events",
+        return_value={
+            "Launchpad": [
+                {
+                    "start": {"dateTime": start.isoformat()},
+                    "end": {"dateTime": (start + timedelta(hours=1)).isoformat()},
+                }
+            ]
+        },
+    )
+
+    snapshot = async_to_sync(AppointmentSnapshot.acapture_for)(
+        start, start + timedelta(hours=1)
+    )
+
+    list_room_events_mock.assert_awaited_once()
+    assert snapshot.room_index.overlaps(
+        "Launchpad", to_epoch(start), to_epoch(start + timedelta(minutes=30))
+    )
+
+
+def test_room_status_is_unknown_before_the_first_sync(settings):
+    settings.RESERVATION_MIRROR_ENABLED = False
+    snapshot = AppointmentSnapshot(RoomIntervalIndex())
+
+    assert snapshot.is_too_stale_to_book
+    assert get_room_status(snapshot)["is_unknown"]
+    assert not get_room_status(snapshot)["is_available"]
+
+    snapshot.with_staleness(0.0)
+    assert not snapshot.is_too_stale_to_book
+    assert get_room_status(snapshot)["is_available"]
@@ -0,0 +1,100 @@
+import threading
+import time
+import pytest
+from core.utils.google_calendar_service import GoogleCalendarService
+from core.utils.http_pool_utils import HttpPool, SharedCredentials
+
+
+class ExpiringCredentials:
+    def __init__(self):
+        self.token = "expired"
+        self.valid = False
+        self.refresh_calls = 0
+
+    def refresh(self, request):
+        self.refresh_calls += 1
+        time.sleep(0.01)
+        self.token = f"token-{self.refresh_calls}"
+        self.valid = True
+
+    def apply(self, headers, token=None):
+        headers["authorization"] = f"Bearer {token or self.token}"
+
+
+def run_in_threads(target, count: int):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_pool_never_hands_out_more_transports_than_its_size():
+    pool = HttpPool(object, 2)
+    peak_in_use: list[int] = []
+
+    def call():
+        with pool.checkout():
+            peak_in_use.append(pool.metrics()["in_use"])
+            time.sleep(0.01)
+
+    run_in_threads(call, 8)
+
+    metrics = pool.metrics()
+    assert max(peak_in_use) <= 2
+    assert metrics["created"] == 2
+    assert metrics["idle"] == 2
+    assert metrics["checkouts"] == 8
+    assert metrics["waits"] > 0
+    assert metrics["max_wait_seconds"] > 0
+
+
+def test_pool_reuses_idle_transport():
+    pool = HttpPool(object, 4)
+
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        pass
+
+    assert first is second
+    assert pool.metrics()["created"] == 1
+
+
+def test_pool_times_out_when_exhausted():
+    pool = HttpPool(object, 1, timeout=0.01)
+
+    with pool.checkout():
+        with pytest.raises(TimeoutError):
+            with pool.checkout():
+                pass
+
+
+def test_shared_credentials_refresh_once_for_concurrent_requests():
+    credentials = ExpiringCredentials()
+    shared_credentials = SharedCredentials(credentials)
+    headers: list[dict] = []
+
+    def request():
+        request_headers: dict = {}
+        shared_credentials.before_request(None, "GET", "/", request_headers)
+        headers.append(request_headers)
+
+    run_in_threads(request, 5)
+
+    assert credentials.refresh_calls == 1
+    assert shared_credentials.refresh_count == 1
+    assert {header["authorization"] for header in headers} == {"Bearer token-1"}
+
+
+def test_service_executes_requests_on_pooled_transport(mocker):
+    service = GoogleCalendarService()
+    mocker.patch.object(service, "service", mocker.MagicMock())
+    transport = object()
+    service.http_pool = HttpPool(lambda: transport, 1)
+    request = service.service.events.return_value.insert.return_value
+    request.execute.return_value = {"id": "a"}
+
+    assert service.insert_event({"summary": "Launchpad"}) == {"id": "a"}
+    request.execute.assert_called_once_with(http=transport)
+    assert service.http_pool.metrics()["checkouts"] == 1
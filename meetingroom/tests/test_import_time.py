@@ -0,0 +1,49 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR: Path = Path(__file__).resolve().parent.parent
+IMPORT_TIME_BUDGET_US: int = 1_000_000
+
+
+def measure_imports() -> dict[str, int]:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import django; django.setup(); import core.urls",
+        ],
+        cwd=PROJECT_DIR,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "meetingroom.settings"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)", line)
+        if match:
+            cumulative_times[match.group(3)] = int(match.group(1))
+    return cumulative_times
+
+
+def test_startup_does_not_import_google_client():
+    imported_modules = measure_imports()
+
+    assert not [
+        module
+        for module in imported_modules
+        if module.startswith(
+            ("googleapiclient", "google_auth_oauthlib", "google.oauth2")
+        )
+    ]
+
+
+def test_startup_import_time_within_budget():
+    imported_modules = measure_imports()
+
+    assert imported_modules["core.urls"] < IMPORT_TIME_BUDGET_US
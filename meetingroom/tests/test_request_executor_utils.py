@@ -0,0 +1,106 @@
+import json
+import httplib2
+import pytest
+from asgiref.sync import async_to_sync
+from googleapiclient.errors import HttpError
+from core.utils.google_calendar_service import is_retryable_error
+from core.utils.request_executor_utils import RequestExecutor, RetryBudget, TokenBucket
+
+
+def http_error(status: int, reason: str = "backendError") -> HttpError:
+    content = json.dumps({"error": {"errors": [{"reason": reason}]}}).encode()
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+def make_executor(retry_budget: RetryBudget = None) -> RequestExecutor:
+    executor = RequestExecutor(
+        TokenBucket(1000), retry_budget or RetryBudget(), is_retryable_error
+    )
+    executor.get_retry_delay = lambda attempt: 0
+    return executor
+
+
+def flaky(*outcomes):
+    remaining = list(outcomes)
+
+    def call():
+        outcome = remaining.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return call
+
+
+def test_retries_rate_limit_and_server_errors():
+    executor = make_executor()
+
+    result = executor.run(
+        flaky(
+            http_error(429), http_error(403, "rateLimitExceeded"), http_error(503), "ok"
+        )
+    )
+
+    assert result == "ok"
+    assert executor.metrics()["attempts"] == 4
+    assert executor.metrics()["retries"] == 3
+
+
+def test_does_not_retry_client_errors():
+    executor = make_executor()
+
+    with pytest.raises(HttpError):
+        executor.run(flaky(http_error(403, "forbidden"), "ok"))
+
+    assert executor.metrics()["retries"] == 0
+    assert executor.metrics()["failures"] == 1
+
+
+def test_writes_are_only_retried_when_rate_limited():
+    executor = make_executor()
+
+    with pytest.raises(HttpError):
+        executor.run(flaky(http_error(500), "ok"), idempotent=False)
+    assert executor.run(flaky(http_error(429), "ok"), idempotent=False) == "ok"
+
+
+def test_gives_up_after_max_attempts():
+    executor = make_executor()
+
+    with pytest.raises(HttpError):
+        executor.run(flaky(*[http_error(500)] * 5))
+
+    assert executor.metrics()["attempts"] == executor.max_attempts
+
+
+def test_retry_budget_stops_retry_storms():
+    executor = make_executor(RetryBudget(ratio=0.1, minimum=2))
+
+    for _ in range(3):
+        with pytest.raises(HttpError):
+            executor.run(flaky(*[http_error(500)] * 5))
+
+    metrics = executor.metrics()
+    assert metrics["retries"] == 2
+    assert metrics["retry_budget_exhausted"] == 3
+
+
+def test_token_bucket_spaces_out_bursts():
+    bucket = TokenBucket(rate_per_second=10, capacity=2)
+
+    delays = [bucket.reserve() for _ in range(4)]
+
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_async_run_retries():
+    executor = make_executor()
+    call = flaky(http_error(429), "ok")
+
+    async def attempt():
+        return call()
+
+    assert async_to_sync(executor.arun)(attempt) == "ok"
+    assert executor.metrics()["retries"] == 1
@@ -0,0 +1,127 @@
+import pytest
+import time
+from datetime import datetime, timedelta
+from django.utils import timezone
+from core.models import Reservation
+from core.utils.appointment_utils import Appointment, to_epoch
+from core.utils.google_calendar_utils import (
+    AppointmentSnapshot,
+    appointments_overlap,
+    availability_matrix,
+    mirror_calendar_changes,
+)
+from core.utils.reservation_mirror_utils import (
+    ReservationIndex,
+    get_mirrored_appointments,
+    record_mirror_sync,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def make_event(event_id: str, start: datetime, end: datetime, summary: str) -> dict:
+    return {
+        "id": event_id,
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": end.isoformat()},
+        "attendees": [{"additionalGuests": 1}],
+        "summary": summary,
+    }
+
+
+@pytest.fixture
+def meeting_start() -> datetime:
+    return timezone.localtime(timezone.now()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+
+
+def test_mirror_calendar_changes_applies_full_and_incremental_syncs(meeting_start):
+    meeting_end = meeting_start + timedelta(hours=1)
+    mirror_calendar_changes(
+        [
+            make_event("a", meeting_start, meeting_end, "Launchpad"),
+            make_event("b", meeting_start, meeting_end, "Wall Street"),
+        ],
+        [],
+        True,
+    )
+    mirror_calendar_changes(
+        [make_event("c", meeting_start, meeting_end, "Radio City")], ["a"], False
+    )
+
+    assert set(Reservation.objects.values_list("event_id", flat=True)) == {"b", "c"}
+    assert set(get_mirrored_appointments(meeting_start, meeting_end)) == {
+        Appointment.from_datetimes(meeting_start, meeting_end, 1, "Radio City"),
+        Appointment.from_datetimes(meeting_start, meeting_end, 1, "Wall Street"),
+    }
+
+
+def test_reservation_index_range_queries(meeting_start):
+    meeting_end = meeting_start + timedelta(hours=1)
+    mirror_calendar_changes(
+        [make_event("a", meeting_start, meeting_end, "Launchpad")], [], True
+    )
+    index = ReservationIndex()
+
+    start, end = to_epoch(meeting_start), to_epoch(meeting_end)
+
+    assert index.overlaps("Launchpad", start + 30 * 60, end)
+    assert index.conflicts("Launchpad", start, end) == [(start, end)]
+    assert not index.overlaps("Launchpad", end, end + 60 * 60)
+    assert not index.overlaps("Wall Street", start, end)
+
+
+def test_appointments_overlap_reads_the_mirror(mocker, settings, meeting_start):
+    settings.RESERVATION_MIRROR_ENABLED = True
+    meeting_end = meeting_start + timedelta(hours=1)
+    mirror_calendar_changes(
+        [make_event("a", meeting_start, meeting_end, "Launchpad")], [], True
+    )
+    get_room_index_mock = mocker.patch(
+        "core.utils.google_calendar_utils.get_room_index"
+    )
+
+    assert appointments_overlap(meeting_start, meeting_end, 2) == (
+        False,
+        "Wall Street",
+    )
+    get_room_index_mock.assert_not_called()
+
+
+def test_availability_matrix_loads_the_mirror_once(
+    django_assert_max_num_queries, settings, meeting_start
+):
+    settings.RESERVATION_MIRROR_ENABLED = True
+    meeting_end = meeting_start + timedelta(hours=1)
+    mirror_calendar_changes(
+        [
+            make_event("a", meeting_start, meeting_end, "Launchpad"),
+            make_event("b", meeting_start, meeting_end, "Radio City"),
+        ],
+        [],
+        True,
+    )
+    intervals = [
+        (meeting_start + timedelta(minutes=minutes), meeting_end)
+        for minutes in range(0, 60, 15)
+    ]
+
+    with django_assert_max_num_queries(2):
+        matrix = availability_matrix(intervals, [2, 6])
+
+    assert matrix == [[(False, "Wall Street"), (True, "Radio City")]] * 4
+
+
+def test_mirror_snapshot_age_comes_from_the_worker_sync(settings):
+    settings.RESERVATION_MIRROR_ENABLED = True
+
+    assert AppointmentSnapshot.capture().is_too_stale_to_book
+
+    record_mirror_sync(time.time() - 60)
+    snapshot = AppointmentSnapshot.capture()
+    assert 59 <= snapshot.staleness_seconds < 70
+    assert not snapshot.is_too_stale_to_book
+
+    record_mirror_sync(time.time() - settings.BOOKING_MAX_STALENESS_SECONDS - 1)
+    assert AppointmentSnapshot.capture().is_too_stale_to_book
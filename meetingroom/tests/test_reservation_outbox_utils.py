@@ -0,0 +1,226 @@
+import httplib2
+import pytest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from googleapiclient.errors import HttpError
+from core.models import Reservation, ReservationRequest
+from core.utils.appointment_utils import to_epoch
+from core.utils.google_calendar_service import GoogleCalendarService
+from core.utils.google_calendar_utils import AppointmentSnapshot
+from core.utils.reservation_outbox_utils import (
+    OUTBOX_CONFIRMED_HOLD_SECONDS,
+    OUTBOX_MAX_ATTEMPTS,
+    PendingReservationIndex,
+    drain_outbox,
+    queue_room,
+    send_reservation,
+)
+from core.utils.room_index_utils import RoomIntervalIndex
+
+client = Client()
+
+
+@pytest.fixture(autouse=True)
+def shared_room_index(mocker):
+    return mocker.patch("core.utils.booking_utils.room_index", RoomIntervalIndex())
+
+
+@pytest.fixture
+def meeting_start() -> datetime:
+    return timezone.localtime(timezone.now()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+
+
+def queue(meeting_start: datetime, number_of_people: int = 6):
+    return queue_room(
+        "Test Event",
+        "test@example.com",
+        meeting_start,
+        meeting_start + timedelta(hours=1),
+        number_of_people,
+        AppointmentSnapshot(RoomIntervalIndex()),
+    )
+
+
+@pytest.mark.django_db
+def test_queue_room_writes_pending_reservation_without_calling_google(
+    mocker, meeting_start
+):
+    insert_event_mock = mocker.patch.object(GoogleCalendarService, "insert_event")
+
+    has_time_conflict, location, reservation = queue(meeting_start)
+
+    assert (has_time_conflict, location) == (False, "Radio City")
+    assert reservation.status == ReservationRequest.PENDING
+    insert_event_mock.assert_not_called()
+    assert queue(meeting_start)[:2] == (True, "Radio City")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_drain_outbox_confirms_reservations(mocker, meeting_start):
+    insert_event_mock = mocker.patch.object(GoogleCalendarService, "insert_event")
+    _, _, first = queue(meeting_start)
+    _, _, second = queue(meeting_start + timedelta(hours=2))
+
+    assert drain_outbox(max_workers=2) == 2
+
+    assert set(ReservationRequest.objects.values_list("status", flat=True)) == {
+        ReservationRequest.CONFIRMED
+    }
+    inserted_ids = {call.args[0]["id"] for call in insert_event_mock.call_args_list}
+    assert inserted_ids == {first.event_id, second.event_id}
+
+
+@pytest.mark.django_db
+def test_send_reservation_retries_with_backoff_then_fails(mocker, meeting_start):
+    mocker.patch.object(
+        GoogleCalendarService,
+        "insert_event",
+        side_effect=HttpError(httplib2.Response({"status": 503}), b"Unavailable"),
+    )
+    _, _, reservation = queue(meeting_start)
+
+    assert send_reservation(reservation.pk) == ReservationRequest.PENDING
+    reservation.refresh_from_db()
+    assert reservation.attempts == 1
+    assert reservation.next_attempt_at > timezone.now()
+    assert "Unavailable" in reservation.last_error
+    assert drain_outbox(max_workers=1) == 0
+
+    ReservationRequest.objects.filter(pk=reservation.pk).update(
+        attempts=OUTBOX_MAX_ATTEMPTS - 1
+    )
+    assert send_reservation(reservation.pk) == ReservationRequest.FAILED
+
+    # A failed send frees the slot again.
+    assert queue(meeting_start)[:2] == (False, "Radio City")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("mirror", [False, True])
+def test_confirmed_reservation_holds_its_slot_until_synced(
+    mocker, settings, meeting_start, mirror
+):
+    settings.RESERVATION_MIRROR_ENABLED = mirror
+    mocker.patch.object(GoogleCalendarService, "insert_event")
+    stored_event_ids_mock = mocker.patch.object(
+        GoogleCalendarService, "stored_event_ids", return_value=set()
+    )
+    _, _, reservation = queue(meeting_start)
+
+    assert send_reservation(reservation.pk) == ReservationRequest.CONFIRMED
+    assert queue(meeting_start)[:2] == (True, "Radio City")
+
+    # Once synced, the booking is in the calendar index and the row lets go.
+    if mirror:
+        Reservation.objects.create(
+            event_id=reservation.event_id,
+            room=reservation.room,
+            start=reservation.start,
+            end=reservation.end,
+        )
+    else:
+        stored_event_ids_mock.return_value = {reservation.event_id}
+    assert not PendingReservationIndex().overlaps(
+        "Radio City", to_epoch(reservation.start), to_epoch(reservation.end)
+    )
+
+
+@pytest.mark.django_db
+def test_confirmed_reservation_hold_expires(mocker, meeting_start):
+    mocker.patch.object(GoogleCalendarService, "insert_event")
+    _, _, reservation = queue(meeting_start)
+    send_reservation(reservation.pk)
+
+    ReservationRequest.objects.filter(pk=reservation.pk).update(
+        confirmed_at=timezone.now()
+        - timedelta(seconds=OUTBOX_CONFIRMED_HOLD_SECONDS + 1)
+    )
+
+    assert not PendingReservationIndex()
+
+
+@pytest.mark.django_db
+def test_send_reservation_treats_duplicate_insert_as_confirmed(mocker, meeting_start):
+    mocker.patch.object(
+        GoogleCalendarService,
+        "insert_event",
+        side_effect=HttpError(httplib2.Response({"status": 409}), b"Duplicate"),
+    )
+    get_event_mock = mocker.patch.object(GoogleCalendarService, "get_event")
+    _, _, reservation = queue(meeting_start)
+    get_event_mock.return_value = {
+        "id": reservation.event_id,
+        "status": "confirmed",
+        "summary": "Radio City",
+        "start": {"dateTime": meeting_start.astimezone(dt_timezone.utc).isoformat()},
+    }
+
+    assert send_reservation(reservation.pk) == ReservationRequest.CONFIRMED
+    get_event_mock.assert_called_once_with(reservation.event_id)
+
+
+@pytest.mark.django_db
+def test_send_reservation_fails_when_the_id_belongs_to_a_deleted_event(
+    mocker, meeting_start
+):
+    mocker.patch.object(
+        GoogleCalendarService,
+        "insert_event",
+        side_effect=HttpError(httplib2.Response({"status": 409}), b"Duplicate"),
+    )
+    _, _, reservation = queue(meeting_start)
+    mocker.patch.object(
+        GoogleCalendarService,
+        "get_event",
+        return_value={
+            "id": reservation.event_id,
+            "status": "cancelled",
+            "summary": "Radio City",
+            "start": {"dateTime": meeting_start.isoformat()},
+        },
+    )
+
+    assert send_reservation(reservation.pk) == ReservationRequest.FAILED
+
+
+@pytest.mark.django_db
+def test_reservation_event_ids_are_random_base32hex(meeting_start):
+    _, _, first = queue(meeting_start)
+    _, _, second = queue(meeting_start + timedelta(hours=2))
+
+    assert first.event_id != second.event_id
+    for event_id in (first.event_id, second.event_id):
+        assert 5 <= len(event_id) <= 1024
+        assert set(event_id) <= set("0123456789abcdefghijklmnopqrstuv")
+
+
+@pytest.mark.django_db
+def test_reservation_status_view(meeting_start):
+    _, _, reservation = queue(meeting_start)
+
+    response = client.get(reverse("reservation_status", args=[reservation.pk]))
+
+    assert response.status_code == 200
+    assert response.json()["status"] == ReservationRequest.PENDING
+    assert response.json()["room"] == "Radio City"
+    assert (
+        client.get(reverse("reservation_status", args=[reservation.pk + 1])).status_code
+        == 404
+    )
+
+
+@pytest.mark.django_db
+def test_pending_reservations_report_conflicts(meeting_start):
+    queue(meeting_start)
+    start, end = to_epoch(meeting_start), to_epoch(meeting_start + timedelta(hours=1))
+    index = PendingReservationIndex()
+
+    assert index.conflicts("Radio City", start - 30 * 60, start + 30 * 60) == [
+        (start, end)
+    ]
+    assert index.conflicts("Radio City", end, end + 60 * 60) == []
+    assert index.conflicts("Launchpad", start, end) == []
@@ -1,12 +1,25 @@
-from datetime import datetime, time
+import pytest
+from datetime import datetime, time, timedelta
+from django.utils import timezone
 from django.http import HttpRequest
 from django.http.response import HttpResponse
 from core.utils.reservation_utils import (
     render_reservation_form,
     validate_form_data,
     get_form_data,
-    process_reservation_form,
+    aprocess_reservation_form,
 )
+from asgiref.sync import async_to_sync
+from core.utils.appointment_utils import Appointment
+from core.utils.room_index_utils import RoomIntervalIndex
+
+
+@pytest.fixture(autouse=True)
+def verified_calendar(mocker):
+    return mocker.patch(
+        "core.utils.google_calendar_utils.calendar_service.staleness_seconds",
+        return_value=0.0,
+    )
 
 
 def test_render_reservation_form():
@@ -49,7 +62,7 @@ def test_get_form_data():
     assert number_of_people == 5
 
 
-def test_process_reservation_form(mocker):
+def test_aprocess_reservation_form(mocker):
     req = HttpRequest()
     req.POST = {
         "name": "Test Event",
@@ -64,5 +77,176 @@ def test_process_reservation_form(mocker):
     form_instance.cleaned_data = req.POST
     mock_event_form_class.return_value = form_instance
 
-    response = process_reservation_form(req)
+    response = async_to_sync(aprocess_reservation_form)(req)
     assert isinstance(response, HttpResponse)
+
+
+def test_aprocess_reservation_form_reads_calendar_once(mocker):
+    req = HttpRequest()
+    req.method = "POST"
+    start: datetime = timezone.localtime(timezone.now()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    req.POST = {
+        "name": "Test Event",
+        "start_datetime": start.strftime("%Y-%m-%dT%H:%M:%S"),
+        "end_datetime": (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S"),
+        "email": "test@example.com",
+        "number_of_people": 5,
+    }
+    aget_room_index_mock = mocker.patch(
+        "core.utils.google_calendar_utils.aget_room_index",
+        return_value=RoomIntervalIndex(),
+    )
+    acreate_event_mock = mocker.patch(
+        "core.utils.booking_utils.acreate_event",
+        return_value={
+            "id": "event-1",
+            "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": (start + timedelta(hours=1)).isoformat()},
+            "attendees": [{"additionalGuests": 4}],
+            "summary": "Radio City",
+        },
+    )
+    mocker.patch("core.utils.booking_utils.room_index", RoomIntervalIndex())
+
+    response = async_to_sync(aprocess_reservation_form)(req)
+
+    assert response.status_code == 200
+    aget_room_index_mock.assert_awaited_once()
+    assert acreate_event_mock.call_args.args[5] == "Radio City"
+
+
+def test_aprocess_reservation_form_books_without_blocking_calls(mocker):
+    req = HttpRequest()
+    req.method = "POST"
+    start: datetime = timezone.localtime(timezone.now()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    req.POST = {
+        "name": "Test Event",
+        "start_datetime": start.strftime("%Y-%m-%dT%H:%M:%S"),
+        "end_datetime": (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S"),
+        "email": "test@example.com",
+        "number_of_people": 2,
+    }
+    aget_room_index_mock = mocker.patch(
+        "core.utils.google_calendar_utils.aget_room_index",
+        return_value=RoomIntervalIndex(),
+    )
+    get_room_index_mock = mocker.patch(
+        "core.utils.google_calendar_utils.get_room_index"
+    )
+    acreate_event_mock = mocker.patch(
+        "core.utils.booking_utils.acreate_event",
+        return_value={
+            "id": "event-1",
+            "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": (start + timedelta(hours=1)).isoformat()},
+            "attendees": [{"additionalGuests": 1}],
+            "summary": "Launchpad",
+        },
+    )
+    shared_index = RoomIntervalIndex()
+    mocker.patch("core.utils.booking_utils.room_index", shared_index)
+
+    response = async_to_sync(aprocess_reservation_form)(req)
+
+    assert response.status_code == 200
+    aget_room_index_mock.assert_awaited_once()
+    get_room_index_mock.assert_not_called()
+    acreate_event_mock.assert_awaited_once()
+    assert len(shared_index) == 1
+
+
+def test_aprocess_reservation_form_refuses_when_calendar_is_stale(mocker, settings):
+    settings.BOOKING_MAX_STALENESS_SECONDS = 300
+    req = HttpRequest()
+    req.method = "POST"
+    start: datetime = timezone.localtime(timezone.now()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    req.POST = {
+        "name": "Test Event",
+        "start_datetime": start.strftime("%Y-%m-%dT%H:%M:%S"),
+        "end_datetime": (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S"),
+        "email": "test@example.com",
+        "number_of_people": 2,
+    }
+    mocker.patch(
+        "core.utils.google_calendar_utils.aget_room_index",
+        return_value=RoomIntervalIndex(),
+    )
+    mocker.patch(
+        "core.utils.google_calendar_utils.calendar_service.staleness_seconds",
+        return_value=900.0,
+    )
+    acreate_event_mock = mocker.patch("core.utils.booking_utils.acreate_event")
+
+    response = async_to_sync(aprocess_reservation_form)(req)
+
+    assert response.status_code == 503
+    acreate_event_mock.assert_not_called()
+
+
+def test_aprocess_reservation_form_refuses_before_the_first_sync(
+    mocker, settings, verified_calendar
+):
+    settings.RESERVATION_MIRROR_ENABLED = False
+    verified_calendar.return_value = None
+    req = HttpRequest()
+    req.method = "POST"
+    start: datetime = timezone.localtime(timezone.now()).replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    req.POST = {
+        "name": "Test Event",
+        "start_datetime": start.strftime("%Y-%m-%dT%H:%M:%S"),
+        "end_datetime": (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S"),
+        "email": "test@example.com",
+        "number_of_people": 2,
+    }
+    mocker.patch(
+        "core.utils.google_calendar_utils.aget_room_index",
+        return_value=RoomIntervalIndex(),
+    )
+    acreate_event_mock = mocker.patch("core.utils.booking_utils.acreate_event")
+
+    response = async_to_sync(aprocess_reservation_form)(req)
+
+    assert response.status_code == 503
+    acreate_event_mock.assert_not_called()
+
+
+def test_aprocess_reservation_form_suggests_free_slots_on_conflict(mocker):
+    req = HttpRequest()
+    req.method = "POST"
+    start: datetime = timezone.localtime(timezone.now()).replace(
+        hour=10, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    req.POST = {
+        "name": "Test Event",
+        "start_datetime": start.strftime("%Y-%m-%dT%H:%M:%S"),
+        "end_datetime": (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S"),
+        "email": "test@example.com",
+        "number_of_people": 6,
+    }
+    mocker.patch(
+        "core.utils.google_calendar_utils.aget_room_index",
+        return_value=RoomIntervalIndex.from_appointments(
+            [
+                Appointment.from_datetimes(
+                    start, start + timedelta(hours=2), 5, "Radio City"
+                )
+            ]
+        ),
+    )
+    mocker.patch("core.utils.slot_finder_utils.room_index", RoomIntervalIndex())
+    acreate_event_mock = mocker.patch("core.utils.booking_utils.acreate_event")
+
+    response = async_to_sync(aprocess_reservation_form)(req)
+
+    assert b"Room is unavailable" in response.content
+    assert b"Free instead" in response.content
+    assert b"12:00 PM - 1:00 PM" in response.content
+    acreate_event_mock.assert_not_called()
@@ -0,0 +1,173 @@
+import pytest
+import random
+import sys
+import threading
+from datetime import datetime
+from core.utils.appointment_utils import Appointment, intern_room, to_epoch
+from core.utils.room_index_utils import RoomIntervalIndex, RoomIntervals
+from core.utils.room_occupancy_utils import RoomOccupancyIndex
+
+
+def at(hour: int, minute: int = 0) -> int:
+    return to_epoch(datetime(2024, 5, 3, hour, minute))
+
+
+APPOINTMENTS: list[Appointment] = [
+    Appointment.from_datetimes(
+        datetime(2024, 5, 3, 9, 0), datetime(2024, 5, 3, 10, 0), 1, "Launchpad"
+    ),
+    Appointment.from_datetimes(
+        datetime(2024, 5, 3, 10, 0), datetime(2024, 5, 3, 12, 0), 2, "Wall Street"
+    ),
+    Appointment.from_datetimes(
+        datetime(2024, 5, 3, 13, 0), datetime(2024, 5, 3, 14, 0), 1, "Launchpad"
+    ),
+    Appointment.from_datetimes(
+        datetime(2024, 5, 3, 13, 0), datetime(2024, 5, 3, 17, 0), 6, "Radio City"
+    ),
+]
+
+
+def test_overlaps_is_half_open():
+    index = RoomIntervalIndex.from_appointments(APPOINTMENTS)
+
+    assert index.overlaps("Launchpad", at(9, 30), at(9, 45))
+    assert not index.overlaps("Launchpad", at(10), at(13))
+    assert not index.overlaps("Launchpad", at(8), at(9))
+
+
+def test_overlaps_finds_long_interval_starting_before_window():
+    index = RoomIntervalIndex.from_appointments(APPOINTMENTS)
+
+    assert index.conflicts("Radio City", at(16), at(16, 30)) == [(at(13), at(17))]
+    assert not index.overlaps("Unknown room", at(16), at(16, 30))
+
+
+def test_add_and_discard_update_index_in_place():
+    index = RoomIntervalIndex.from_appointments(APPOINTMENTS)
+    start, end = at(10, 30), at(11)
+    assert not index.overlaps("Launchpad", start, end)
+
+    index.add(
+        Appointment.from_datetimes(
+            datetime(2024, 5, 3, 10, 30), datetime(2024, 5, 3, 11), 0, "Launchpad"
+        ),
+        key="event-1",
+    )
+    assert index.overlaps("Launchpad", start, end)
+    assert len(index) == len(APPOINTMENTS) + 1
+
+    index.add(
+        Appointment.from_datetimes(
+            datetime(2024, 5, 3, 10, 30), datetime(2024, 5, 3, 11), 0, "Wall Street"
+        ),
+        key="event-1",
+    )
+    assert not index.overlaps("Launchpad", start, end)
+
+    index.discard("event-1")
+    index.discard(APPOINTMENTS[1])
+    assert not index.overlaps("Wall Street", start, end)
+    assert len(index) == len(APPOINTMENTS) - 1
+
+
+def test_busy_mask_matches_overlaps():
+    index = RoomIntervalIndex.from_appointments(APPOINTMENTS)
+    intervals = [
+        (at(hour, minute), at(hour, minute) + length * 60)
+        for hour in range(8, 18)
+        for minute in (0, 15, 30, 45)
+        for length in (15, 90, 300)
+    ]
+
+    for room in ["Launchpad", "Wall Street", "Radio City", "Unknown room"]:
+        assert index.busy_mask(room, intervals) == [
+            index.overlaps(room, start, end) for start, end in intervals
+        ]
+
+    index.discard(APPOINTMENTS[3])
+    assert not any(index.busy_mask("Radio City", intervals))
+
+
+def test_conflicts_matches_a_scan_around_long_intervals():
+    generator = random.Random(3)
+    appointments = [
+        Appointment(start, start + generator.choice([900, 3600, 30 * 86400]), 0, 0)
+        for start in (at(0) + 900 * generator.randrange(2000) for _ in range(300))
+    ]
+    index = RoomIntervalIndex.from_appointments(appointments)
+    room = appointments[0].room
+
+    for _ in range(200):
+        start = at(0) + 900 * generator.randrange(2100)
+        end = start + 900 * generator.randrange(1, 8)
+        expected = sorted(
+            (appointment.start, appointment.end)
+            for appointment in set(appointments)
+            if appointment.overlaps(start, end)
+        )
+        assert sorted(index.conflicts(room, start, end)) == expected
+        assert index.overlaps(room, start, end) == bool(expected)
+
+
+def test_adds_and_discards_across_blocks_match_a_scan(mocker):
+    mocker.patch.object(RoomIntervals, "BLOCK_SIZE", 4)
+    generator = random.Random(5)
+    index = RoomIntervalIndex()
+    booked: dict[int, Appointment] = {}
+    room = intern_room("Launchpad")
+
+    for key in range(600):
+        if booked and generator.random() < 0.4:
+            removed_key = generator.choice(list(booked))
+            del booked[removed_key]
+            index.discard(removed_key)
+        start = at(0) + 900 * generator.randrange(200)
+        booked[key] = Appointment(
+            start, start + generator.choice([900, 3600, 86400]), 0, room
+        )
+        index.add(booked[key], key=key)
+
+        start = at(0) + 900 * generator.randrange(210)
+        end = start + 900 * generator.randrange(1, 8)
+        expected = sorted(
+            (appointment.start, appointment.end)
+            for appointment in booked.values()
+            if appointment.overlaps(start, end)
+        )
+        assert sorted(index.conflicts("Launchpad", start, end)) == expected
+        assert index.overlaps("Launchpad", start, end) == bool(expected)
+    assert len(index) == len(booked)
+
+
+@pytest.mark.parametrize("index_class", [RoomIntervalIndex, RoomOccupancyIndex])
+def test_concurrent_adds_and_discards_keep_the_index_consistent(index_class):
+    index = index_class()
+    appointment = Appointment.from_datetimes(
+        datetime(2024, 5, 3, 9), datetime(2024, 5, 3, 10), 0, "Launchpad"
+    )
+
+    def churn(worker: int):
+        for round in range(300):
+            for key in range(5):
+                index.add(appointment, key=(worker, key))
+            if round % 2:
+                for key in range(5):
+                    index.discard((worker, key))
+
+    # Switch threads as often as possible so unguarded updates would interleave.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [
+            threading.Thread(target=churn, args=(worker,)) for worker in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert len(index) == 0
+    assert not index.overlaps("Launchpad", at(9), at(10))
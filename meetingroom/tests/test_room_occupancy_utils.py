@@ -0,0 +1,103 @@
+import random
+import sys
+from datetime import datetime, timedelta
+from core.utils.appointment_utils import Appointment, to_epoch
+from core.utils.google_calendar_utils import make_room_index
+from core.utils.room_index_utils import RoomIntervalIndex
+from core.utils.room_occupancy_utils import RoomOccupancyIndex
+
+ROOMS: list[str] = ["Launchpad", "Wall Street", "Radio City"]
+
+
+def at(hour: int, minute: int = 0) -> int:
+    return to_epoch(datetime(2024, 5, 3, hour, minute))
+
+
+def make_appointments(count: int) -> list[Appointment]:
+    generator = random.Random(7)
+    appointments: list[Appointment] = []
+    for _ in range(count):
+        start = datetime(2024, 5, 3, 7) + timedelta(
+            minutes=5 * generator.randrange(150)
+        )
+        appointments.append(
+            Appointment.from_datetimes(
+                start,
+                start + timedelta(minutes=5 * generator.randrange(1, 24)),
+                0,
+                generator.choice(ROOMS),
+            )
+        )
+    return appointments
+
+
+def test_occupancy_matches_interval_index():
+    appointments = make_appointments(60)
+    occupancy = RoomOccupancyIndex.from_appointments(appointments)
+    intervals = RoomIntervalIndex.from_appointments(appointments)
+    candidates = [
+        (at(hour, minute), at(hour, minute) + length * 60)
+        for hour in range(6, 21)
+        for minute in (0, 10, 25, 40)
+        for length in (5, 30, 95)
+    ]
+
+    for room in ROOMS:
+        assert occupancy.busy_mask(room, candidates) == intervals.busy_mask(
+            room, candidates
+        )
+    assert len(occupancy) == len(intervals)
+    assert all(sys.getsizeof(day) < 300 for day in occupancy._days.values())
+
+
+def test_discard_keeps_minutes_still_covered_by_other_bookings():
+    index = RoomOccupancyIndex()
+    index.add(
+        Appointment.from_datetimes(
+            datetime(2024, 5, 3, 9), datetime(2024, 5, 3, 11), 0, "Launchpad"
+        ),
+        key="event-1",
+    )
+    index.add(
+        Appointment.from_datetimes(
+            datetime(2024, 5, 3, 10), datetime(2024, 5, 3, 12), 0, "Launchpad"
+        ),
+        key="event-2",
+    )
+
+    index.discard("event-1")
+    assert not index.overlaps("Launchpad", at(9), at(10))
+    assert index.overlaps("Launchpad", at(10, 59), at(11))
+    assert index.conflicts("Launchpad", at(8), at(18)) == [(at(10), at(12))]
+
+    index.discard("event-2")
+    assert not index
+    assert index.conflicts("Launchpad", at(8), at(18)) == []
+
+
+def test_partial_minutes_and_overnight_events_are_covered():
+    midnight = to_epoch(datetime(2024, 5, 4))
+    index = RoomOccupancyIndex.from_appointments(
+        [
+            Appointment.from_datetimes(
+                datetime(2024, 5, 3, 23, 30, 20),
+                datetime(2024, 5, 4, 1, 29, 40),
+                0,
+                "Radio City",
+            )
+        ]
+    )
+
+    assert index.conflicts("Radio City", at(23), midnight + 3 * 60 * 60) == [
+        (at(23, 30), midnight),
+        (midnight, midnight + 90 * 60),
+    ]
+    assert index.overlaps("Radio City", at(23, 30), at(23, 31))
+    assert not index.overlaps("Radio City", at(23, 29), at(23, 30))
+
+
+def test_make_room_index_follows_setting(settings):
+    settings.ROOM_OCCUPANCY_BITMAPS = True
+    assert isinstance(make_room_index(), RoomOccupancyIndex)
+    settings.ROOM_OCCUPANCY_BITMAPS = False
+    assert isinstance(make_room_index(), RoomIntervalIndex)
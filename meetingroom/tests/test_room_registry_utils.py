@@ -0,0 +1,81 @@
+from core.utils.google_calendar_utils import assign_room, candidate_rooms
+from core.utils.room_registry_utils import (
+    MeetingRoom,
+    RoomRegistry,
+    get_room_registry,
+)
+
+
+def test_default_registry_buckets():
+    registry = get_room_registry()
+    assert registry.max_capacity == 10
+    assert [room.name for room in registry.candidate_rooms(1)] == [
+        "Launchpad",
+        "Wall Street",
+    ]
+    assert [room.name for room in registry.candidate_rooms(4)] == [
+        "Launchpad",
+        "Wall Street",
+    ]
+    assert [room.name for room in registry.candidate_rooms(5)] == ["Radio City"]
+    assert [room.name for room in registry.candidate_rooms(10)] == ["Radio City"]
+    assert registry.candidate_rooms(0) == ()
+    assert registry.candidate_rooms(11) == ()
+
+
+def test_registry_with_many_tiers():
+    registry = RoomRegistry(
+        MeetingRoom(f"Room {capacity}-{copy}", capacity)
+        for capacity in (20, 2, 8)
+        for copy in range(3)
+    )
+    assert len(registry) == 9
+    assert registry.max_capacity == 20
+    assert [room.name for room in registry.candidate_rooms(2)] == [
+        "Room 2-0",
+        "Room 2-1",
+        "Room 2-2",
+    ]
+    assert [room.capacity for room in registry.candidate_rooms(3)] == [8, 8, 8]
+    assert [room.capacity for room in registry.candidate_rooms(9)] == [20, 20, 20]
+    assert registry.get("Room 8-1").capacity == 8
+    assert registry.get("Missing") is None
+
+
+def test_registry_calendars():
+    registry = RoomRegistry(
+        [MeetingRoom("Launchpad", 4, "launchpad"), MeetingRoom("Radio City", 10)]
+    )
+    assert registry.calendars() == {"Launchpad": "launchpad", "Radio City": ""}
+    assert not registry.has_calendars()
+    assert RoomRegistry([MeetingRoom("Launchpad", 4, "launchpad")]).has_calendars()
+
+
+def test_registry_room_ids_match_appointments():
+    room = MeetingRoom("Launchpad", 4)
+    assert room.id == get_room_registry().get("Launchpad").id
+
+
+def test_registry_resets_on_settings_change(settings):
+    registry = get_room_registry()
+    assert get_room_registry() is registry
+
+    settings.MEETING_ROOMS = [
+        {"name": "Huddle", "capacity": 2},
+        {"name": "Boardroom", "capacity": 12},
+    ]
+    assert get_room_registry() is not registry
+    assert get_room_registry().max_capacity == 12
+    assert candidate_rooms(3) == ["Boardroom"]
+    assert not get_room_registry().has_calendars()
+
+
+def test_assign_room_reports_all_busy(settings):
+    settings.MEETING_ROOMS = [
+        {"name": "North", "capacity": 6},
+        {"name": "South", "capacity": 6},
+        {"name": "East", "capacity": 6},
+    ]
+    assert assign_room(5, lambda room: room != "East") == (False, "East")
+    assert assign_room(5, lambda room: True) == (True, "All")
+    assert assign_room(7, lambda room: False) == (True, "Error")
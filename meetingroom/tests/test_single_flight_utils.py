@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from core.utils.single_flight_utils import SharedSingleFlight, SingleFlight
+
+
+def run_in_threads(target, count: int) -> list:
+    results: list = []
+
+    def call():
+        results.append(target())
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    executions: list[int] = []
+
+    def fetch() -> list[int]:
+        executions.append(1)
+        time.sleep(0.05)
+        return [1, 2, 3]
+
+    results = run_in_threads(lambda: flights.do(("window", 1), fetch), 5)
+
+    metrics = flights.metrics()
+    assert len(executions) == 1
+    assert results == [[1, 2, 3]] * 5
+    assert metrics["calls"] == 5
+    assert metrics["coalesced"] == 4
+    assert metrics["coalesce_ratio"] == pytest.approx(0.8)
+    assert metrics["max_wait_seconds"] > 0
+
+
+def test_different_keys_do_not_coalesce():
+    flights = SingleFlight()
+
+    assert flights.do("a", lambda: 1) == 1
+    assert flights.do("b", lambda: 2) == 2
+    assert flights.metrics()["executions"] == 2
+
+
+def test_waiters_see_the_leader_error():
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("calendar down")
+
+    errors: list[Exception] = []
+
+    def call():
+        try:
+            flights.do("window", fail)
+        except ValueError as error:
+            errors.append(error)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    call()
+    leader.join()
+
+    assert len(errors) == 2
+    assert flights.metrics()["executions"] == 1
+
+
+def test_shared_flight_reuses_result_from_another_process(tmp_path):
+    cache = LocMemCache("single-flight-test", {})
+    first_process = SharedSingleFlight(cache, str(tmp_path))
+    second_process = SharedSingleFlight(cache, str(tmp_path))
+    executions: list[int] = []
+
+    def fetch() -> list[int]:
+        executions.append(1)
+        return [1, 2, 3]
+
+    assert first_process.do("window", fetch) == [1, 2, 3]
+    assert second_process.do("window", fetch) == [1, 2, 3]
+    assert len(executions) == 1
+    assert second_process.metrics()["cache_hits"] == 1
+    assert list(tmp_path.iterdir())
+
+
+def test_async_calls_on_separate_event_loops_share_one_execution():
+    flights = SingleFlight()
+    executions: list[int] = []
+
+    async def fetch() -> list[int]:
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return [1, 2, 3]
+
+    results = run_in_threads(lambda: asyncio.run(flights.ado("refresh", fetch)), 4)
+
+    metrics = flights.metrics()
+    assert len(executions) == 1
+    assert results == [[1, 2, 3]] * 4
+    assert metrics["coalesced"] == 3
+    assert metrics["max_wait_seconds"] > 0
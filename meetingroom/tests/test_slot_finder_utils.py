@@ -0,0 +1,118 @@
+import pytest
+from datetime import datetime, timedelta
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from core.utils.appointment_utils import Appointment, to_epoch
+from core.utils.room_index_utils import RoomIntervalIndex
+from core.utils.slot_finder_utils import (
+    find_free_slots,
+    iter_free_starts,
+    merge_busy_intervals,
+)
+
+client = Client()
+
+
+@pytest.fixture
+def day() -> datetime:
+    return timezone.localtime(timezone.now()).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+
+
+@pytest.fixture
+def interval_index(day) -> RoomIntervalIndex:
+    def booking(start_hour: float, end_hour: float, room: str) -> Appointment:
+        return Appointment.from_datetimes(
+            day + timedelta(hours=start_hour), day + timedelta(hours=end_hour), 0, room
+        )
+
+    return RoomIntervalIndex.from_appointments(
+        [
+            booking(9, 10, "Launchpad"),
+            booking(9.5, 11, "Launchpad"),
+            booking(9, 10.25, "Wall Street"),
+            booking(9, 17, "Radio City"),
+        ]
+    )
+
+
+def test_merge_busy_intervals():
+    assert merge_busy_intervals([(5, 7), (1, 3), (2, 4), (4, 5), (9, 10)]) == [
+        (1, 7),
+        (9, 10),
+    ]
+
+
+def test_iter_free_starts_skips_busy_time_and_midnight(day):
+    start = to_epoch(day + timedelta(hours=22))
+    busy = [(start + 15 * 60, start + 45 * 60)]
+
+    starts = list(iter_free_starts(busy, start, start + 4 * 60 * 60, 30 * 60))
+
+    # 23:30 and 23:45 would end on the next day.
+    assert [(slot_start - start) // 60 for slot_start in starts] == [
+        45,
+        60,
+        75,
+        120,
+        135,
+        150,
+        165,
+        180,
+        195,
+        210,
+    ]
+
+
+def test_find_free_slots_returns_earliest_rooms_that_fit(day, interval_index):
+    start = to_epoch(day + timedelta(hours=9))
+    end = to_epoch(day + timedelta(hours=17))
+
+    assert find_free_slots(interval_index, 2, start, end, 60 * 60, 5) == [
+        ("Wall Street", start + 75 * 60, start + 135 * 60),
+        ("Wall Street", start + 90 * 60, start + 150 * 60),
+        ("Wall Street", start + 105 * 60, start + 165 * 60),
+        ("Launchpad", start + 120 * 60, start + 180 * 60),
+        ("Wall Street", start + 120 * 60, start + 180 * 60),
+    ]
+    assert find_free_slots(interval_index, 8, start, end, 60 * 60) == []
+    assert find_free_slots(interval_index, 12, start, end, 60 * 60) == []
+
+
+def test_free_slots_view(mocker, day, interval_index):
+    mocker.patch(
+        "core.utils.google_calendar_utils.get_room_index", return_value=interval_index
+    )
+    mocker.patch("core.utils.slot_finder_utils.room_index", RoomIntervalIndex())
+    mocker.patch(
+        "core.utils.google_calendar_utils.calendar_service.staleness_seconds",
+        return_value=0.0,
+    )
+
+    response = client.get(
+        reverse("free_slots"),
+        {
+            "duration": 60,
+            "number_of_people": 7,
+            "start": (day + timedelta(hours=9)).isoformat(),
+            "count": 2,
+        },
+    )
+
+    assert response.status_code == 200
+    assert [
+        (slot["room"], datetime.fromisoformat(slot["start"]))
+        for slot in response.json()["slots"]
+    ] == [
+        ("Radio City", day + timedelta(hours=17)),
+        ("Radio City", day + timedelta(hours=17, minutes=15)),
+    ]
+    assert client.get(reverse("free_slots"), {"duration": 60}).status_code == 400
+    assert (
+        client.get(
+            reverse("free_slots"), {"duration": 60, "number_of_people": 11}
+        ).status_code
+        == 400
+    )
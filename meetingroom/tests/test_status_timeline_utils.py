@@ -0,0 +1,38 @@
+from datetime import datetime
+from core.utils.appointment_utils import Appointment, to_epoch
+from core.utils.status_timeline_utils import RoomStatusTimeline
+
+APPOINTMENTS: list[Appointment] = [
+    Appointment.from_datetimes(
+        datetime(2024, 5, 3, 9, 0), datetime(2024, 5, 3, 10, 0), 1, "Launchpad"
+    ),
+    Appointment.from_datetimes(
+        datetime(2024, 5, 3, 9, 30), datetime(2024, 5, 3, 11, 0), 2, "Wall Street"
+    ),
+    Appointment.from_datetimes(
+        datetime(2024, 5, 3, 10, 0), datetime(2024, 5, 3, 10, 30), 1, "Launchpad"
+    ),
+]
+
+
+def test_is_busy_finds_meeting_after_first_has_ended():
+    timeline = RoomStatusTimeline(APPOINTMENTS)
+
+    assert not timeline.is_busy(datetime(2024, 5, 3, 8, 59))
+    assert timeline.is_busy(datetime(2024, 5, 3, 10, 45))
+    assert timeline.is_busy(datetime(2024, 5, 3, 10, 45), "Wall Street")
+    assert not timeline.is_busy(datetime(2024, 5, 3, 10, 45), "Launchpad")
+    assert not timeline.is_busy(datetime(2024, 5, 3, 11, 0))
+
+
+def test_back_to_back_meetings_do_not_create_a_free_transition():
+    timeline = RoomStatusTimeline(APPOINTMENTS)
+
+    assert timeline.busy_rooms_at(datetime(2024, 5, 3, 10, 0)) == {
+        "Launchpad",
+        "Wall Street",
+    }
+    assert to_epoch(timeline.next_transition(datetime(2024, 5, 3, 9, 45))) == (
+        to_epoch(datetime(2024, 5, 3, 10, 30))
+    )
+    assert timeline.next_transition(datetime(2024, 5, 3, 11, 0)) is None
@@ -15,3 +15,9 @@ def test_index_view():
 def test_book_reservation_view():
     response = client.get(reverse("book_reservation"))
     assert response.status_code == 200
+
+
+def test_calendar_metrics_view():
+    response = client.get(reverse("calendar_metrics"))
+    assert response.status_code == 200
+    assert set(response.json()) >= {"refresh_flights", "circuit_breaker"}